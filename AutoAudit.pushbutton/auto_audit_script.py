@@ -1,13 +1,23 @@
 import clr
 import os
 import csv
+import time
 from lib.warning import collect_warning_data
 from lib.basic import collect_basic_data
 from lib.workset import collect_workset_data
 from lib.view import collect_view_data
+from lib.workset_histogram import collect_workset_histogram, HISTOGRAM_FIELDS, CATEGORY_FIELDS
+from lib.view_index import get_view_index, select_view_types
+from lib.workset_matrix import collect_visibility_matrix, matrix_fieldnames, SUMMARY_FIELDS, MATRIX_LEGEND
+from lib.duplicates import find_duplicates, find_cross_model_duplicates, DUPLICATE_FIELDS, CROSS_DUPLICATE_FIELDS
+from lib.extents import audit_extents, EXTENT_FIELDS, OUTLIER_FIELDS
+from lib.family_complexity import ComplexityCache, collect_family_complexity, FAMILY_FIELDS
+from lib.view_performance import collect_view_performance, VIEW_PERFORMANCE_FIELDS, TIME_BUDGET
 from lib.preview import show_audit_preview
 from lib.ui import show_ui
 from pyrevit import script
+from coordination_toolkit.sampling import StratifiedSample, parse_sample_spec, format_estimate
+from coordination_toolkit.shared_collections import get_link_documents, get_elements_of_class
 
 from __init__ import logger  # Import the logger from __init__.py
 
@@ -30,7 +40,9 @@ def validate_user_inputs(user_inputs):
         return False, "Error: Output directory is required."
     
     # Check if at least one audit type is enabled
-    if not any([user_inputs.get('enable_basic'), user_inputs.get('enable_workset'), user_inputs.get('enable_view')]):
+    if not any([user_inputs.get('enable_basic'), user_inputs.get('enable_workset'), user_inputs.get('enable_view'),
+                user_inputs.get('enable_duplicates'), user_inputs.get('enable_cross_duplicates'),
+                user_inputs.get('enable_extents'), user_inputs.get('enable_families')]):
         logger.error("Error: At least one audit type must be enabled.")
         return False, "Error: At least one audit type must be enabled."
     
@@ -51,6 +63,49 @@ def validate_user_inputs(user_inputs):
         if not all([user_inputs.get('view_file_name'), user_inputs.get('view_patterns')]):
             logger.error("Error: View file name and patterns are required for view audit.")
             return False, "Error: View file name and patterns are required for view audit."
+        if user_inputs.get('view_sample'):
+            try:
+                parse_sample_spec(user_inputs['view_sample'])
+            except ValueError as e:
+                logger.error(f"Error: Invalid view sample size: {e}")
+                return False, f"Error: Invalid view sample size: {e}"
+        if user_inputs.get('view_performance'):
+            try:
+                if int(user_inputs['view_performance']) <= 0:
+                    raise ValueError
+            except ValueError:
+                logger.error("Error: The number of views to count must be a positive whole number.")
+                return False, "Error: The number of views to count must be a positive whole number."
+    
+    # Validate model check inputs
+    if user_inputs.get('enable_duplicates'):
+        if not all([user_inputs.get('duplicates_file_name'), user_inputs.get('duplicate_categories')]):
+            logger.error("Error: Duplicates file name and categories are required for the duplicate check.")
+            return False, "Error: Duplicates file name and categories are required for the duplicate check."
+    if user_inputs.get('enable_cross_duplicates'):
+        if not all([user_inputs.get('cross_duplicates_file_name'), user_inputs.get('duplicate_categories')]):
+            logger.error("Error: Cross-model file name and categories are required for the cross-model duplicate check.")
+            return False, "Error: Cross-model file name and categories are required for the cross-model duplicate check."
+    if user_inputs.get('enable_extents'):
+        if not user_inputs.get('extents_file_name'):
+            logger.error("Error: Extents file name is required for the far from origin check.")
+            return False, "Error: Extents file name is required for the far from origin check."
+        try:
+            if float(user_inputs.get('extents_max_distance')) <= 0:
+                raise ValueError
+        except (TypeError, ValueError):
+            logger.error("Error: Max distance must be a positive number of metres.")
+            return False, "Error: Max distance must be a positive number of metres."
+    if user_inputs.get('enable_families'):
+        if not user_inputs.get('families_file_name'):
+            logger.error("Error: Families file name is required for the family complexity check.")
+            return False, "Error: Families file name is required for the family complexity check."
+        try:
+            if float(user_inputs.get('families_time_budget')) <= 0:
+                raise ValueError
+        except (TypeError, ValueError):
+            logger.error("Error: Time budget must be a positive number of seconds.")
+            return False, "Error: Time budget must be a positive number of seconds."
     
     return True, "Validation successful"
 
@@ -60,7 +115,20 @@ def collect_audit_data(linked_docs, user_inputs):
         'warning_data': [],
         'basic_data': [],
         'workset_data': [],
-        'view_data': []
+        'workset_histogram': [],
+        'workset_category_counts': [],
+        'workset_matrix': [],
+        'workset_matrix_columns': matrix_fieldnames([]),
+        'workset_hidden_summary': [],
+        'view_data': [],
+        'view_estimates': [],
+        'view_performance': [],
+        'duplicate_data': [],
+        'cross_duplicate_data': [],
+        'extent_data': [],
+        'outlier_data': [],
+        'family_data': [],
+        'family_stats': {'measured': 0, 'cached': 0, 'skipped': 0}
     }
     
     try:
@@ -115,7 +183,7 @@ def collect_audit_data(linked_docs, user_inputs):
                 if doc_obj:
                     try:
                         # Collect in-place families
-                        collector = FilteredElementCollector(doc_obj).OfClass(FamilyInstance)
+                        collector = get_elements_of_class(doc_obj, FamilyInstance)
                         model_in_place_elements = [elem for elem in collector if elem.Symbol.Family.IsInPlace]
                         in_place_count = len(model_in_place_elements)
                         
@@ -124,12 +192,13 @@ def collect_audit_data(linked_docs, user_inputs):
                             1 for elem in FilteredElementCollector(doc_obj).OfClass(Family)
                             if not FilteredElementCollector(doc_obj).OfClass(FamilyInstance).OfCategoryId(elem.FamilyCategory.Id).ToElements())
                         
+                        groups = get_elements_of_class(doc_obj, Group)
                         detail_groups = len(
-                            set(g.Name for g in FilteredElementCollector(doc_obj).OfClass(Group)
+                            set(g.Name for g in groups
                                 if g.GroupType.FamilyName == "Detail Group"))
                         
                         detail_group_instances = len(
-                            [g for g in FilteredElementCollector(doc_obj).OfClass(Group)
+                            [g for g in groups
                              if g.GroupType.FamilyName == "Detail Group"])
                         
                         audit_results['basic_data'].append({
@@ -190,6 +259,20 @@ def collect_audit_data(linked_docs, user_inputs):
                                     'Is Open': workset['is_open'],
                                     'Owner': workset['owner']
                                 })
+                        
+                        # Element counts per workset and category, from one scan of the document
+                        if user_inputs.get('workset_histogram'):
+                            workset_rows, category_rows = collect_workset_histogram(doc_obj, doc_name)
+                            audit_results['workset_histogram'].extend(workset_rows)
+                            audit_results['workset_category_counts'].extend(category_rows)
+                        
+                        # Full workset x 3D view visibility matrix
+                        if user_inputs.get('workset_matrix'):
+                            matrix_rows, summary_rows, workset_names = collect_visibility_matrix(doc_obj, doc_name)
+                            audit_results['workset_matrix'].extend(matrix_rows)
+                            audit_results['workset_hidden_summary'].extend(summary_rows)
+                            audit_results['workset_matrix_columns'] = matrix_fieldnames(
+                                audit_results['workset_matrix_columns'] + workset_names)
                     except Exception as e:
                         logger.error(f"Error collecting workset data from {doc_obj.Title}: {str(e)}")
         
@@ -197,18 +280,32 @@ def collect_audit_data(linked_docs, user_inputs):
         if user_inputs.get('enable_view', False):
             logger.info("Collecting view audit data...")
             # Import the collection functions from view module
-            from lib.view import get_all_views_by_type, check_view_name_compliance, get_view_details
+            from lib.view import check_view_name_compliance
+            performance_deadline = time.time() + TIME_BUDGET
             
             for doc_obj in linked_docs:
                 if doc_obj:
                     try:
                         doc_name = doc_obj.Title
-                        all_views = get_all_views_by_type(doc_obj, user_inputs.get('view_types'))
+                        # Views and their details come from one indexed pass over the document
+                        all_views = get_view_index(doc_obj).get_views(user_inputs.get('view_types'))
                         
-                        for view in all_views:
+                        # Quick scan: audit a sample of every view type and scale the compliance
+                        sample = None
+                        view_strata = {}
+                        if user_inputs.get('view_sample'):
+                            sample = StratifiedSample(*parse_sample_spec(user_inputs['view_sample']))
+                            drawn = sample.draw(all_views, lambda view: view['view_type'])
+                            all_views = [view for view_type, view in drawn]
+                            view_strata = {view['id']: view_type for view_type, view in drawn}
+                        compliant_by_type = {}
+                        
+                        for view_details in all_views:
                             try:
-                                view_details = get_view_details(view, doc_obj)
-                                compliance = check_view_name_compliance(view.Name, user_inputs.get('view_patterns', []))
+                                compliance = check_view_name_compliance(view_details['name'], user_inputs.get('view_patterns', []))
+                                if sample is not None and compliance['is_compliant']:
+                                    view_type = view_strata[view_details['id']]
+                                    compliant_by_type[view_type] = compliant_by_type.get(view_type, 0) + 1
                                 
                                 audit_results['view_data'].append({
                                     'Document Name': doc_name,
@@ -223,13 +320,72 @@ def collect_audit_data(linked_docs, user_inputs):
                                     'Detail Level': view_details['detail_level'],
                                     'Phase': view_details['phase'],
                                     'Is On Sheet': view_details['is_on_sheet'],
-                                    'Sheet Count': view_details['sheet_count']
+                                    'Sheet Count': view_details['sheet_count'],
+                                    'Sample Weight': round(sample.weight(view_strata[view_details['id']]), 2) if sample else 1
                                 })
                             except Exception as e:
-                                logger.error(f"Error processing view {view.Name}: {str(e)}")
+                                logger.error(f"Error processing view {view_details['name']}: {str(e)}")
+                        
+                        if sample is not None:
+                            for view_type in list(sample.strata) + [None]:
+                                strata = [view_type] if view_type else None
+                                estimate = sample.estimate_proportion(compliant_by_type, strata)
+                                count = sample.estimate_count(compliant_by_type, strata)
+                                population, sampled = sample.strata[view_type] if view_type else (sample.population, sample.sampled)
+                                audit_results['view_estimates'].append({
+                                    'Document Name': doc_name,
+                                    'View Type': view_type or 'All',
+                                    'Views': population,
+                                    'Sampled Views': sampled,
+                                    'Compliance Rate': format_estimate(*estimate),
+                                    'Compliant Views': format_estimate(*count, percent=False)
+                                })
+                        
+                        # Load estimate of every view, counting the visible elements of the top views only
+                        if user_inputs.get('view_performance'):
+                            audit_results['view_performance'].extend(collect_view_performance(
+                                doc_obj, doc_name, get_view_index(doc_obj).get_views(user_inputs.get('view_types')),
+                                int(user_inputs['view_performance']), performance_deadline))
                     except Exception as e:
                         logger.error(f"Error collecting view data from {doc_obj.Title}: {str(e)}")
         
+        # Collect duplicate elements
+        if user_inputs.get('enable_duplicates', False):
+            logger.info("Checking for duplicate elements...")
+            for doc_obj in linked_docs:
+                if doc_obj:
+                    audit_results['duplicate_data'].extend(
+                        find_duplicates(doc_obj, doc_obj.Title, user_inputs['duplicate_categories']))
+        
+        # Collect elements duplicated between the host and its links
+        if user_inputs.get('enable_cross_duplicates', False):
+            logger.info("Checking for elements duplicated across models...")
+            audit_results['cross_duplicate_data'] = find_cross_model_duplicates(
+                [doc_obj for doc_obj in linked_docs if doc_obj], user_inputs['duplicate_categories'])
+        
+        # Collect model extents and elements far from the base point
+        if user_inputs.get('enable_extents', False):
+            logger.info("Measuring model extents...")
+            for doc_obj in linked_docs:
+                if doc_obj:
+                    summary, outlier_rows = audit_extents(doc_obj, doc_obj.Title, float(user_inputs['extents_max_distance']))
+                    if summary:
+                        audit_results['extent_data'].append(summary)
+                    audit_results['outlier_data'].extend(outlier_rows)
+        
+        # Collect the heaviest family types, within the time budget
+        if user_inputs.get('enable_families', False):
+            logger.info("Measuring family complexity...")
+            cache = ComplexityCache.load()
+            deadline = time.time() + float(user_inputs['families_time_budget'])
+            for doc_obj in linked_docs:
+                if doc_obj:
+                    family_rows, stats = collect_family_complexity(doc_obj, doc_obj.Title, cache, deadline)
+                    audit_results['family_data'].extend(family_rows)
+                    for name, count in stats.items():
+                        audit_results['family_stats'][name] += count
+            cache.save()
+        
     except Exception as e:
         logger.error(f"Error in data collection: {str(e)}")
     
@@ -288,20 +444,142 @@ def export_audit_data(audit_results, user_inputs):
             except Exception as e:
                 export_status.append(f"[ERROR] Workset export failed: {str(e)}")
         
+        # Export workset histogram
+        if user_inputs.get('enable_workset', False) and audit_results['workset_histogram']:
+            base_name = os.path.splitext(user_inputs['workset_file_name'])[0]
+            for suffix, fieldnames, rows in (('histogram', HISTOGRAM_FIELDS, audit_results['workset_histogram']),
+                                             ('histogram_categories', CATEGORY_FIELDS, audit_results['workset_category_counts'])):
+                histogram_path = os.path.join(user_inputs['output_dir'], f"{base_name}_{suffix}.csv")
+                try:
+                    with open(histogram_path, 'w', newline='', encoding='utf-8') as csvfile:
+                        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+                        writer.writeheader()
+                        writer.writerows(rows)
+                    export_status.append(f"[SUCCESS] Workset {suffix.replace('_', ' ')} exported: {len(rows)} entries")
+                except Exception as e:
+                    export_status.append(f"[ERROR] Workset {suffix.replace('_', ' ')} export failed: {str(e)}")
+        
+        # Export workset visibility matrix and the views hiding worksets
+        if user_inputs.get('enable_workset', False) and audit_results['workset_matrix']:
+            base_name = os.path.splitext(user_inputs['workset_file_name'])[0]
+            matrix_path = os.path.join(user_inputs['output_dir'], f"{base_name}_visibility_matrix.csv")
+            try:
+                with open(matrix_path, 'w', newline='', encoding='utf-8') as csvfile:
+                    # Worksets missing from a document are left blank
+                    writer = csv.DictWriter(csvfile, fieldnames=audit_results['workset_matrix_columns'], restval='')
+                    writer.writeheader()
+                    writer.writerows(audit_results['workset_matrix'])
+                export_status.append(f"[SUCCESS] Workset visibility matrix exported: {len(audit_results['workset_matrix'])} views ({MATRIX_LEGEND})")
+            except Exception as e:
+                export_status.append(f"[ERROR] Workset visibility matrix export failed: {str(e)}")
+            
+            summary_path = os.path.join(user_inputs['output_dir'], f"{base_name}_hidden_worksets.csv")
+            try:
+                with open(summary_path, 'w', newline='', encoding='utf-8') as csvfile:
+                    writer = csv.DictWriter(csvfile, fieldnames=SUMMARY_FIELDS)
+                    writer.writeheader()
+                    writer.writerows(audit_results['workset_hidden_summary'])
+                export_status.append(f"[SUCCESS] Views hiding worksets exported: {len(audit_results['workset_hidden_summary'])} entries")
+            except Exception as e:
+                export_status.append(f"[ERROR] Hidden workset summary export failed: {str(e)}")
+        
         # Export view data
         if user_inputs.get('enable_view', False) and audit_results['view_data']:
-            view_path = os.path.join(user_inputs['output_dir'], user_inputs['view_file_name'])
+            view_file_name = user_inputs['view_file_name']
+            sampled = bool(user_inputs.get('view_sample'))
+            if sampled:
+                # Label every output of a quick scan as sampled
+                view_file_name = f"{os.path.splitext(view_file_name)[0]}_sampled.csv"
+            view_path = os.path.join(user_inputs['output_dir'], view_file_name)
             try:
                 with open(view_path, 'w', newline='', encoding='utf-8') as csvfile:
                     fieldnames = ['Document Name', 'View Name', 'View ID', 'View Type', 'Scale', 
                                 'Is Compliant', 'Matched Patterns', 'Failed Patterns', 'Exclusion Violations',
                                 'Detail Level', 'Phase', 'Is On Sheet', 'Sheet Count']
-                    writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+                    if sampled:
+                        fieldnames.append('Sample Weight')
+                    writer = csv.DictWriter(csvfile, fieldnames=fieldnames, extrasaction='ignore')
                     writer.writeheader()
                     writer.writerows(audit_results['view_data'])
                 export_status.append(f"[SUCCESS] View data exported: {len(audit_results['view_data'])} entries")
             except Exception as e:
                 export_status.append(f"[ERROR] View export failed: {str(e)}")
+            
+            if sampled and audit_results['view_estimates']:
+                estimate_path = os.path.join(user_inputs['output_dir'], f"{os.path.splitext(view_file_name)[0]}_estimates.csv")
+                try:
+                    with open(estimate_path, 'w', newline='', encoding='utf-8') as csvfile:
+                        fieldnames = ['Document Name', 'View Type', 'Views', 'Sampled Views', 'Compliance Rate', 'Compliant Views']
+                        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+                        writer.writeheader()
+                        writer.writerows(audit_results['view_estimates'])
+                    export_status.append(f"[SUCCESS] Sampled view estimates exported: {len(audit_results['view_estimates'])} entries")
+                except Exception as e:
+                    export_status.append(f"[ERROR] View estimate export failed: {str(e)}")
+        
+        # Export view performance
+        if user_inputs.get('enable_view', False) and audit_results['view_performance']:
+            performance_path = os.path.join(user_inputs['output_dir'],
+                                            f"{os.path.splitext(user_inputs['view_file_name'])[0]}_performance.csv")
+            try:
+                with open(performance_path, 'w', newline='', encoding='utf-8') as csvfile:
+                    writer = csv.DictWriter(csvfile, fieldnames=VIEW_PERFORMANCE_FIELDS)
+                    writer.writeheader()
+                    writer.writerows(audit_results['view_performance'])
+                export_status.append(f"[SUCCESS] View performance exported: {len(audit_results['view_performance'])} views")
+            except Exception as e:
+                export_status.append(f"[ERROR] View performance export failed: {str(e)}")
+        
+        # Export duplicate elements
+        if user_inputs.get('enable_duplicates', False):
+            duplicates_path = os.path.join(user_inputs['output_dir'], user_inputs['duplicates_file_name'])
+            try:
+                with open(duplicates_path, 'w', newline='', encoding='utf-8') as csvfile:
+                    writer = csv.DictWriter(csvfile, fieldnames=DUPLICATE_FIELDS)
+                    writer.writeheader()
+                    writer.writerows(audit_results['duplicate_data'])
+                export_status.append(f"[SUCCESS] Duplicate elements exported: {len(audit_results['duplicate_data'])} clusters")
+            except Exception as e:
+                export_status.append(f"[ERROR] Duplicate export failed: {str(e)}")
+        
+        # Export cross-model duplicates
+        if user_inputs.get('enable_cross_duplicates', False):
+            cross_duplicates_path = os.path.join(user_inputs['output_dir'], user_inputs['cross_duplicates_file_name'])
+            try:
+                with open(cross_duplicates_path, 'w', newline='', encoding='utf-8') as csvfile:
+                    writer = csv.DictWriter(csvfile, fieldnames=CROSS_DUPLICATE_FIELDS)
+                    writer.writeheader()
+                    writer.writerows(audit_results['cross_duplicate_data'])
+                export_status.append(f"[SUCCESS] Cross-model duplicates exported: {len(audit_results['cross_duplicate_data'])} pairs")
+            except Exception as e:
+                export_status.append(f"[ERROR] Cross-model duplicate export failed: {str(e)}")
+        
+        # Export model extents and outliers
+        if user_inputs.get('enable_extents', False):
+            base_name = os.path.splitext(user_inputs['extents_file_name'])[0]
+            for file_name, label, fieldnames, rows in (
+                    (user_inputs['extents_file_name'], "Model extents", EXTENT_FIELDS, audit_results['extent_data']),
+                    (f"{base_name}_outliers.csv", "Elements far from origin", OUTLIER_FIELDS, audit_results['outlier_data'])):
+                try:
+                    with open(os.path.join(user_inputs['output_dir'], file_name), 'w', newline='', encoding='utf-8') as csvfile:
+                        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+                        writer.writeheader()
+                        writer.writerows(rows)
+                    export_status.append(f"[SUCCESS] {label} exported: {len(rows)} entries")
+                except Exception as e:
+                    export_status.append(f"[ERROR] {label} export failed: {str(e)}")
+        
+        # Export family complexity
+        if user_inputs.get('enable_families', False):
+            families_path = os.path.join(user_inputs['output_dir'], user_inputs['families_file_name'])
+            try:
+                with open(families_path, 'w', newline='', encoding='utf-8') as csvfile:
+                    writer = csv.DictWriter(csvfile, fieldnames=FAMILY_FIELDS)
+                    writer.writeheader()
+                    writer.writerows(audit_results['family_data'])
+                export_status.append(f"[SUCCESS] Family complexity exported: {len(audit_results['family_data'])} family types")
+            except Exception as e:
+                export_status.append(f"[ERROR] Family complexity export failed: {str(e)}")
                 
     except Exception as e:
         export_status.append(f"[ERROR] Export error: {str(e)}")
@@ -320,7 +598,9 @@ def validate_user_inputs(user_inputs):
         return False, "Error: Output directory is required."
     
     # Check if at least one audit type is enabled
-    if not any([user_inputs.get('enable_basic'), user_inputs.get('enable_workset'), user_inputs.get('enable_view')]):
+    if not any([user_inputs.get('enable_basic'), user_inputs.get('enable_workset'), user_inputs.get('enable_view'),
+                user_inputs.get('enable_duplicates'), user_inputs.get('enable_cross_duplicates'),
+                user_inputs.get('enable_extents'), user_inputs.get('enable_families')]):
         logger.error("Error: At least one audit type must be enabled.")
         return False, "Error: At least one audit type must be enabled."
     
@@ -341,6 +621,49 @@ def validate_user_inputs(user_inputs):
         if not all([user_inputs.get('view_file_name'), user_inputs.get('view_patterns')]):
             logger.error("Error: View file name and patterns are required for view audit.")
             return False, "Error: View file name and patterns are required for view audit."
+        if user_inputs.get('view_sample'):
+            try:
+                parse_sample_spec(user_inputs['view_sample'])
+            except ValueError as e:
+                logger.error(f"Error: Invalid view sample size: {e}")
+                return False, f"Error: Invalid view sample size: {e}"
+        if user_inputs.get('view_performance'):
+            try:
+                if int(user_inputs['view_performance']) <= 0:
+                    raise ValueError
+            except ValueError:
+                logger.error("Error: The number of views to count must be a positive whole number.")
+                return False, "Error: The number of views to count must be a positive whole number."
+    
+    # Validate model check inputs
+    if user_inputs.get('enable_duplicates'):
+        if not all([user_inputs.get('duplicates_file_name'), user_inputs.get('duplicate_categories')]):
+            logger.error("Error: Duplicates file name and categories are required for the duplicate check.")
+            return False, "Error: Duplicates file name and categories are required for the duplicate check."
+    if user_inputs.get('enable_cross_duplicates'):
+        if not all([user_inputs.get('cross_duplicates_file_name'), user_inputs.get('duplicate_categories')]):
+            logger.error("Error: Cross-model file name and categories are required for the cross-model duplicate check.")
+            return False, "Error: Cross-model file name and categories are required for the cross-model duplicate check."
+    if user_inputs.get('enable_extents'):
+        if not user_inputs.get('extents_file_name'):
+            logger.error("Error: Extents file name is required for the far from origin check.")
+            return False, "Error: Extents file name is required for the far from origin check."
+        try:
+            if float(user_inputs.get('extents_max_distance')) <= 0:
+                raise ValueError
+        except (TypeError, ValueError):
+            logger.error("Error: Max distance must be a positive number of metres.")
+            return False, "Error: Max distance must be a positive number of metres."
+    if user_inputs.get('enable_families'):
+        if not user_inputs.get('families_file_name'):
+            logger.error("Error: Families file name is required for the family complexity check.")
+            return False, "Error: Families file name is required for the family complexity check."
+        try:
+            if float(user_inputs.get('families_time_budget')) <= 0:
+                raise ValueError
+        except (TypeError, ValueError):
+            logger.error("Error: Time budget must be a positive number of seconds.")
+            return False, "Error: Time budget must be a positive number of seconds."
     
     return True, "Validation successful"
 
@@ -356,19 +679,18 @@ def gather_documents():
         logger.error("Error: No active document found.")
         return []
 
-    # Gather linked documents
+    # Gather linked documents (shared with the other tools through the session cache);
+    # every loaded instance is audited, so a link placed twice is listed twice
     try:
-        link_instances = FilteredElementCollector(doc).OfClass(RevitLinkInstance)
+        links = get_link_documents(doc)
         linked_count = 0
         
-        for link in link_instances:
-            linked_doc = link.GetLinkDocument()
-            if linked_doc:  # Check if the linked document is loaded
-                linked_docs.append(linked_doc)
-                linked_count += 1
-                logger.info(f"Added linked document: {linked_doc.Title}")
-            else:
-                logger.warning(f"Warning: Linked document could not be loaded: {link.Name}")
+        for _, linked_doc in links['instances']:
+            linked_docs.append(linked_doc)
+            linked_count += 1
+            logger.info(f"Added linked document: {linked_doc.Title}")
+        for link_name in links['unloaded']:
+            logger.warning(f"Warning: Linked document could not be loaded: {link_name}")
         
         logger.info(f"Total documents gathered: {len(linked_docs)} (1 main + {linked_count} linked)")
         
@@ -397,6 +719,14 @@ def main():
             output.print_html("<p style='color: red;'>Error: No documents available for processing.</p>")
             return
 
+        # Custom view selection: offer the view types found in the documents
+        if user_inputs.get('enable_view') and user_inputs.get('view_types_custom'):
+            user_inputs['view_types'] = select_view_types(linked_docs)
+            if not user_inputs['view_types']:
+                output.print_html("<p style='color: red;'>No view types selected for the view audit.</p>")
+                return
+            output.print_html(f"<p><strong>View types:</strong> {', '.join(user_inputs['view_types'])}</p>")
+
         # Display initial processing info
         output.print_html("<h2>AutoAudit Processing</h2>")
         output.print_html(f"<p><strong>Documents to process:</strong> {len(linked_docs)}</p>")
@@ -406,6 +736,10 @@ def main():
         if user_inputs.get('enable_basic'): enabled_audits.append("Basic Audit")
         if user_inputs.get('enable_workset'): enabled_audits.append("Workset Audit")
         if user_inputs.get('enable_view'): enabled_audits.append("View Audit")
+        if user_inputs.get('enable_duplicates'): enabled_audits.append("Duplicate Check")
+        if user_inputs.get('enable_cross_duplicates'): enabled_audits.append("Cross-Model Duplicate Check")
+        if user_inputs.get('enable_extents'): enabled_audits.append("Far From Origin Check")
+        if user_inputs.get('enable_families'): enabled_audits.append("Family Complexity Check")
         
         output.print_html(f"<p><strong>Enabled audits:</strong> {', '.join(enabled_audits)}</p>")
         output.print_html("<p>Collecting audit data...</p>")
@@ -421,18 +755,64 @@ def main():
             data_summary.append(f"{len(audit_results['basic_data'])} documents analyzed")
         if audit_results['workset_data']: 
             data_summary.append(f"{len(audit_results['workset_data'])} workset entries")
+        if audit_results['workset_histogram']:
+            empty_worksets = sum(1 for row in audit_results['workset_histogram'] if row['Is Empty'])
+            data_summary.append(f"{len(audit_results['workset_histogram'])} worksets counted ({empty_worksets} empty)")
+        if audit_results['workset_matrix']:
+            data_summary.append(f"{len(audit_results['workset_matrix'])} 3D views in the visibility matrix "
+                                f"({len(audit_results['workset_hidden_summary'])} hiding worksets)")
         if audit_results['view_data']: 
-            data_summary.append(f"{len(audit_results['view_data'])} views analyzed")
+            if user_inputs.get('view_sample'):
+                data_summary.append(f"{len(audit_results['view_data'])} sampled views analyzed")
+            else:
+                data_summary.append(f"{len(audit_results['view_data'])} views analyzed")
+        
+        if audit_results['view_performance']:
+            counted_views = sum(1 for row in audit_results['view_performance'] if row['Evaluated'])
+            data_summary.append(f"{len(audit_results['view_performance'])} views ranked by load "
+                                f"({counted_views} with visible elements counted)")
+        if user_inputs.get('enable_duplicates'):
+            duplicate_elements = sum(row['Element Count'] for row in audit_results['duplicate_data'])
+            data_summary.append(f"{len(audit_results['duplicate_data'])} duplicate clusters ({duplicate_elements} elements)")
+        if user_inputs.get('enable_cross_duplicates'):
+            data_summary.append(f"{len(audit_results['cross_duplicate_data'])} elements duplicated across models")
+        if user_inputs.get('enable_extents'):
+            data_summary.append(f"{len(audit_results['outlier_data'])} elements far from the model "
+                                f"in {len(audit_results['extent_data'])} documents")
+        if user_inputs.get('enable_families'):
+            family_stats = audit_results['family_stats']
+            data_summary.append(f"{family_stats['measured'] + family_stats['cached']} family types measured "
+                                f"({family_stats['cached']} from cache, {family_stats['skipped']} skipped for time)")
         
         output.print_html(f"<p><strong>Data collected:</strong> {', '.join(data_summary)}</p>")
+        for estimate in audit_results['view_estimates']:
+            if estimate['View Type'] == 'All':
+                output.print_html(f"<p><strong>Sampled view compliance ({estimate['Document Name']}):</strong> "
+                                  f"{estimate['Compliance Rate']} of {estimate['Views']} views, "
+                                  f"from {estimate['Sampled Views']} sampled views (95% interval)</p>")
         output.print_html("<p>Opening preview window...</p>")
         
         # Show preview and get user confirmation
+        view_note = None
+        if user_inputs.get('view_sample'):
+            view_note = (f"Quick scan: a sample of {len(audit_results['view_data'])} views "
+                         f"({user_inputs['view_sample']} per view type). Compliance estimates are exported with the view report.")
         user_wants_export = show_audit_preview(
             warning_data=audit_results['warning_data'],
             basic_data=audit_results['basic_data'],
             workset_data=audit_results['workset_data'],
-            view_data=audit_results['view_data']
+            view_data=audit_results['view_data'],
+            view_note=view_note,
+            histogram_data=audit_results['workset_histogram'],
+            matrix_data=audit_results['workset_matrix'],
+            matrix_columns=audit_results['workset_matrix_columns'],
+            hidden_summary=audit_results['workset_hidden_summary'],
+            duplicate_data=audit_results['duplicate_data'],
+            cross_duplicate_data=audit_results['cross_duplicate_data'],
+            extent_data=audit_results['extent_data'],
+            outlier_data=audit_results['outlier_data'],
+            family_data=audit_results['family_data'],
+            performance_data=audit_results['view_performance']
         )
         
         if user_wants_export:
@@ -0,0 +1,186 @@
+import clr
+
+from __init__ import logger  # Import the logger from __init__.py
+
+clr.AddReference('RevitAPI')
+from Autodesk.Revit.DB import RevitLinkInstance
+
+from coordination_toolkit.session_cache import document_identity
+from coordination_toolkit.shared_collections import get_elements_of_class
+from lib.spatial_hash import (resolve_categories, read_boxes, pad_boxes, overlapping_pairs,
+                              overlap_ratios, group_pairs, placement_matrix, transform_boxes, stack_boxes)
+
+FEET_TO_MM = 304.8
+DEFAULT_CATEGORIES = "Walls, Floors, Structural Columns, Structural Framing, Pipes, Ducts, Generic Models, Furniture"
+DEFAULT_TOLERANCE_MM = 5.0
+DEFAULT_MIN_OVERLAP = 0.9
+
+DUPLICATE_FIELDS = ['Document Name', 'Cluster', 'Category', 'Element Count', 'Max Overlap (%)',
+                    'Element IDs', 'Worksets']
+CROSS_DUPLICATE_FIELDS = ['Category', 'Document A', 'Element ID A', 'Workset A',
+                          'Document B', 'Element ID B', 'Workset B', 'Overlap (%)']
+
+
+def parse_category_names(text):
+    """Split a comma or semicolon separated list of category names."""
+    return [name.strip() for name in text.replace(';', ',').split(',') if name.strip()]
+
+
+def find_duplicates(revit_doc, doc_name, category_names, tolerance_mm=DEFAULT_TOLERANCE_MM,
+                    min_overlap=DEFAULT_MIN_OVERLAP):
+    """
+    Find clusters of near-duplicate elements in a document.
+
+    Bounding boxes of the chosen categories are read once, grown by half the tolerance
+    on every side and bucketed in a spatial hash; elements of the same category whose
+    boxes overlap by at least min_overlap of the larger box are duplicates. This catches
+    copies a few millimetres apart and stacked elements, not only the identical instances
+    Revit warns about.
+
+    Args:
+        revit_doc (Autodesk.Revit.DB.Document): The Revit document object.
+        doc_name (str): The name of the document.
+        category_names (list): The category names to check.
+        tolerance_mm (float): Distance (mm) up to which separate boxes still count as overlapping.
+        min_overlap (float): Minimum overlap ratio (0-1) of a duplicate pair.
+
+    Returns:
+        list: One row per duplicate cluster, with the DUPLICATE_FIELDS keys.
+    """
+    rows = []
+    try:
+        category_ids = resolve_categories(revit_doc, category_names)
+        if not category_ids:
+            logger.warning(f"None of the duplicate check categories were found in {doc_name}")
+            return rows
+        boxes = read_boxes(revit_doc, category_ids)
+        mins, maxs = pad_boxes(boxes['mins'], boxes['maxs'], tolerance_mm / FEET_TO_MM / 2.0)
+        categories = boxes['categories']
+        pairs = overlapping_pairs(mins, maxs, accept=lambda i, j: categories[i] == categories[j])
+        ratios = overlap_ratios(mins, maxs, pairs)
+
+        best_ratio = {}
+        duplicate_pairs = []
+        for (i, j), ratio in zip(pairs, ratios):
+            if ratio >= min_overlap:
+                duplicate_pairs.append((i, j))
+                for index in (i, j):
+                    best_ratio[index] = max(best_ratio.get(index, 0.0), ratio)
+
+        for number, members in enumerate(group_pairs(duplicate_pairs), 1):
+            rows.append({
+                'Document Name': doc_name,
+                'Cluster': number,
+                'Category': categories[members[0]],
+                'Element Count': len(members),
+                'Max Overlap (%)': round(100.0 * max(best_ratio[index] for index in members), 1),
+                'Element IDs': '; '.join(str(boxes['ids'][index]) for index in members),
+                'Worksets': '; '.join(sorted(set(boxes['worksets'][index] for index in members)))
+            })
+        logger.info(f"Duplicate check of {doc_name}: {len(boxes['ids'])} elements, "
+                    f"{len(pairs)} overlapping pairs, {len(rows)} duplicate clusters")
+    except Exception as e:
+        logger.error(f"Error checking duplicates in {doc_name}: {str(e)}")
+    return rows
+
+
+def _link_placements(host_doc, documents):
+    # Every placed instance of a gathered link, with its transform into the host
+    gathered = set(document_identity(link_doc) for link_doc in documents[1:])
+    instances = []
+    for link in get_elements_of_class(host_doc, RevitLinkInstance):
+        link_doc = link.GetLinkDocument()
+        if link_doc is None or document_identity(link_doc) not in gathered:
+            continue
+        instances.append((link, link_doc))
+    placed = {}
+    for _, link_doc in instances:
+        placed[document_identity(link_doc)] = placed.get(document_identity(link_doc), 0) + 1
+    placements = []
+    for link, link_doc in instances:
+        label = link_doc.Title
+        if placed[document_identity(link_doc)] > 1:
+            label = f"{label} ({link.Name})"
+        placements.append((label, link_doc, placement_matrix(link.GetTotalTransform())))
+    return placements
+
+
+def find_cross_model_duplicates(documents, category_names, tolerance_mm=DEFAULT_TOLERANCE_MM,
+                                min_overlap=DEFAULT_MIN_OVERLAP):
+    """
+    Find elements modelled in more than one document, such as walls drawn both in the
+    host and in a linked model.
+
+    Boxes are read once per document, and each placed link instance moves its boxes
+    into host coordinates in one batch. All boxes share one spatial hash, and only pairs
+    of the same category from different documents (or different instances of one link)
+    are tested.
+
+    Args:
+        documents (list): The host document first, then the linked documents.
+        category_names (list): The category names to check.
+        tolerance_mm (float): Distance (mm) up to which separate boxes still count as overlapping.
+        min_overlap (float): Minimum overlap ratio (0-1) of a reported pair.
+
+    Returns:
+        list: One row per overlapping pair, with the CROSS_DUPLICATE_FIELDS keys, largest
+              overlap first.
+    """
+    rows = []
+    if not documents:
+        return rows
+    host_doc = documents[0]
+    try:
+        box_cache = {}
+        labels = []
+        box_sets = []
+        source_index = []
+        ids = []
+        categories = []
+        worksets = []
+        for label, revit_doc, matrix in [(host_doc.Title, host_doc, None)] + _link_placements(host_doc, documents):
+            identity = document_identity(revit_doc)
+            if identity not in box_cache:
+                box_cache[identity] = read_boxes(revit_doc, resolve_categories(revit_doc, category_names))
+            boxes = box_cache[identity]
+            if not boxes['ids']:
+                continue
+            mins, maxs = boxes['mins'], boxes['maxs']
+            if matrix is not None:
+                mins, maxs = transform_boxes(mins, maxs, matrix)
+            labels.append(label)
+            box_sets.append((mins, maxs))
+            source_index.extend([len(labels) - 1] * len(boxes['ids']))
+            ids.extend(boxes['ids'])
+            categories.extend(boxes['categories'])
+            worksets.extend(boxes['worksets'])
+        if len(box_sets) < 2:
+            logger.info("Cross-model duplicate check: fewer than two models have elements to compare")
+            return rows
+
+        mins, maxs = stack_boxes(box_sets)
+        mins, maxs = pad_boxes(mins, maxs, tolerance_mm / FEET_TO_MM / 2.0)
+        pairs = overlapping_pairs(mins, maxs, accept=lambda i, j: (source_index[i] != source_index[j] and
+                                                                   categories[i] == categories[j]))
+        ratios = overlap_ratios(mins, maxs, pairs)
+        for (i, j), ratio in zip(pairs, ratios):
+            if ratio < min_overlap:
+                continue
+            if source_index[i] > source_index[j]:
+                i, j = j, i
+            rows.append({
+                'Category': categories[i],
+                'Document A': labels[source_index[i]],
+                'Element ID A': ids[i],
+                'Workset A': worksets[i],
+                'Document B': labels[source_index[j]],
+                'Element ID B': ids[j],
+                'Workset B': worksets[j],
+                'Overlap (%)': round(100.0 * ratio, 1)
+            })
+        rows.sort(key=lambda row: (-row['Overlap (%)'], row['Document A'], row['Document B']))
+        logger.info(f"Cross-model duplicate check: {len(ids)} elements in {len(labels)} models, "
+                    f"{len(pairs)} overlapping pairs, {len(rows)} duplicates")
+    except Exception as e:
+        logger.error(f"Error checking cross-model duplicates: {str(e)}")
+    return rows
@@ -0,0 +1,184 @@
+import math
+
+from __init__ import logger  # Import the logger from __init__.py
+
+from coordination_toolkit.shared_collections import get_base_points
+from lib.spatial_hash import read_model_boxes
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+FEET_TO_M = 0.3048
+DEFAULT_MAX_DISTANCE = 1000.0  # metres from the project base point
+# Robust extents: the quartiles of the element centres widened by this many interquartile ranges
+FENCE_FACTOR = 3.0
+MIN_FENCE_MARGIN = 30.0  # metres, so compact models do not flag their outer elements
+
+BEYOND_RADIUS = 'Beyond Radius'
+OUTSIDE_EXTENTS = 'Outside Robust Extents'
+
+EXTENT_FIELDS = ['Document Name', 'Element Count', 'Outliers', 'Extent X (m)', 'Extent Y (m)', 'Extent Z (m)',
+                 'Robust Extent X (m)', 'Robust Extent Y (m)', 'Robust Extent Z (m)',
+                 'Max Distance from Base Point (m)', 'Max Distance from Survey Point (m)',
+                 'Base Point to Survey Point (m)']
+OUTLIER_FIELDS = ['Document Name', 'Element ID', 'Category', 'Workset', 'Reason',
+                  'Distance from Base Point (m)', 'Distance from Survey Point (m)',
+                  'Centre X (m)', 'Centre Y (m)', 'Centre Z (m)']
+
+
+def read_reference_points(revit_doc):
+    """
+    Get the project base point and survey point positions of a document, read through the
+    shared collections so versions before Revit 2021.1 are covered too.
+
+    Returns:
+        tuple: ((x, y, z) base point, (x, y, z) survey point) in internal feet.
+    """
+    base_points = get_base_points(revit_doc)
+    return base_points['project'], base_points['survey']
+
+
+def _percentile(sorted_values, fraction):
+    # Linear interpolation between closest ranks, as numpy.percentile
+    position = (len(sorted_values) - 1) * fraction
+    lower = int(math.floor(position))
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def measure_extents(mins, maxs, base_point, survey_point, max_distance=DEFAULT_MAX_DISTANCE):
+    """
+    Measure the extents of a set of boxes and find the boxes far from the rest.
+
+    A box is an outlier when its centre is more than max_distance from the base point,
+    or outside the robust extents: the quartiles of the centres on each axis, widened by
+    FENCE_FACTOR interquartile ranges and at least MIN_FENCE_MARGIN.
+
+    Args:
+        mins, maxs: Box corners, one (x, y, z) per box in internal feet (not empty).
+        base_point (tuple): The project base point position.
+        survey_point (tuple): The survey point position.
+        max_distance (float): Radius around the base point (m).
+
+    Returns:
+        dict: 'extent' and 'robust_extent' ((x, y, z) sizes in m), 'base_distances' and
+              'survey_distances' (per box, m), 'centres' (per box, m) and 'outliers'
+              (per box, the reason or None).
+    """
+    margin = MIN_FENCE_MARGIN / FEET_TO_M
+    radius = max_distance / FEET_TO_M
+    if np is not None:
+        mins = np.asarray(mins, dtype=float)
+        maxs = np.asarray(maxs, dtype=float)
+        centres = (mins + maxs) / 2.0
+        base_distances = np.linalg.norm(centres - np.asarray(base_point, dtype=float), axis=1)
+        survey_distances = np.linalg.norm(centres - np.asarray(survey_point, dtype=float), axis=1)
+        lower_quartile, upper_quartile = np.percentile(centres, [25, 75], axis=0)
+        spread = np.maximum(FENCE_FACTOR * (upper_quartile - lower_quartile), margin)
+        low_fence, high_fence = lower_quartile - spread, upper_quartile + spread
+        outside = ((centres < low_fence) | (centres > high_fence)).any(axis=1)
+        beyond = base_distances > radius
+        inside = ~(outside | beyond)
+        robust = (centres[inside].max(axis=0) - centres[inside].min(axis=0)) if inside.any() else np.zeros(3)
+        reasons = np.where(beyond, BEYOND_RADIUS, np.where(outside, OUTSIDE_EXTENTS, ''))
+        return {
+            'extent': ((maxs.max(axis=0) - mins.min(axis=0)) * FEET_TO_M).tolist(),
+            'robust_extent': (robust * FEET_TO_M).tolist(),
+            'base_distances': (base_distances * FEET_TO_M).tolist(),
+            'survey_distances': (survey_distances * FEET_TO_M).tolist(),
+            'centres': (centres * FEET_TO_M).tolist(),
+            'outliers': [reason or None for reason in reasons.tolist()]
+        }
+
+    centres = [tuple((low[axis] + high[axis]) / 2.0 for axis in range(3)) for low, high in zip(mins, maxs)]
+    fences = []
+    for axis in range(3):
+        values = sorted(centre[axis] for centre in centres)
+        lower_quartile, upper_quartile = _percentile(values, 0.25), _percentile(values, 0.75)
+        spread = max(FENCE_FACTOR * (upper_quartile - lower_quartile), margin)
+        fences.append((lower_quartile - spread, upper_quartile + spread))
+    base_distances = [math.sqrt(sum((centre[axis] - base_point[axis]) ** 2 for axis in range(3))) for centre in centres]
+    survey_distances = [math.sqrt(sum((centre[axis] - survey_point[axis]) ** 2 for axis in range(3))) for centre in centres]
+    outliers = []
+    for centre, distance in zip(centres, base_distances):
+        if distance > radius:
+            outliers.append(BEYOND_RADIUS)
+        elif any(not fences[axis][0] <= centre[axis] <= fences[axis][1] for axis in range(3)):
+            outliers.append(OUTSIDE_EXTENTS)
+        else:
+            outliers.append(None)
+    inside = [centre for centre, reason in zip(centres, outliers) if reason is None]
+    return {
+        'extent': [(max(high[axis] for high in maxs) - min(low[axis] for low in mins)) * FEET_TO_M for axis in range(3)],
+        'robust_extent': [(max(centre[axis] for centre in inside) - min(centre[axis] for centre in inside)) * FEET_TO_M
+                          if inside else 0.0 for axis in range(3)],
+        'base_distances': [distance * FEET_TO_M for distance in base_distances],
+        'survey_distances': [distance * FEET_TO_M for distance in survey_distances],
+        'centres': [[value * FEET_TO_M for value in centre] for centre in centres],
+        'outliers': outliers
+    }
+
+
+def audit_extents(revit_doc, doc_name, max_distance=DEFAULT_MAX_DISTANCE):
+    """
+    Audit how far the model elements of a document spread from its base point.
+
+    Args:
+        revit_doc (Autodesk.Revit.DB.Document): The Revit document object.
+        doc_name (str): The name of the document.
+        max_distance (float): Radius around the project base point (m).
+
+    Returns:
+        tuple: (extent summary row with the EXTENT_FIELDS keys or None, outlier rows with
+               the OUTLIER_FIELDS keys, farthest from the base point first)
+    """
+    try:
+        boxes = read_model_boxes(revit_doc)
+        if not boxes['ids']:
+            logger.info(f"No model elements with a bounding box in {doc_name}")
+            return None, []
+        base_point, survey_point = read_reference_points(revit_doc)
+        measured = measure_extents(boxes['mins'], boxes['maxs'], base_point, survey_point, max_distance)
+
+        outlier_rows = []
+        for index, reason in enumerate(measured['outliers']):
+            if reason is None:
+                continue
+            centre = measured['centres'][index]
+            outlier_rows.append({
+                'Document Name': doc_name,
+                'Element ID': boxes['ids'][index],
+                'Category': boxes['categories'][index],
+                'Workset': boxes['worksets'][index],
+                'Reason': reason,
+                'Distance from Base Point (m)': round(measured['base_distances'][index], 1),
+                'Distance from Survey Point (m)': round(measured['survey_distances'][index], 1),
+                'Centre X (m)': round(centre[0], 1),
+                'Centre Y (m)': round(centre[1], 1),
+                'Centre Z (m)': round(centre[2], 1)
+            })
+        outlier_rows.sort(key=lambda row: -row['Distance from Base Point (m)'])
+
+        extent, robust_extent = measured['extent'], measured['robust_extent']
+        summary = {
+            'Document Name': doc_name,
+            'Element Count': len(boxes['ids']),
+            'Outliers': len(outlier_rows),
+            'Extent X (m)': round(extent[0], 1),
+            'Extent Y (m)': round(extent[1], 1),
+            'Extent Z (m)': round(extent[2], 1),
+            'Robust Extent X (m)': round(robust_extent[0], 1),
+            'Robust Extent Y (m)': round(robust_extent[1], 1),
+            'Robust Extent Z (m)': round(robust_extent[2], 1),
+            'Max Distance from Base Point (m)': round(max(measured['base_distances']), 1),
+            'Max Distance from Survey Point (m)': round(max(measured['survey_distances']), 1),
+            'Base Point to Survey Point (m)': round(math.sqrt(sum((base_point[axis] - survey_point[axis]) ** 2
+                                                                  for axis in range(3))) * FEET_TO_M, 1)
+        }
+        logger.info(f"Extents of {doc_name}: {len(boxes['ids'])} elements, {len(outlier_rows)} far from the model")
+        return summary, outlier_rows
+    except Exception as e:
+        logger.error(f"Error auditing the extents of {doc_name}: {str(e)}")
+        return None, []
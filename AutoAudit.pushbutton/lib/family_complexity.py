@@ -0,0 +1,200 @@
+import clr
+import json
+import os
+import time
+
+from __init__ import logger  # Import the logger from __init__.py
+
+clr.AddReference('RevitAPI')
+from Autodesk.Revit.DB import FamilyInstance, Options, ViewDetailLevel, Solid, GeometryInstance
+
+from coordination_toolkit.shared_collections import get_elements_of_class
+
+CACHE_VERSION = 1
+CACHE_PATH = os.path.join(os.getenv('APPDATA') or os.path.expanduser('~'),
+                          'CustomRevitExtension', 'Preformance.extension', 'Preformance.tab', 'Audit.panel',
+                          'AutoAudit.pushbutton', 'family_complexity.json')
+DEFAULT_TIME_BUDGET = 60  # seconds per run
+TOP_FAMILIES = 50
+
+FAMILY_FIELDS = ['Document Name', 'Rank', 'Family', 'Type', 'Category', 'Instances', 'Solids', 'Faces', 'Edges',
+                 'Nesting Depth', 'Complexity', 'Score']
+
+
+class ComplexityCache(object):
+    """
+    Geometry counts of family types from earlier runs, keyed by family, type and family version.
+
+    Stored as JSON in the user's AppData folder, so unchanged families are not measured
+    again in later runs or in other projects using the same family version.
+    """
+
+    def __init__(self, path=CACHE_PATH, entries=None):
+        self.path = path
+        self.entries = entries or {}
+        self.changed = False
+
+    @classmethod
+    def load(cls, path=CACHE_PATH):
+        """
+        Load the cache file.
+
+        Returns:
+            ComplexityCache: The cache, empty if the file is missing or unreadable.
+        """
+        if not os.path.exists(path):
+            return cls(path)
+        try:
+            with open(path, 'r', encoding='utf-8') as cache_file:
+                data = json.load(cache_file)
+        except (IOError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable family complexity cache {path}: {e}")
+            return cls(path)
+        if data.get('cache_version') != CACHE_VERSION:
+            return cls(path)
+        return cls(path, data.get('families', {}))
+
+    def save(self):
+        if not self.changed:
+            return
+        try:
+            directory = os.path.dirname(self.path)
+            if not os.path.isdir(directory):
+                os.makedirs(directory)
+            with open(self.path, 'w', encoding='utf-8') as cache_file:
+                json.dump({'cache_version': CACHE_VERSION, 'families': self.entries}, cache_file, separators=(',', ':'))
+            self.changed = False
+        except (IOError, OSError) as e:
+            logger.warning(f"Could not save the family complexity cache {self.path}: {e}")
+
+    @staticmethod
+    def key(symbol):
+        """
+        Get the cache key of a family type, or None when its family has no version to check.
+        """
+        try:
+            version = symbol.Family.VersionGuid.ToString()
+        except Exception:
+            return None
+        return f"{symbol.Family.Name}|{symbol.Name}|{version}"
+
+    def get(self, key):
+        return self.entries.get(key) if key else None
+
+    def put(self, key, counts):
+        if key:
+            self.entries[key] = counts
+            self.changed = True
+
+
+def measure_geometry(geometry, depth=0):
+    """
+    Count the solids, faces and edges of a geometry element, nested instances included.
+
+    Returns:
+        dict: 'solids', 'faces', 'edges' and 'depth' (the deepest nesting of geometry instances).
+    """
+    counts = {'solids': 0, 'faces': 0, 'edges': 0, 'depth': depth}
+    if geometry is None:
+        return counts
+    for item in geometry:
+        if isinstance(item, Solid):
+            if item.Faces.Size:
+                counts['solids'] += 1
+                counts['faces'] += item.Faces.Size
+                counts['edges'] += item.Edges.Size
+        elif isinstance(item, GeometryInstance):
+            nested = measure_geometry(item.GetSymbolGeometry(), depth + 1)
+            for name in ('solids', 'faces', 'edges'):
+                counts[name] += nested[name]
+            counts['depth'] = max(counts['depth'], nested['depth'])
+    return counts
+
+
+def count_instances(revit_doc):
+    """
+    Count the placed instances of each family type, leaving out nested instances.
+
+    Returns:
+        dict: FamilySymbol ElementId integer to [FamilySymbol ElementId, instance count].
+    """
+    counts = {}
+    for instance in get_elements_of_class(revit_doc, FamilyInstance):
+        if instance.SuperComponent is not None:
+            continue
+        type_id = instance.GetTypeId()
+        counts.setdefault(type_id.IntegerValue, [type_id, 0])[1] += 1
+    return counts
+
+
+def collect_family_complexity(revit_doc, doc_name, cache, deadline=None, top=TOP_FAMILIES):
+    """
+    Rank the family types of a document by geometric complexity times instance count.
+
+    Geometry is measured once per family type, not per instance, at fine detail level.
+    Counts come from the cache when the family version is unchanged. Types are measured
+    in order of instance count until the deadline passes, so the most placed types are
+    covered first and a large model still returns quickly.
+
+    Args:
+        revit_doc (Autodesk.Revit.DB.Document): The Revit document object.
+        doc_name (str): The name of the document.
+        cache (ComplexityCache): Counts from earlier runs; new counts are added to it.
+        deadline (float, optional): time.time() after which no more types are measured.
+        top (int): Number of family types to report.
+
+    Returns:
+        tuple: (rows with the FAMILY_FIELDS keys, heaviest first; dict with the number of
+               'measured', 'cached' and 'skipped' types)
+    """
+    stats = {'measured': 0, 'cached': 0, 'skipped': 0}
+    rows = []
+    try:
+        options = Options()
+        options.DetailLevel = ViewDetailLevel.Fine
+        options.ComputeReferences = False
+        options.IncludeNonVisibleObjects = False
+
+        instance_counts = count_instances(revit_doc)
+        for type_id, instances in sorted(instance_counts.values(), key=lambda item: -item[1]):
+            symbol = revit_doc.GetElement(type_id)
+            if symbol is None:
+                continue
+            key = ComplexityCache.key(symbol)
+            counts = cache.get(key)
+            if counts is not None:
+                stats['cached'] += 1
+            elif deadline is not None and time.time() > deadline:
+                stats['skipped'] += 1
+                continue
+            else:
+                try:
+                    counts = measure_geometry(symbol.get_Geometry(options))
+                except Exception as e:
+                    logger.error(f"Error measuring family type {symbol.Id} in {doc_name}: {str(e)}")
+                    continue
+                cache.put(key, counts)
+                stats['measured'] += 1
+            complexity = counts['faces'] + counts['edges']
+            rows.append({
+                'Document Name': doc_name,
+                'Family': symbol.Family.Name,
+                'Type': symbol.Name,
+                'Category': symbol.Category.Name if symbol.Category else "No Category",
+                'Instances': instances,
+                'Solids': counts['solids'],
+                'Faces': counts['faces'],
+                'Edges': counts['edges'],
+                'Nesting Depth': counts['depth'],
+                'Complexity': complexity,
+                'Score': complexity * instances
+            })
+        rows.sort(key=lambda row: -row['Score'])
+        rows = rows[:top]
+        for rank, row in enumerate(rows, 1):
+            row['Rank'] = rank
+        logger.info(f"Family complexity of {doc_name}: {stats['measured']} types measured, "
+                    f"{stats['cached']} from cache, {stats['skipped']} skipped for time")
+    except Exception as e:
+        logger.error(f"Error collecting family complexity from {doc_name}: {str(e)}")
+    return rows, stats
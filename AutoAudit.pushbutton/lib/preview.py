@@ -0,0 +1,71 @@
+from coordination_toolkit.row_source import RowSource
+from coordination_toolkit.preview import show_paged_preview
+from lib.workset_histogram import HISTOGRAM_FIELDS
+from lib.workset_matrix import SUMMARY_FIELDS, MATRIX_LEGEND
+from lib.duplicates import DUPLICATE_FIELDS, CROSS_DUPLICATE_FIELDS
+from lib.extents import EXTENT_FIELDS, OUTLIER_FIELDS
+from lib.family_complexity import FAMILY_FIELDS
+from lib.view_performance import VIEW_PERFORMANCE_FIELDS
+
+from __init__ import logger  # Import the logger from __init__.py
+
+WARNING_FIELDS = ['Document Name', 'Warning Descriptions', 'Related Elements']
+BASIC_FIELDS = ['Document Name', 'Purgeable Elements', 'Detail Groups', 'Detail Group Instances', 'In-Place Families']
+WORKSET_FIELDS = ['Document Name', 'View Name', 'View ID', 'Workset Name', 'Workset ID',
+                  'Visibility Setting', 'Actually Visible', 'Is Open', 'Owner']
+VIEW_FIELDS = ['Document Name', 'View Name', 'View ID', 'View Type', 'Scale', 'Is Compliant',
+               'Matched Patterns', 'Failed Patterns', 'Exclusion Violations', 'Detail Level', 'Phase',
+               'Is On Sheet', 'Sheet Count']
+
+
+def show_audit_preview(warning_data=None, basic_data=None, workset_data=None, view_data=None, view_note=None,
+                       histogram_data=None, matrix_data=None, matrix_columns=None, hidden_summary=None,
+                       duplicate_data=None, cross_duplicate_data=None, extent_data=None, outlier_data=None,
+                       family_data=None, performance_data=None):
+    """
+    Show the collected audit data in the shared paged preview.
+
+    Args:
+        warning_data (list): Warning rows.
+        basic_data (list): Model health rows.
+        workset_data (list): Workset visibility rows.
+        view_data (list): View compliance rows.
+        view_note (str, optional): Shown above the views of a sampled view audit, which
+            also get their Sample Weight column.
+        histogram_data (list): Workset element histogram rows.
+        matrix_data (list): Workset visibility matrix rows, one per 3D view.
+        matrix_columns (list): The matrix columns, see workset_matrix.matrix_fieldnames.
+        hidden_summary (list): Rows of the views that hide worksets.
+        duplicate_data (list): Duplicate element clusters.
+        cross_duplicate_data (list): Element pairs duplicated between documents.
+        extent_data (list): Model extent summaries, one per document.
+        outlier_data (list): Elements far from the base point or the rest of the model.
+        family_data (list): The heaviest family types of each document.
+        performance_data (list): View load estimates, the most expensive views first.
+
+    Returns:
+        bool: True if the user chose to export the data.
+    """
+    datasets = {
+        'Warnings': RowSource(warning_data or [], WARNING_FIELDS),
+        'Model Health': RowSource(basic_data or [], BASIC_FIELDS),
+        'Worksets': RowSource(workset_data or [], WORKSET_FIELDS),
+        'Workset Histogram': RowSource(histogram_data or [], HISTOGRAM_FIELDS),
+        'Workset Visibility Matrix': RowSource(matrix_data or [], matrix_columns),
+        'Views Hiding Worksets': RowSource(hidden_summary or [], SUMMARY_FIELDS),
+        'Views': RowSource(view_data or [], VIEW_FIELDS + (['Sample Weight'] if view_note else [])),
+        'View Performance': RowSource(performance_data or [], VIEW_PERFORMANCE_FIELDS),
+        'Duplicates': RowSource(duplicate_data or [], DUPLICATE_FIELDS),
+        'Cross-Model Duplicates': RowSource(cross_duplicate_data or [], CROSS_DUPLICATE_FIELDS),
+        'Model Extents': RowSource(extent_data or [], EXTENT_FIELDS),
+        'Far From Origin': RowSource(outlier_data or [], OUTLIER_FIELDS),
+        'Heaviest Families': RowSource(family_data or [], FAMILY_FIELDS)
+    }
+    notes = {'Workset Visibility Matrix': MATRIX_LEGEND}
+    if view_note:
+        notes['Views'] = view_note
+    try:
+        return show_paged_preview(datasets, title='AutoAudit Preview', accept_label='Export', notes=notes)
+    except Exception as e:
+        logger.error(f"Error showing audit preview: {str(e)}")
+        return False
@@ -0,0 +1,317 @@
+import clr
+
+clr.AddReference('RevitAPI')
+from Autodesk.Revit.DB import (FilteredElementCollector, ElementMulticategoryFilter, ElementId, ImportInstance,
+                               CategoryType)
+from System.Collections.Generic import List
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Boxes spanning more cells than this are tested against every box directly
+MAX_CELLS_PER_BOX = 64
+MIN_CELL_SIZE = 1.0  # feet
+NO_WORKSET = "No Workset"
+
+
+def resolve_categories(revit_doc, category_names):
+    """
+    Find the categories of a document by name.
+
+    Args:
+        revit_doc (Autodesk.Revit.DB.Document): The Revit document object.
+        category_names (list): Category names, matched case-insensitively.
+
+    Returns:
+        list: The ElementIds of the categories found.
+    """
+    wanted = set(name.strip().lower() for name in category_names if name.strip())
+    return [category.Id for category in revit_doc.Settings.Categories if category.Name.lower() in wanted]
+
+
+def read_boxes(revit_doc, category_ids):
+    """
+    Read the bounding boxes of the model elements of some categories.
+
+    Args:
+        revit_doc (Autodesk.Revit.DB.Document): The Revit document object.
+        category_ids (list): ElementIds of the categories to read.
+
+    Returns:
+        dict: 'ids', 'categories' and 'worksets' lists and 'mins'/'maxs' (one (x, y, z)
+              per element, in the document's internal feet).
+    """
+    if not category_ids:
+        return _read_elements(revit_doc, [])
+    category_filter = ElementMulticategoryFilter(List[ElementId](category_ids))
+    collector = FilteredElementCollector(revit_doc).WherePasses(category_filter).WhereElementIsNotElementType()
+    return _read_elements(revit_doc, collector)
+
+
+def read_model_boxes(revit_doc):
+    """
+    Read the bounding boxes of every model element and CAD import of a document.
+
+    Returns:
+        dict: As read_boxes.
+    """
+    collector = FilteredElementCollector(revit_doc).WhereElementIsNotElementType().WhereElementIsViewIndependent()
+    elements = (elem for elem in collector
+                if isinstance(elem, ImportInstance) or
+                (elem.Category is not None and elem.Category.CategoryType == CategoryType.Model))
+    return _read_elements(revit_doc, elements)
+
+
+def _read_elements(revit_doc, elements):
+    boxes = {'ids': [], 'categories': [], 'worksets': [], 'mins': [], 'maxs': []}
+    workset_table = revit_doc.GetWorksetTable() if revit_doc.IsWorkshared else None
+    workset_names = {}
+    for elem in elements:
+        box = elem.get_BoundingBox(None)
+        if box is None:
+            continue
+        workset_name = NO_WORKSET
+        if workset_table is not None:
+            workset_id = elem.WorksetId.IntegerValue
+            if workset_id not in workset_names:
+                workset = workset_table.GetWorkset(elem.WorksetId)
+                workset_names[workset_id] = workset.Name if workset else NO_WORKSET
+            workset_name = workset_names[workset_id]
+        boxes['ids'].append(elem.Id.IntegerValue)
+        boxes['categories'].append(elem.Category.Name if elem.Category else "No Category")
+        boxes['worksets'].append(workset_name)
+        boxes['mins'].append((box.Min.X, box.Min.Y, box.Min.Z))
+        boxes['maxs'].append((box.Max.X, box.Max.Y, box.Max.Z))
+    return boxes
+
+
+def pad_boxes(mins, maxs, padding):
+    """
+    Grow boxes by a distance on every side, so flat boxes get a volume and boxes a
+    little apart overlap.
+
+    Returns:
+        tuple: (mins, maxs) as arrays (NumPy) or lists of tuples.
+    """
+    if np is not None:
+        return np.asarray(mins, dtype=float) - padding, np.asarray(maxs, dtype=float) + padding
+    return ([tuple(value - padding for value in point) for point in mins],
+            [tuple(value + padding for value in point) for point in maxs])
+
+
+def placement_matrix(transform):
+    """
+    Convert a Revit Transform into a 3x4 matrix (nested lists): the rotation columns
+    followed by the origin.
+    """
+    basis_x, basis_y, basis_z, origin = transform.BasisX, transform.BasisY, transform.BasisZ, transform.Origin
+    return [
+        [basis_x.X, basis_y.X, basis_z.X, origin.X],
+        [basis_x.Y, basis_y.Y, basis_z.Y, origin.Y],
+        [basis_x.Z, basis_y.Z, basis_z.Z, origin.Z]
+    ]
+
+
+def transform_boxes(mins, maxs, matrix):
+    """
+    Move boxes into another coordinate system and get the axis-aligned boxes around them.
+
+    The result equals bounding the eight transformed corners of each box, computed from
+    the box centres and half sizes (the half sizes go through the absolute rotation).
+
+    Args:
+        mins, maxs: Box corners, one (x, y, z) per box (array or list).
+        matrix (list): A 3x4 matrix from placement_matrix.
+
+    Returns:
+        tuple: (mins, maxs) as arrays (NumPy) or lists of tuples.
+    """
+    if np is not None:
+        mins = np.asarray(mins, dtype=float).reshape(-1, 3)
+        maxs = np.asarray(maxs, dtype=float).reshape(-1, 3)
+        matrix = np.asarray(matrix, dtype=float)
+        centres = (mins + maxs) / 2.0 @ matrix[:, :3].T + matrix[:, 3]
+        halves = (maxs - mins) / 2.0 @ np.abs(matrix[:, :3]).T
+        return centres - halves, centres + halves
+    new_mins = []
+    new_maxs = []
+    for low, high in zip(mins, maxs):
+        centre = [(low[axis] + high[axis]) / 2.0 for axis in range(3)]
+        half = [(high[axis] - low[axis]) / 2.0 for axis in range(3)]
+        moved = [sum(matrix[row][axis] * centre[axis] for axis in range(3)) + matrix[row][3] for row in range(3)]
+        extent = [sum(abs(matrix[row][axis]) * half[axis] for axis in range(3)) for row in range(3)]
+        new_mins.append(tuple(moved[row] - extent[row] for row in range(3)))
+        new_maxs.append(tuple(moved[row] + extent[row] for row in range(3)))
+    return new_mins, new_maxs
+
+
+def stack_boxes(box_sets):
+    """
+    Join several (mins, maxs) box sets into one.
+
+    Returns:
+        tuple: (mins, maxs) as arrays (NumPy) or lists of tuples.
+    """
+    if np is not None:
+        if not box_sets:
+            return np.empty((0, 3)), np.empty((0, 3))
+        return (np.vstack([np.asarray(mins, dtype=float).reshape(-1, 3) for mins, _ in box_sets]),
+                np.vstack([np.asarray(maxs, dtype=float).reshape(-1, 3) for _, maxs in box_sets]))
+    return ([tuple(point) for mins, _ in box_sets for point in mins],
+            [tuple(point) for _, maxs in box_sets for point in maxs])
+
+
+def choose_cell_size(mins, maxs):
+    """
+    Pick a hash cell size around the typical box size: the median of the largest box
+    dimensions.
+    """
+    if not len(mins):
+        return MIN_CELL_SIZE
+    if np is not None:
+        extents = (np.asarray(maxs) - np.asarray(mins)).max(axis=1)
+        return max(float(np.median(extents)), MIN_CELL_SIZE)
+    extents = sorted(max(high - low for low, high in zip(low_point, high_point))
+                     for low_point, high_point in zip(mins, maxs))
+    return max(extents[len(extents) // 2], MIN_CELL_SIZE)
+
+
+def _cell_ranges(mins, maxs, cell_size):
+    if np is not None:
+        low = np.floor(np.asarray(mins) / cell_size).astype(np.int64).tolist()
+        high = np.floor(np.asarray(maxs) / cell_size).astype(np.int64).tolist()
+        return low, high
+    to_cell = lambda point: tuple(int(value // cell_size) for value in point)
+    return [to_cell(point) for point in mins], [to_cell(point) for point in maxs]
+
+
+def _overlaps(low_a, high_a, low_b, high_b):
+    return (low_a[0] <= high_b[0] and low_b[0] <= high_a[0] and
+            low_a[1] <= high_b[1] and low_b[1] <= high_a[1] and
+            low_a[2] <= high_b[2] and low_b[2] <= high_a[2])
+
+
+def overlapping_pairs(mins, maxs, cell_size=None, accept=None):
+    """
+    Find every pair of overlapping boxes through a uniform spatial hash grid.
+
+    Each box is put in the grid cells it covers, and exact overlap tests only run
+    between boxes sharing a cell. A pair is reported once, from the cell holding the
+    lower corner of the two boxes' intersection.
+
+    Args:
+        mins, maxs: Box corners, one (x, y, z) per box (array or list).
+        cell_size (float, optional): The grid cell size; chosen from the boxes if omitted.
+        accept (callable, optional): accept(i, j) filters candidate pairs (e.g. on category)
+            before the overlap test.
+
+    Returns:
+        list: (i, j) index pairs with i < j.
+    """
+    count = len(mins)
+    if count < 2:
+        return []
+    cell_size = cell_size or choose_cell_size(mins, maxs)
+    low_cells, high_cells = _cell_ranges(mins, maxs, cell_size)
+    box_mins = mins.tolist() if np is not None and hasattr(mins, 'tolist') else list(mins)
+    box_maxs = maxs.tolist() if np is not None and hasattr(maxs, 'tolist') else list(maxs)
+
+    buckets = {}
+    oversized = []
+    for index in range(count):
+        low, high = low_cells[index], high_cells[index]
+        cells = (high[0] - low[0] + 1) * (high[1] - low[1] + 1) * (high[2] - low[2] + 1)
+        if cells > MAX_CELLS_PER_BOX:
+            oversized.append(index)
+            continue
+        for x in range(low[0], high[0] + 1):
+            for y in range(low[1], high[1] + 1):
+                for z in range(low[2], high[2] + 1):
+                    buckets.setdefault((x, y, z), []).append(index)
+
+    pairs = []
+    for cell, members in buckets.items():
+        for position, i in enumerate(members):
+            low_i = low_cells[i]
+            for j in members[position + 1:]:
+                low_j = low_cells[j]
+                home = (max(low_i[0], low_j[0]), max(low_i[1], low_j[1]), max(low_i[2], low_j[2]))
+                if home != cell:
+                    continue
+                if accept is not None and not accept(i, j):
+                    continue
+                if _overlaps(box_mins[i], box_maxs[i], box_mins[j], box_maxs[j]):
+                    pairs.append((min(i, j), max(i, j)))
+
+    # Very large boxes are tested against every other box instead of filling the grid
+    oversized_set = set(oversized)
+    for i in oversized:
+        for j in range(count):
+            if j == i or (j in oversized_set and j < i):
+                continue
+            if accept is not None and not accept(i, j):
+                continue
+            if _overlaps(box_mins[i], box_maxs[i], box_mins[j], box_maxs[j]):
+                pairs.append((min(i, j), max(i, j)))
+    return pairs
+
+
+def overlap_ratios(mins, maxs, pairs):
+    """
+    Get, for each pair, the volume of the boxes' intersection over the larger box volume.
+
+    Returns:
+        list: One ratio in [0, 1] per pair.
+    """
+    if not pairs:
+        return []
+    if np is not None:
+        mins = np.asarray(mins, dtype=float)
+        maxs = np.asarray(maxs, dtype=float)
+        first = np.array([i for i, _ in pairs])
+        second = np.array([j for _, j in pairs])
+        sizes = np.clip(np.minimum(maxs[first], maxs[second]) - np.maximum(mins[first], mins[second]), 0, None)
+        intersections = sizes.prod(axis=1)
+        volumes = (maxs - mins).prod(axis=1)
+        larger = np.maximum(volumes[first], volumes[second])
+        return np.where(larger > 0, intersections / np.where(larger > 0, larger, 1), 0.0).tolist()
+    ratios = []
+    for i, j in pairs:
+        intersection = 1.0
+        volume_i = volume_j = 1.0
+        for axis in range(3):
+            intersection *= max(0.0, min(maxs[i][axis], maxs[j][axis]) - max(mins[i][axis], mins[j][axis]))
+            volume_i *= maxs[i][axis] - mins[i][axis]
+            volume_j *= maxs[j][axis] - mins[j][axis]
+        larger = max(volume_i, volume_j)
+        ratios.append(intersection / larger if larger > 0 else 0.0)
+    return ratios
+
+
+def group_pairs(pairs):
+    """
+    Merge pairs sharing an index into clusters (union-find).
+
+    Returns:
+        list: Clusters as sorted index lists, largest first.
+    """
+    parent = {}
+
+    def find(index):
+        root = index
+        while parent.get(root, root) != root:
+            root = parent[root]
+        while parent.get(index, index) != root:
+            parent[index], index = root, parent[index]
+        return root
+
+    for i, j in pairs:
+        root_i, root_j = find(i), find(j)
+        if root_i != root_j:
+            parent[max(root_i, root_j)] = min(root_i, root_j)
+    clusters = {}
+    for index in set(index for pair in pairs for index in pair):
+        clusters.setdefault(find(index), []).append(index)
+    return sorted((sorted(members) for members in clusters.values()), key=lambda members: (-len(members), members[0]))
@@ -8,6 +8,10 @@ from System.Windows.Forms import (Application, Form, FolderBrowserDialog, Label,
                                   ScrollBars, FlowDirection)
 from System.Drawing import Point, Size, Color, Font
 from __init__ import logger
+from lib.view_index import VIEW_TYPE_PRESETS, CUSTOM_SELECTION
+from lib.duplicates import DEFAULT_CATEGORIES, parse_category_names
+from lib.family_complexity import DEFAULT_TIME_BUDGET
+from lib.view_performance import DEFAULT_TOP_VIEWS
 
 
 class ExtendedAuditForm(Form):
@@ -24,10 +28,11 @@ class ExtendedAuditForm(Form):
         self.MinimizeBox = False
         self.StartPosition = FormStartPosition.CenterScreen
         self.BackColor = Color.LightGray
+        self.AutoScroll = True
 
         # Main layout panel
         main_layout = TableLayoutPanel()
-        main_layout.RowCount = 6
+        main_layout.RowCount = 7
         main_layout.ColumnCount = 1
         main_layout.AutoSize = True
         main_layout.AutoSizeMode = AutoSizeMode.GrowAndShrink
@@ -49,9 +54,13 @@ class ExtendedAuditForm(Form):
         view_group = self.create_view_section()
         main_layout.Controls.Add(view_group, 0, 3)
 
+        # Model checks section
+        model_checks_group = self.create_model_checks_section()
+        main_layout.Controls.Add(model_checks_group, 0, 4)
+
         # Buttons section
         button_panel = self.create_button_section()
-        main_layout.Controls.Add(button_panel, 0, 4)
+        main_layout.Controls.Add(button_panel, 0, 5)
 
         self.Controls.Add(main_layout)
         self.update_submit_button_state()
@@ -131,7 +140,7 @@ class ExtendedAuditForm(Form):
         group.AutoSizeMode = AutoSizeMode.GrowAndShrink
 
         layout = TableLayoutPanel()
-        layout.RowCount = 4
+        layout.RowCount = 5
         layout.ColumnCount = 2
         layout.AutoSize = True
 
@@ -161,6 +170,19 @@ class ExtendedAuditForm(Form):
         self.view_keyword_input.TextChanged += self.input_text_changed
         layout.Controls.Add(self.view_keyword_input, 1, 2)
 
+        self.workset_histogram_checkbox = CheckBox()
+        self.workset_histogram_checkbox.Text = "Element Histogram"
+        self.workset_histogram_checkbox.AutoSize = True
+        self.workset_histogram_checkbox.Checked = False
+        layout.Controls.Add(self.workset_histogram_checkbox, 0, 3)
+
+        self.workset_matrix_checkbox = CheckBox()
+        self.workset_matrix_checkbox.Text = "Visibility Matrix (all 3D views)"
+        self.workset_matrix_checkbox.AutoSize = True
+        self.workset_matrix_checkbox.Checked = False
+        layout.Controls.Add(self.workset_matrix_checkbox, 0, 4)
+        layout.SetColumnSpan(self.workset_matrix_checkbox, 2)
+
         group.Controls.Add(layout)
         return group
 
@@ -172,7 +194,7 @@ class ExtendedAuditForm(Form):
         group.AutoSizeMode = AutoSizeMode.GrowAndShrink
 
         layout = TableLayoutPanel()
-        layout.RowCount = 5
+        layout.RowCount = 7
         layout.ColumnCount = 2
         layout.AutoSize = True
 
@@ -225,6 +247,146 @@ class ExtendedAuditForm(Form):
         layout.Controls.Add(help_label, 0, 4)
         layout.SetColumnSpan(help_label, 2)
 
+        self.view_sample_checkbox = CheckBox()
+        self.view_sample_checkbox.Text = "Quick Scan (Sample)"
+        self.view_sample_checkbox.AutoSize = True
+        self.view_sample_checkbox.Checked = False
+        self.view_sample_checkbox.CheckedChanged += self.checkbox_changed
+        layout.Controls.Add(self.view_sample_checkbox, 0, 5)
+
+        self.view_sample_input = TextBox()
+        self.view_sample_input.Text = "10%"
+        self.view_sample_input.Size = Size(200, 20)
+        self.view_sample_input.TextChanged += self.input_text_changed
+        layout.Controls.Add(self.view_sample_input, 1, 5)
+
+        self.view_performance_checkbox = CheckBox()
+        self.view_performance_checkbox.Text = "Performance (Top Views)"
+        self.view_performance_checkbox.AutoSize = True
+        self.view_performance_checkbox.Checked = False
+        self.view_performance_checkbox.CheckedChanged += self.checkbox_changed
+        layout.Controls.Add(self.view_performance_checkbox, 0, 6)
+
+        self.view_performance_input = TextBox()
+        self.view_performance_input.Text = str(DEFAULT_TOP_VIEWS)
+        self.view_performance_input.Size = Size(60, 20)
+        self.view_performance_input.TextChanged += self.input_text_changed
+        layout.Controls.Add(self.view_performance_input, 1, 6)
+
+        group.Controls.Add(layout)
+        return group
+
+    def create_model_checks_section(self):
+        """Create the model checks settings section."""
+        group = GroupBox()
+        group.Text = "Model Checks"
+        group.AutoSize = True
+        group.AutoSizeMode = AutoSizeMode.GrowAndShrink
+
+        layout = TableLayoutPanel()
+        layout.RowCount = 10
+        layout.ColumnCount = 2
+        layout.AutoSize = True
+
+        self.enable_duplicates_checkbox = CheckBox()
+        self.enable_duplicates_checkbox.Text = "Duplicate Elements"
+        self.enable_duplicates_checkbox.AutoSize = True
+        self.enable_duplicates_checkbox.Checked = False
+        self.enable_duplicates_checkbox.CheckedChanged += self.checkbox_changed
+        layout.Controls.Add(self.enable_duplicates_checkbox, 0, 0)
+
+        self.enable_cross_duplicates_checkbox = CheckBox()
+        self.enable_cross_duplicates_checkbox.Text = "Cross-Model Duplicates"
+        self.enable_cross_duplicates_checkbox.AutoSize = True
+        self.enable_cross_duplicates_checkbox.Checked = False
+        self.enable_cross_duplicates_checkbox.CheckedChanged += self.checkbox_changed
+        layout.Controls.Add(self.enable_cross_duplicates_checkbox, 1, 0)
+
+        categories_label = Label()
+        categories_label.Text = "Categories:"
+        layout.Controls.Add(categories_label, 0, 1)
+
+        self.duplicate_categories_input = TextBox()
+        self.duplicate_categories_input.Text = DEFAULT_CATEGORIES
+        self.duplicate_categories_input.Size = Size(200, 40)
+        self.duplicate_categories_input.Multiline = True
+        self.duplicate_categories_input.TextChanged += self.input_text_changed
+        layout.Controls.Add(self.duplicate_categories_input, 1, 1)
+
+        duplicates_file_label = Label()
+        duplicates_file_label.Text = "Duplicates File:"
+        layout.Controls.Add(duplicates_file_label, 0, 2)
+
+        self.duplicates_file_input = TextBox()
+        self.duplicates_file_input.Text = "duplicate_elements.csv"
+        self.duplicates_file_input.Size = Size(200, 20)
+        self.duplicates_file_input.TextChanged += self.input_text_changed
+        layout.Controls.Add(self.duplicates_file_input, 1, 2)
+
+        cross_duplicates_file_label = Label()
+        cross_duplicates_file_label.Text = "Cross-Model File:"
+        layout.Controls.Add(cross_duplicates_file_label, 0, 3)
+
+        self.cross_duplicates_file_input = TextBox()
+        self.cross_duplicates_file_input.Text = "cross_model_duplicates.csv"
+        self.cross_duplicates_file_input.Size = Size(200, 20)
+        self.cross_duplicates_file_input.TextChanged += self.input_text_changed
+        layout.Controls.Add(self.cross_duplicates_file_input, 1, 3)
+
+        self.enable_extents_checkbox = CheckBox()
+        self.enable_extents_checkbox.Text = "Far From Origin"
+        self.enable_extents_checkbox.AutoSize = True
+        self.enable_extents_checkbox.Checked = False
+        self.enable_extents_checkbox.CheckedChanged += self.checkbox_changed
+        layout.Controls.Add(self.enable_extents_checkbox, 0, 4)
+
+        max_distance_label = Label()
+        max_distance_label.Text = "Max Distance (m):"
+        layout.Controls.Add(max_distance_label, 0, 5)
+
+        self.max_distance_input = TextBox()
+        self.max_distance_input.Text = "1000"
+        self.max_distance_input.Size = Size(60, 20)
+        self.max_distance_input.TextChanged += self.input_text_changed
+        layout.Controls.Add(self.max_distance_input, 1, 5)
+
+        extents_file_label = Label()
+        extents_file_label.Text = "Extents File:"
+        layout.Controls.Add(extents_file_label, 0, 6)
+
+        self.extents_file_input = TextBox()
+        self.extents_file_input.Text = "model_extents.csv"
+        self.extents_file_input.Size = Size(200, 20)
+        self.extents_file_input.TextChanged += self.input_text_changed
+        layout.Controls.Add(self.extents_file_input, 1, 6)
+
+        self.enable_families_checkbox = CheckBox()
+        self.enable_families_checkbox.Text = "Family Complexity"
+        self.enable_families_checkbox.AutoSize = True
+        self.enable_families_checkbox.Checked = False
+        self.enable_families_checkbox.CheckedChanged += self.checkbox_changed
+        layout.Controls.Add(self.enable_families_checkbox, 0, 7)
+
+        time_budget_label = Label()
+        time_budget_label.Text = "Time Budget (s):"
+        layout.Controls.Add(time_budget_label, 0, 8)
+
+        self.time_budget_input = TextBox()
+        self.time_budget_input.Text = str(DEFAULT_TIME_BUDGET)
+        self.time_budget_input.Size = Size(60, 20)
+        self.time_budget_input.TextChanged += self.input_text_changed
+        layout.Controls.Add(self.time_budget_input, 1, 8)
+
+        families_file_label = Label()
+        families_file_label.Text = "Families File:"
+        layout.Controls.Add(families_file_label, 0, 9)
+
+        self.families_file_input = TextBox()
+        self.families_file_input.Text = "family_complexity.csv"
+        self.families_file_input.Size = Size(200, 20)
+        self.families_file_input.TextChanged += self.input_text_changed
+        layout.Controls.Add(self.families_file_input, 1, 9)
+
         group.Controls.Add(layout)
         return group
 
@@ -277,7 +439,11 @@ class ExtendedAuditForm(Form):
         # Check if at least one audit type is enabled
         has_enabled_audit = (self.enable_basic_checkbox.Checked or 
                            self.enable_workset_checkbox.Checked or 
-                           self.enable_view_checkbox.Checked)
+                           self.enable_view_checkbox.Checked or
+                           self.enable_duplicates_checkbox.Checked or
+                           self.enable_cross_duplicates_checkbox.Checked or
+                           self.enable_extents_checkbox.Checked or
+                           self.enable_families_checkbox.Checked)
         
         # Check required fields for enabled audits
         basic_valid = True
@@ -294,9 +460,27 @@ class ExtendedAuditForm(Form):
         if self.enable_view_checkbox.Checked:
             view_valid = (self.view_file_input.Text.strip() != "" and
                          self.view_patterns_input.Text.strip() != "")
+            if self.view_sample_checkbox.Checked:
+                view_valid = view_valid and self.view_sample_input.Text.strip() != ""
+            if self.view_performance_checkbox.Checked:
+                view_valid = view_valid and self.view_performance_input.Text.strip() != ""
+        
+        model_checks_valid = True
+        if self.enable_duplicates_checkbox.Checked or self.enable_cross_duplicates_checkbox.Checked:
+            model_checks_valid = self.duplicate_categories_input.Text.strip() != ""
+        if self.enable_duplicates_checkbox.Checked:
+            model_checks_valid = model_checks_valid and self.duplicates_file_input.Text.strip() != ""
+        if self.enable_cross_duplicates_checkbox.Checked:
+            model_checks_valid = model_checks_valid and self.cross_duplicates_file_input.Text.strip() != ""
+        if self.enable_extents_checkbox.Checked:
+            model_checks_valid = (model_checks_valid and self.max_distance_input.Text.strip() != "" and
+                                  self.extents_file_input.Text.strip() != "")
+        if self.enable_families_checkbox.Checked:
+            model_checks_valid = (model_checks_valid and self.time_budget_input.Text.strip() != "" and
+                                  self.families_file_input.Text.strip() != "")
         
         self.submit_button.Enabled = (has_folder and has_enabled_audit and 
-                                    basic_valid and workset_valid and view_valid)
+                                    basic_valid and workset_valid and view_valid and model_checks_valid)
         
         logger.debug(f"Submit button enabled: {self.submit_button.Enabled}")
 
@@ -308,18 +492,11 @@ class ExtendedAuditForm(Form):
             patterns = [p.strip() for p in self.view_patterns_input.Text.split(';')]
             view_patterns = [p for p in patterns if p]  # Remove empty patterns
         
-        # Parse view types
+        # Parse view types into ViewType names; a custom selection is asked for once the
+        # documents are known
         view_types_selection = self.view_types_combo.SelectedItem
-        if view_types_selection == "All Views":
-            view_types = None
-        elif view_types_selection == "3D Views Only":
-            view_types = ["View3D"]
-        elif view_types_selection == "Plan Views Only":
-            view_types = ["ViewPlan"]
-        elif view_types_selection == "Section Views Only":
-            view_types = ["ViewSection"]
-        else:
-            view_types = None  # Default to all for custom selection
+        view_types_custom = view_types_selection == CUSTOM_SELECTION
+        view_types = VIEW_TYPE_PRESETS.get(view_types_selection)
         
         return {
             'output_dir': self.folder_path_label.Text,
@@ -333,12 +510,33 @@ class ExtendedAuditForm(Form):
             'enable_workset': self.enable_workset_checkbox.Checked,
             'workset_file_name': self.workset_file_input.Text.strip(),
             'view_keyword': self.view_keyword_input.Text.strip(),
+            # Count the elements of every workset by category
+            'workset_histogram': self.workset_histogram_checkbox.Checked,
+            # Visibility of every user workset in every 3D view, not only the keyword views
+            'workset_matrix': self.workset_matrix_checkbox.Checked,
             
             # View audit settings
             'enable_view': self.enable_view_checkbox.Checked,
             'view_file_name': self.view_file_input.Text.strip(),
             'view_patterns': view_patterns,
-            'view_types': view_types
+            'view_types': view_types,
+            'view_types_custom': view_types_custom,
+            # Sample size of the view quick scan ("10%" or a view count), None to audit every view
+            'view_sample': self.view_sample_input.Text.strip() if self.view_sample_checkbox.Checked else None,
+            'view_performance': self.view_performance_input.Text.strip() if self.view_performance_checkbox.Checked else None,
+            
+            # Model checks
+            'enable_duplicates': self.enable_duplicates_checkbox.Checked,
+            'duplicate_categories': parse_category_names(self.duplicate_categories_input.Text),
+            'duplicates_file_name': self.duplicates_file_input.Text.strip(),
+            'enable_cross_duplicates': self.enable_cross_duplicates_checkbox.Checked,
+            'cross_duplicates_file_name': self.cross_duplicates_file_input.Text.strip(),
+            'enable_extents': self.enable_extents_checkbox.Checked,
+            'extents_max_distance': self.max_distance_input.Text.strip(),
+            'extents_file_name': self.extents_file_input.Text.strip(),
+            'enable_families': self.enable_families_checkbox.Checked,
+            'families_time_budget': self.time_budget_input.Text.strip(),
+            'families_file_name': self.families_file_input.Text.strip()
         }
 
 
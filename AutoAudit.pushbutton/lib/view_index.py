@@ -0,0 +1,176 @@
+import clr
+from pyrevit import forms
+
+from __init__ import logger  # Import the logger from __init__.py
+
+clr.AddReference('RevitAPI')
+from Autodesk.Revit.DB import FilteredElementCollector, Viewport, ViewSheet, BuiltInParameter, ElementId
+
+from coordination_toolkit.session_cache import get_cached
+from coordination_toolkit.shared_collections import get_views, get_elements_of_class
+
+# ViewType names behind the view type options of the AutoAudit form
+VIEW_TYPE_PRESETS = {
+    "All Views": None,
+    "3D Views Only": ["ThreeD"],
+    "Plan Views Only": ["FloorPlan", "CeilingPlan", "EngineeringPlan", "AreaPlan"],
+    "Section Views Only": ["Section", "Elevation", "Detail"],
+}
+CUSTOM_SELECTION = "Custom Selection"
+
+# Browser and internal views are not views a user can audit
+SKIPPED_VIEW_TYPES = set(["ProjectBrowser", "SystemBrowser", "Internal", "Undefined"])
+
+
+def _read_phase(view):
+    param = view.get_Parameter(BuiltInParameter.VIEW_PHASE)
+    if param is None or not param.HasValue:
+        return "N/A"
+    return param.AsValueString() or "N/A"
+
+
+def _read_scale(view):
+    try:
+        return view.Scale
+    except Exception:
+        return "N/A"
+
+
+class ViewIndex(object):
+    """
+    Every view of a document with the details the view audit reports.
+
+    Built from one View collection and one Viewport pass, so filtering and reporting need no
+    further Revit calls per view. Records are dictionaries with the keys name, id,
+    view_type (a ViewType name), is_template, owner_id (the primary view of a dependent
+    view, None otherwise), scale, detail_level, phase, sheets, is_on_sheet and sheet_count.
+
+    Args:
+        revit_doc (Autodesk.Revit.DB.Document): The Revit document object.
+    """
+
+    def __init__(self, revit_doc):
+        self.records = []
+        self.by_type = {}
+        self.by_owner = {}
+        self.templates = []
+        sheets_by_view = self._sheets_by_view(revit_doc)
+        invalid_id = ElementId.InvalidElementId
+
+        for view in get_views(revit_doc):
+            try:
+                view_type = str(view.ViewType)
+                if view_type in SKIPPED_VIEW_TYPES:
+                    continue
+                view_id = view.Id.IntegerValue
+                primary_id = view.GetPrimaryViewId()
+                sheets = sheets_by_view.get(view_id, [])
+                record = {
+                    'name': view.Name,
+                    'id': view_id,
+                    'view_type': view_type,
+                    'is_template': view.IsTemplate,
+                    'owner_id': primary_id.IntegerValue if primary_id != invalid_id else None,
+                    'scale': _read_scale(view),
+                    'detail_level': str(view.DetailLevel),
+                    'phase': _read_phase(view),
+                    'sheets': sheets,
+                    'is_on_sheet': bool(sheets),
+                    'sheet_count': len(sheets)
+                }
+            except Exception as e:
+                logger.error(f"Error indexing view {view.Id}: {str(e)}")
+                continue
+
+            position = len(self.records)
+            self.records.append(record)
+            if record['is_template']:
+                self.templates.append(position)
+            else:
+                self.by_type.setdefault(view_type, []).append(position)
+            if record['owner_id'] is not None:
+                self.by_owner.setdefault(record['owner_id'], []).append(position)
+
+    @staticmethod
+    def _sheets_by_view(revit_doc):
+        sheet_names = {}
+        for sheet in get_elements_of_class(revit_doc, ViewSheet):
+            sheet_names[sheet.Id.IntegerValue] = f"{sheet.SheetNumber} - {sheet.Name}"
+        sheets_by_view = {}
+        for viewport in FilteredElementCollector(revit_doc).OfClass(Viewport):
+            sheet_name = sheet_names.get(viewport.SheetId.IntegerValue)
+            if sheet_name:
+                sheets_by_view.setdefault(viewport.ViewId.IntegerValue, []).append(sheet_name)
+        return sheets_by_view
+
+    def view_types(self):
+        """
+        Returns:
+            list: The ViewType names present among the non-template views, sorted.
+        """
+        return sorted(self.by_type)
+
+    def get_views(self, view_types=None, include_templates=False, owner_id=None):
+        """
+        Get view records by type, template status and owner.
+
+        Args:
+            view_types (iterable, optional): ViewType names to keep; None keeps every type.
+            include_templates (bool): Also return view templates.
+            owner_id (int, optional): Keep only the dependent views of this primary view.
+
+        Returns:
+            list: The matching view records, in collection order.
+        """
+        if view_types is None:
+            positions = [position for positions in self.by_type.values() for position in positions]
+        else:
+            positions = [position for view_type in view_types for position in self.by_type.get(view_type, [])]
+        if include_templates:
+            templates = self.templates
+            if view_types is not None:
+                wanted = set(view_types)
+                templates = [position for position in templates if self.records[position]['view_type'] in wanted]
+            positions.extend(templates)
+        if owner_id is not None:
+            owned = set(self.by_owner.get(owner_id, []))
+            positions = [position for position in positions if position in owned]
+        return [self.records[position] for position in sorted(positions)]
+
+
+def get_view_index(revit_doc):
+    """
+    Get the view index of a document, shared through the session cache.
+
+    Args:
+        revit_doc (Autodesk.Revit.DB.Document): The Revit document object.
+
+    Returns:
+        ViewIndex: The index of the document's views.
+    """
+    return get_cached(revit_doc, 'view_index', lambda: ViewIndex(revit_doc))
+
+
+def select_view_types(documents):
+    """
+    Ask for the view types to audit, offering the types present in the documents.
+
+    Args:
+        documents (list): The Revit documents to audit.
+
+    Returns:
+        list: The selected ViewType names, or None if the user cancelled.
+    """
+    available = set()
+    for revit_doc in documents:
+        available.update(get_view_index(revit_doc).view_types())
+    if not available:
+        forms.alert("No views were found in the documents.", title="View Audit")
+        return None
+    selected = forms.SelectFromList.show(
+        sorted(available),
+        title="Select View Types to Audit",
+        multiselect=True,
+        button_name="Select View Types"
+    )
+    return list(selected) if selected else None
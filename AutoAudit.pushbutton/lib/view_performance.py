@@ -0,0 +1,165 @@
+import clr
+import time
+
+from __init__ import logger  # Import the logger from __init__.py
+
+clr.AddReference('RevitAPI')
+from Autodesk.Revit.DB import FilteredElementCollector, BuiltInParameter, ImportInstance
+
+from coordination_toolkit.session_cache import get_cached
+from coordination_toolkit.shared_collections import get_views, get_elements_of_class, get_element_counts
+
+DEFAULT_TOP_VIEWS = 100
+TIME_BUDGET = 60  # seconds of view-scoped counting per run
+
+# Views that are not drawn from model geometry
+NON_GRAPHICAL_VIEW_TYPES = set(["Schedule", "PanelSchedule", "ColumnSchedule", "DrawingSheet", "Report",
+                                "CostReport", "LoadsReport", "PresureLossReport"])
+# How much model a view type usually shows, for ranking views before counting
+VIEW_TYPE_WEIGHTS = {
+    "ThreeD": 3, "Walkthrough": 3, "Rendering": 3,
+    "Section": 2, "Elevation": 2, "FloorPlan": 2, "CeilingPlan": 2, "EngineeringPlan": 2, "AreaPlan": 2,
+    "Detail": 1
+}
+
+FINE_DETAIL = 'Fine detail'
+FAR_CLIP_OFF = 'Far clip off'
+SHADOWS_ON = 'Shadows on'
+IMPORTS_VISIBLE = 'CAD imports visible'
+
+VIEW_PERFORMANCE_FIELDS = ['Document Name', 'View Name', 'View ID', 'View Type', 'Detail Level', 'Flags',
+                           'View-Specific Elements', 'Evaluated', 'Visible Elements', 'Visible Imports']
+
+
+def _parameter_value(view, parameter_name):
+    # Some parameters only exist on some view types or Revit versions
+    built_in = getattr(BuiltInParameter, parameter_name, None)
+    if built_in is None:
+        return None
+    param = view.get_Parameter(built_in)
+    if param is None or not param.HasValue:
+        return None
+    return param.AsInteger()
+
+
+def view_flags(view, record, has_imports):
+    """
+    Get the settings of a view that make it slow to draw.
+
+    Args:
+        view (Autodesk.Revit.DB.View): The view.
+        record (dict): Its view index record.
+        has_imports (bool): Whether the document contains CAD imports.
+
+    Returns:
+        list: FINE_DETAIL, FAR_CLIP_OFF, SHADOWS_ON and IMPORTS_VISIBLE, as they apply.
+    """
+    flags = []
+    if record['detail_level'] == 'Fine':
+        flags.append(FINE_DETAIL)
+    far_clipping = _parameter_value(view, 'VIEWER_BOUND_FAR_CLIPPING')
+    if far_clipping is None:
+        far_clipping = _parameter_value(view, 'VIEWER_BOUND_ACTIVE_FAR')
+    if far_clipping == 0:
+        flags.append(FAR_CLIP_OFF)
+    if _parameter_value(view, 'GRAPHIC_DISPLAY_OPTIONS_SHADOWS') == 1:
+        flags.append(SHADOWS_ON)
+    if has_imports and not view.AreImportCategoriesHidden:
+        flags.append(IMPORTS_VISIBLE)
+    return flags
+
+
+def count_view_specific_elements(revit_doc):
+    """
+    Count the view-specific elements (annotations, details, view-specific imports) of each
+    view, from the element pass shared with the other audits.
+
+    Returns:
+        dict: View ElementId integer to element count.
+    """
+    return get_element_counts(revit_doc)['by_owner_view']
+
+
+def count_visible_elements(revit_doc, view):
+    """
+    Count the elements and CAD imports visible in a view with a view-scoped collector,
+    cached per view for the session.
+
+    Returns:
+        tuple: (visible elements, visible imports)
+    """
+    def load():
+        visible = FilteredElementCollector(revit_doc, view.Id).WhereElementIsNotElementType().GetElementCount()
+        imports = FilteredElementCollector(revit_doc, view.Id).OfClass(ImportInstance).GetElementCount()
+        return visible, imports
+    return get_cached(revit_doc, f'view_visible_count:{view.Id.IntegerValue}', load)
+
+
+def collect_view_performance(revit_doc, doc_name, records, top_views=DEFAULT_TOP_VIEWS, deadline=None):
+    """
+    Estimate which views of a document are the most expensive to open.
+
+    Every view first gets cheap data: its slow settings and its view-specific element count
+    from one document pass. Views are ranked on that (view type, number of flags, then
+    view-specific elements) and only the top views get a view-scoped count of their
+    visible elements, until the deadline passes.
+
+    Args:
+        revit_doc (Autodesk.Revit.DB.Document): The Revit document object.
+        doc_name (str): The name of the document.
+        records (list): View index records of the views to audit.
+        top_views (int): Number of views to count the visible elements of.
+        deadline (float, optional): time.time() after which no more views are counted.
+
+    Returns:
+        list: Rows with the VIEW_PERFORMANCE_FIELDS keys, counted views first by visible
+              elements, then the other views in ranking order.
+    """
+    rows = []
+    try:
+        views = dict((view.Id.IntegerValue, view) for view in get_views(revit_doc))
+        has_imports = bool(get_elements_of_class(revit_doc, ImportInstance))
+        view_specific = count_view_specific_elements(revit_doc)
+
+        candidates = []
+        for record in records:
+            view = views.get(record['id'])
+            if view is None or record['is_template'] or record['view_type'] in NON_GRAPHICAL_VIEW_TYPES:
+                continue
+            try:
+                flags = view_flags(view, record, has_imports)
+            except Exception as e:
+                logger.error(f"Error reading the settings of view {record['name']}: {str(e)}")
+                flags = []
+            candidates.append((view, record, flags))
+        candidates.sort(key=lambda candidate: (-VIEW_TYPE_WEIGHTS.get(candidate[1]['view_type'], 0),
+                                               -len(candidate[2]), -view_specific.get(candidate[1]['id'], 0)))
+
+        counted = 0
+        for position, (view, record, flags) in enumerate(candidates):
+            row = {
+                'Document Name': doc_name,
+                'View Name': record['name'],
+                'View ID': record['id'],
+                'View Type': record['view_type'],
+                'Detail Level': record['detail_level'],
+                'Flags': '; '.join(flags),
+                'View-Specific Elements': view_specific.get(record['id'], 0),
+                'Evaluated': False,
+                'Visible Elements': '',
+                'Visible Imports': ''
+            }
+            if position < top_views and (deadline is None or time.time() <= deadline):
+                try:
+                    row['Visible Elements'], row['Visible Imports'] = count_visible_elements(revit_doc, view)
+                    row['Evaluated'] = True
+                    counted += 1
+                except Exception as e:
+                    logger.error(f"Error counting the elements of view {record['name']}: {str(e)}")
+            rows.append(row)
+        # Counted views by load; the rest keep their ranking order (sort is stable)
+        rows.sort(key=lambda row: (not row['Evaluated'], -row['Visible Elements'] if row['Evaluated'] else 0))
+        logger.info(f"View performance of {doc_name}: {len(rows)} views ranked, {counted} counted")
+    except Exception as e:
+        logger.error(f"Error collecting view performance from {doc_name}: {str(e)}")
+    return rows
@@ -0,0 +1,79 @@
+from __init__ import logger  # Import the logger from __init__.py
+
+from coordination_toolkit.shared_collections import get_worksets, get_element_counts
+
+HISTOGRAM_FIELDS = ['Document Name', 'Workset Name', 'Workset ID', 'Element Count', 'Category Count',
+                    'Top Categories', 'Is Empty', 'Is Open', 'Owner']
+CATEGORY_FIELDS = ['Document Name', 'Workset Name', 'Workset ID', 'Category', 'Element Count']
+NO_CATEGORY = "No Category"
+TOP_CATEGORIES = 3
+
+
+def count_elements_by_workset(revit_doc):
+    """
+    Count the elements of a document by workset and category, from the element pass shared
+    with the other audits.
+
+    Args:
+        revit_doc (Autodesk.Revit.DB.Document): The Revit document object.
+
+    Returns:
+        tuple: ({workset id: {category id: count}}, {category id: category name}), with
+               None as the category id of elements without a category.
+    """
+    counts = get_element_counts(revit_doc)
+    category_names = dict(counts['category_names'])
+    category_names[None] = NO_CATEGORY
+    return counts['by_workset'], category_names
+
+
+def collect_workset_histogram(revit_doc, doc_name):
+    """
+    Build the element histogram of every user workset of a document.
+
+    Elements are counted in one shared pass and joined with the workset listing, so empty
+    worksets are reported too. Elements on system worksets (views, families, project
+    standards) are not counted.
+
+    Args:
+        revit_doc (Autodesk.Revit.DB.Document): The Revit document object.
+        doc_name (str): The name of the document.
+
+    Returns:
+        tuple: (workset rows, category rows), empty for documents that are not workshared.
+    """
+    workset_rows = []
+    category_rows = []
+    try:
+        worksets = get_worksets(revit_doc)
+        if not worksets:
+            return workset_rows, category_rows
+
+        counts, category_names = count_elements_by_workset(revit_doc)
+        for workset in sorted(worksets, key=lambda ws: ws.Name):
+            by_category = counts.get(workset.Id.IntegerValue, {})
+            ranked = sorted(by_category.items(), key=lambda item: (-item[1], category_names[item[0]]))
+            total = sum(by_category.values())
+            workset_rows.append({
+                'Document Name': doc_name,
+                'Workset Name': workset.Name,
+                'Workset ID': workset.Id.IntegerValue,
+                'Element Count': total,
+                'Category Count': len(by_category),
+                'Top Categories': '; '.join(f"{category_names[category_id]} ({count})"
+                                            for category_id, count in ranked[:TOP_CATEGORIES]),
+                'Is Empty': total == 0,
+                'Is Open': workset.IsOpen,
+                'Owner': workset.Owner or "None"
+            })
+            for category_id, count in ranked:
+                category_rows.append({
+                    'Document Name': doc_name,
+                    'Workset Name': workset.Name,
+                    'Workset ID': workset.Id.IntegerValue,
+                    'Category': category_names[category_id],
+                    'Element Count': count
+                })
+    except Exception as e:
+        logger.error(f"Error building workset histogram for {doc_name}: {str(e)}")
+    return workset_rows, category_rows
@@ -0,0 +1,107 @@
+import clr
+
+from __init__ import logger  # Import the logger from __init__.py
+
+clr.AddReference('RevitAPI')
+from Autodesk.Revit.DB import View3D, WorksetVisibility
+
+from coordination_toolkit.shared_collections import get_views, get_worksets
+
+MATRIX_BASE_FIELDS = ['Document Name', 'View Name', 'View ID']
+SUMMARY_FIELDS = ['Document Name', 'View Name', 'View ID', 'Hidden Worksets', 'View Overrides', 'Hidden Workset Names']
+
+# Matrix cells: V = visible, H = hidden; * marks a setting made in the view itself
+# rather than the workset's global default
+VISIBLE = 'V'
+HIDDEN = 'H'
+OVERRIDE = '*'
+MATRIX_LEGEND = "V = visible, H = hidden, * = set in the view (otherwise the workset's global default)"
+
+
+def get_3d_views(revit_doc):
+    """
+    Get every 3D view of a document, templates excluded, ordered by name.
+
+    Args:
+        revit_doc (Autodesk.Revit.DB.Document): The Revit document object.
+
+    Returns:
+        list: The View3D objects.
+    """
+    views = [view for view in get_views(revit_doc) if isinstance(view, View3D) and not view.IsTemplate]
+    return sorted(views, key=lambda view: view.Name)
+
+
+def collect_visibility_matrix(revit_doc, doc_name):
+    """
+    Compute the visibility of every user workset in every 3D view of a document.
+
+    Views and worksets are read once; the per-cell visibility calls then run in a single
+    loop per view.
+
+    Args:
+        revit_doc (Autodesk.Revit.DB.Document): The Revit document object.
+        doc_name (str): The name of the document.
+
+    Returns:
+        tuple: (matrix rows, summary rows, workset names). Matrix rows have one column per
+               workset name; summary rows list the views that hide at least one workset.
+    """
+    matrix_rows = []
+    summary_rows = []
+    try:
+        worksets = sorted(get_worksets(revit_doc), key=lambda ws: ws.Name)
+        if not worksets:
+            return matrix_rows, summary_rows, []
+        views = get_3d_views(revit_doc)
+        workset_columns = [(workset.Id, workset.Name) for workset in worksets]
+        use_global = WorksetVisibility.UseGlobalSetting
+
+        for view in views:
+            try:
+                row = {'Document Name': doc_name, 'View Name': view.Name, 'View ID': view.Id.IntegerValue}
+                hidden = []
+                overrides = 0
+                for workset_id, workset_name in workset_columns:
+                    visible = view.IsWorksetVisible(workset_id)
+                    overridden = view.GetWorksetVisibility(workset_id) != use_global
+                    row[workset_name] = (VISIBLE if visible else HIDDEN) + (OVERRIDE if overridden else '')
+                    if not visible:
+                        hidden.append(workset_name)
+                    if overridden:
+                        overrides += 1
+                matrix_rows.append(row)
+                if hidden:
+                    summary_rows.append({
+                        'Document Name': doc_name,
+                        'View Name': view.Name,
+                        'View ID': view.Id.IntegerValue,
+                        'Hidden Worksets': len(hidden),
+                        'View Overrides': overrides,
+                        'Hidden Workset Names': '; '.join(hidden)
+                    })
+            except Exception as e:
+                logger.error(f"Error reading workset visibility of view {view.Name}: {str(e)}")
+        return matrix_rows, summary_rows, [workset_name for _, workset_name in workset_columns]
+    except Exception as e:
+        logger.error(f"Error building workset visibility matrix for {doc_name}: {str(e)}")
+        return matrix_rows, summary_rows, []
+
+
+def matrix_fieldnames(workset_names):
+    """
+    Get the matrix columns for the worksets of one or more documents.
+
+    Args:
+        workset_names (list): Workset names, repeated names are kept once in order.
+
+    Returns:
+        list: The fixed view columns followed by one column per workset.
+    """
+    fieldnames = list(MATRIX_BASE_FIELDS)
+    seen = set(fieldnames)
+    for name in workset_names:
+        if name not in seen:
+            seen.add(name)
+            fieldnames.append(name)
+    return fieldnames
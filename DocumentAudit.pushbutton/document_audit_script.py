@@ -8,78 +8,76 @@ import re
 clr.AddReference('RevitAPI')
 from Autodesk.Revit.DB import *
 
-from lib import (
-    GridAnalyzer,
-    LevelAnalyzer,
-    SurveyAnalyzer,
-    logger
-)
-from lib.ui import show_dialog, show_data_preview, show_coordinate_system_dialog
+from lib import logger
+from lib.ui import show_dialog, show_coordinate_system_dialog
 from lib.unit_utils import normalize_coordinate_system
+from lib.grid_matcher import (compare_grids, write_grid_comparison, MATCH,
+                              DEFAULT_OFFSET_TOLERANCE, DEFAULT_ANGLE_TOLERANCE)
+from lib.level_matcher import (compare_levels, write_level_comparison, DEFAULT_ELEVATION_TOLERANCE,
+                               MATRIX_LEGEND as LEVEL_MATRIX_LEGEND)
+from lib.coordinate_batch import (collect_grid_data_all_systems, collect_level_rows, document_columns,
+                                  get_audit_documents, grid_rows, row_key, COORDINATE_SYSTEMS, FEET_TO_MM)
+from lib.survey_consistency import (check_survey_consistency, collect_survey_rows, write_survey_consistency, INCONSISTENT,
+                                    DEFAULT_PLACEMENT_TOLERANCE, DEFAULT_ROTATION_TOLERANCE)
+from coordination_toolkit.preview import show_paged_preview
+from coordination_toolkit.row_source import RowSource
 from pyrevit import forms
 
 doc = __revit__.ActiveUIDocument.Document
 
+SINGLE_SYSTEM = 'One Coordinate System'
+ALL_SYSTEMS = 'All Coordinate Systems'
+
 def sanitize_filename(filename):
     """Sanitize filename for Windows compatibility"""
     filename = re.sub(r'[<>:"/\\|?*]', '_', filename)
     return filename.strip('. ')
 
+def index_by_document(rows):
+    """
+    Index level or survey rows by document path and link type id, keeping the first row of
+    each document. The host has no link type id and is keyed by its path, or its title while
+    unsaved, alone.
+    """
+    index = {}
+    for row in rows or []:
+        key = row_key(row)
+        if key in index:
+            logger.warning(f"Duplicate row for document {row['Document Name']}; keeping the first")
+            continue
+        index[key] = row
+    return index
+
 def combine_data_for_csv(grid_data, level_data, survey_data):
     """Combine all data into a single structured format"""
     combined_data = []
+    if not grid_data:
+        return combined_data
     
-    # Process host document
-    if grid_data and 'host_doc' in grid_data:
-        host_doc = grid_data['host_doc']
-        host_name = host_doc['name']
-        
-        # Find corresponding level and survey data
-        host_levels = next((data for data in level_data if data['Document Name'] == host_name), None)
-        host_survey = next((data for data in survey_data if data['Document Name'] == host_name), None)
-        
-        # Format True North to 3 decimal places if it's a number
-        true_north = host_survey['True North Angle'] if host_survey else 'No Data'
-        if true_north != 'No Data':
-            try:
-                true_north = f"{float(true_north):.3f}"
-            except (ValueError, TypeError):
-                pass
+    # One pass over the level and survey rows, then one lookup per document
+    levels_by_document = index_by_document(level_data)
+    survey_by_document = index_by_document(survey_data)
+    
+    documents = []
+    if 'host_doc' in grid_data:
+        documents.append(('Host', grid_data['host_doc']))
+    for link_data in grid_data.get('linked_docs', {}).values():
+        documents.append(('Linked', link_data))
+    
+    for document_type, doc_grid_data in documents:
+        doc_levels = levels_by_document.get(doc_grid_data['key'])
+        doc_survey = survey_by_document.get(doc_grid_data['key'])
         
-        combined_data.append({
-            'Document Name': host_name,
-            'Document Type': 'Host',
-            'Project Base Point': host_survey['Project Base Coordinate'] if host_survey else 'No Data',
-            'True North': true_north,
-            'Survey Point': host_survey['Survey Coordinate'] if host_survey else 'No Data',
-            'Level Data': host_levels['Level Data'] if host_levels else 'No Data',
-            'Grid Data': host_doc.get('grid_data', 'No Data'),
+        row = document_columns(doc_grid_data)
+        row.update({
+            'Document Type': document_type,
+            'Project Base Point': doc_survey['Project Base Point'] if doc_survey else 'No Data',
+            'True North': f"{doc_survey['True North']:.3f}" if doc_survey else 'No Data',
+            'Survey Point': doc_survey['Survey Point'] if doc_survey else 'No Data',
+            'Level Data': doc_levels['Level Data'] if doc_levels else 'No Data',
+            'Grid Data': doc_grid_data.get('grid_data', 'No Data'),
         })
-    
-    # Process linked documents
-    if grid_data and 'linked_docs' in grid_data:
-        for doc_name, link_data in grid_data['linked_docs'].items():
-            # Find corresponding level and survey data
-            link_levels = next((data for data in level_data if data['Document Name'] == doc_name), None)
-            link_survey = next((data for data in survey_data if data['Document Name'] == doc_name), None)
-            
-            # Format True North to 3 decimal places if it's a number
-            true_north = link_survey['True North Angle'] if link_survey else 'No Data'
-            if true_north != 'No Data':
-                try:
-                    true_north = f"{float(true_north):.3f}"
-                except (ValueError, TypeError):
-                    pass
-            
-            combined_data.append({
-                'Document Name': doc_name,
-                'Document Type': 'Linked',
-                'Project Base Point': link_survey['Project Base Coordinate'] if link_survey else 'No Data',
-                'True North': true_north,
-                'Survey Point': link_survey['Survey Coordinate'] if link_survey else 'No Data',
-                'Level Data': link_levels['Level Data'] if link_levels else 'No Data',
-                'Grid Data': link_data.get('grid_data', 'No Data'),
-            })
+        combined_data.append(row)
     
     return combined_data
 
@@ -89,6 +87,8 @@ def write_csv_data(data, filepath):
         # Define field order explicitly
         fieldnames = [
             'Document Name',
+            'Document Path',
+            'Link Type Id',
             'Document Type',
             'Project Base Point',
             'True North',
@@ -107,34 +107,132 @@ def write_csv_data(data, filepath):
         logger.error(f"Error writing CSV file {filepath}: {str(e)}")
         return False
 
+def ask_tolerances(title, prompts):
+    """Ask for matching tolerances, given (prompt, default) pairs; returns a tuple or None"""
+    tolerances = []
+    for prompt, default in prompts:
+        value = forms.ask_for_string(default=str(default), prompt=prompt, title=title)
+        if value is None:
+            return None
+        try:
+            tolerance = float(value)
+        except ValueError:
+            tolerance = -1
+        if tolerance <= 0:
+            forms.alert(f'Invalid tolerance: {value}', title=title,
+                        sub_msg='Enter a positive number.')
+            return None
+        tolerances.append(tolerance)
+    return tuple(tolerances)
+
+def get_link_elevation_offsets(host_doc):
+    """Get the elevation (mm) of each placed link's origin in the host, by its unique document name"""
+    return dict((record['name'], record['placement'][2][3] * FEET_TO_MM)
+                for record in get_audit_documents(host_doc) if not record['is_host'])
+
+def match_coordinate_system(label):
+    """Get the COORDINATE_SYSTEMS name of a coordinate system picked in the dialog, or None"""
+    wanted = normalize_coordinate_system(label)
+    return next((system for system in COORDINATE_SYSTEMS if normalize_coordinate_system(system) == wanted), None)
+
+def select_audit_mode():
+    """Ask whether to audit one coordinate system or all of them"""
+    return forms.CommandSwitchWindow.show(
+        [SINGLE_SYSTEM, ALL_SYSTEMS],
+        message='Audit grids in which coordinate systems?'
+    )
+
 def process_document():
     """Process the active document and its linked documents"""
     try:
-        # First, ask the user to select a coordinate system
-        coordinate_system = show_coordinate_system_dialog()
-        if not coordinate_system:
-            logger.info("Operation cancelled - no coordinate system selected")
+        # First, ask for one coordinate system or all of them
+        mode = select_audit_mode()
+        if not mode:
+            logger.info("Operation cancelled - no audit mode selected")
             return False
-            
-        logger.info(f"Selected coordinate system: {coordinate_system}")
         
-        # Initialize analyzers
-        grid_analyzer = GridAnalyzer(doc)
-        level_analyzer = LevelAnalyzer(doc)
-        survey_analyzer = SurveyAnalyzer(doc)
+        if mode == ALL_SYSTEMS:
+            # Raw grid geometry is collected once and transformed into every system in one batch
+            coordinate_systems = list(COORDINATE_SYSTEMS)
+            grid_data_by_system = collect_grid_data_all_systems(doc, COORDINATE_SYSTEMS)
+        else:
+            coordinate_system = show_coordinate_system_dialog()
+            if not coordinate_system:
+                logger.info("Operation cancelled - no coordinate system selected")
+                return False
+            system = match_coordinate_system(coordinate_system)
+            if not system:
+                logger.error(f"Unknown coordinate system: {coordinate_system}")
+                forms.alert(f'Unknown coordinate system: {coordinate_system}', title='Error')
+                return False
+            coordinate_systems = [system]
+            grid_data_by_system = collect_grid_data_all_systems(doc, (system,))
+        logger.info(f"Selected coordinate systems: {', '.join(coordinate_systems)}")
 
-        # Collect data using the selected coordinate system
-        grid_data = grid_analyzer.collect_all_grid_data(coordinate_system)
-        level_data = level_analyzer.collect_all_level_data()
-        survey_data = survey_analyzer.collect_all_survey_data()
+        # Levels and survey points do not depend on the coordinate system; collect them once
+        level_csv_data = collect_level_rows(doc)
+        survey_csv_data = collect_survey_rows(doc)
 
         # Format data for preview
-        grid_csv_data = grid_analyzer.format_for_csv(grid_data)
-        level_csv_data = level_analyzer.format_for_csv(level_data)
-        survey_csv_data = survey_analyzer.format_for_csv(survey_data)
+        preview_data = {}
+        for coordinate_system in coordinate_systems:
+            grids_label = 'Grids' if len(coordinate_systems) == 1 else f'Grids ({coordinate_system})'
+            preview_data[grids_label] = grid_rows(grid_data_by_system[coordinate_system])
+        preview_data['Levels'] = level_csv_data
+        preview_data['Survey Points'] = survey_csv_data
+
+        # Match every link's grids against the host grids in each coordinate system
+        grid_comparisons = {}
+        if any(grid_data and grid_data.get('linked_docs') for grid_data in grid_data_by_system.values()):
+            tolerances = ask_tolerances('Grid Comparison',
+                                        (('Grid offset tolerance (mm):', DEFAULT_OFFSET_TOLERANCE),
+                                         ('Grid angle tolerance (degrees):', DEFAULT_ANGLE_TOLERANCE)))
+            if not tolerances:
+                logger.info("Operation cancelled - no grid tolerances entered")
+                return False
+            for coordinate_system in coordinate_systems:
+                grid_comparison = compare_grids(grid_data_by_system[coordinate_system], *tolerances)
+                grid_comparisons[coordinate_system] = grid_comparison
+                issues = sum(1 for row in grid_comparison if row['Status'] != MATCH)
+                logger.info(f"Grid comparison ({coordinate_system}): {len(grid_comparison)} grids compared, {issues} issues")
+                comparison_label = 'Grid Comparison' if len(coordinate_systems) == 1 else f'Grid Comparison ({coordinate_system})'
+                preview_data[comparison_label] = grid_comparison
+
+        # Match every link's levels against the host levels by elevation
+        level_matrix, level_matrix_fields, level_exceptions = [], [], []
+        if len(level_csv_data) > 1:
+            tolerances = ask_tolerances('Level Comparison',
+                                        (('Level elevation tolerance (mm):', DEFAULT_ELEVATION_TOLERANCE),))
+            if not tolerances:
+                logger.info("Operation cancelled - no level tolerance entered")
+                return False
+            level_matrix, level_matrix_fields, level_exceptions = compare_levels(
+                level_csv_data, doc.Title, get_link_elevation_offsets(doc), tolerances[0])
+            logger.info(f"Level comparison: {len(level_matrix)} host levels, {len(level_exceptions)} exceptions")
+        preview_data['Level Matrix'] = RowSource(level_matrix, level_matrix_fields)
+        preview_data['Level Exceptions'] = level_exceptions
+
+        # Check every link instance's placement against the shared coordinates
+        survey_consistency = []
+        if len(survey_csv_data) > 1:
+            tolerances = ask_tolerances('Survey Consistency',
+                                        (('Link placement tolerance (mm):', DEFAULT_PLACEMENT_TOLERANCE),
+                                         ('Link rotation tolerance (degrees):', DEFAULT_ROTATION_TOLERANCE)))
+            if not tolerances:
+                logger.info("Operation cancelled - no survey tolerances entered")
+                return False
+            survey_consistency = check_survey_consistency(doc, *tolerances)
+        preview_data['Survey Consistency'] = survey_consistency
 
-        # Show preview with the selected coordinate system
-        preview_result = show_data_preview(grid_csv_data, level_csv_data, survey_csv_data, coordinate_system)
+        # Show a paged preview of the collected data
+        preview_result = show_paged_preview(
+            preview_data,
+            title=f'Document Audit Preview ({", ".join(coordinate_systems)})',
+            accept_label='Continue',
+            notes={'Level Matrix': f'Level matrix cells: {LEVEL_MATRIX_LEGEND}',
+                   'Survey Consistency': f'{sum(1 for row in survey_consistency if row["Status"] == INCONSISTENT)} '
+                                         f'inconsistent link instances; instances in small placement clusters are outliers'}
+        )
         if not preview_result:
             logger.info("Operation cancelled after preview")
             return False
@@ -150,28 +248,49 @@ def process_document():
         if not os.path.exists(output_dir):
             os.makedirs(output_dir)
 
-        # Combine and write data
-        combined_data = combine_data_for_csv(grid_data, level_csv_data, survey_csv_data)
-        
-        # Create filename with coordinate system indicator
-        coordinate_system = normalize_coordinate_system(coordinate_system)
-        combined_path = os.path.join(output_dir, f'document_audit_data_{coordinate_system}.csv')
+        # Combine and write data, one file per coordinate system; every file is attempted
+        # and the ones that fail are reported
+        written = []
+        failed = []
+        def record(exported, *paths):
+            (written if exported else failed).extend(paths)
+
+        for coordinate_system in coordinate_systems:
+            combined_data = combine_data_for_csv(grid_data_by_system[coordinate_system], level_csv_data, survey_csv_data)
+            
+            # Create filename with coordinate system indicator
+            file_system = normalize_coordinate_system(coordinate_system)
+            combined_path = os.path.join(output_dir, f'document_audit_data_{file_system}.csv')
+            record(write_csv_data(combined_data, combined_path), combined_path)
+            
+            if grid_comparisons.get(coordinate_system):
+                comparison_path = os.path.join(output_dir, f'grid_comparison_{file_system}.csv')
+                record(write_grid_comparison(grid_comparisons[coordinate_system], comparison_path), comparison_path)
+        if level_matrix:
+            matrix_path = os.path.join(output_dir, 'level_matrix.csv')
+            exceptions_path = os.path.join(output_dir, 'level_exceptions.csv')
+            record(write_level_comparison(level_matrix, level_matrix_fields, level_exceptions,
+                                          matrix_path, exceptions_path), matrix_path, exceptions_path)
+        if survey_consistency:
+            consistency_path = os.path.join(output_dir, 'survey_consistency.csv')
+            record(write_survey_consistency(survey_consistency, consistency_path), consistency_path)
         
-        if write_csv_data(combined_data, combined_path):
+        if not failed:
             forms.alert(
                 'Document audit completed successfully.',
                 title='Success',
-                sub_msg=f'Data has been exported to: {combined_path}'
+                sub_msg=f'Data has been exported to: {output_dir}'
             )
-            logger.info(f"Document audit completed successfully: {combined_path}")
+            logger.info(f"Document audit completed successfully: {', '.join(written)}")
             return True
         else:
+            failed_names = ', '.join(os.path.basename(path) for path in failed)
             forms.alert(
-                'Failed to export audit data.',
+                f'Failed to export {len(failed)} of {len(written) + len(failed)} audit files.',
                 title='Error',
-                sub_msg='Check the log file for details.'
+                sub_msg=f'Not written: {failed_names}\nCheck the log file for details.'
             )
-            logger.error("Failed to export audit data")
+            logger.error(f"Failed to export audit data: {', '.join(failed)}")
             return False
 
     except Exception as e:
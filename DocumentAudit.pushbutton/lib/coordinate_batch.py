@@ -0,0 +1,280 @@
+"""Documents, grid data in every coordinate system and levels of the host and its links"""
+
+import logging
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from coordination_toolkit.session_cache import get_cached, document_identity
+from coordination_toolkit.shared_collections import get_grids, get_levels, get_link_documents, get_base_points
+
+logger = logging.getLogger(__name__)
+
+FEET_TO_MM = 304.8
+COORDINATE_SYSTEMS = ('Internal', 'Project', 'Shared')
+
+
+def transform_matrix(transform):
+    """
+    Convert a Revit Transform into a 4x4 row-major matrix (nested lists).
+    """
+    basis_x, basis_y, basis_z, origin = transform.BasisX, transform.BasisY, transform.BasisZ, transform.Origin
+    return [
+        [basis_x.X, basis_y.X, basis_z.X, origin.X],
+        [basis_x.Y, basis_y.Y, basis_z.Y, origin.Y],
+        [basis_x.Z, basis_y.Z, basis_z.Z, origin.Z],
+        [0.0, 0.0, 0.0, 1.0]
+    ]
+
+
+def identity_matrix():
+    return [[1.0 if row == column else 0.0 for column in range(4)] for row in range(4)]
+
+
+def translation_matrix(x, y, z):
+    matrix = identity_matrix()
+    matrix[0][3], matrix[1][3], matrix[2][3] = x, y, z
+    return matrix
+
+
+def multiply(a, b):
+    """Multiply two 4x4 matrices given as nested lists."""
+    return [[sum(a[row][k] * b[k][column] for k in range(4)) for column in range(4)] for row in range(4)]
+
+
+def document_key(revit_doc, link_type_id=None):
+    """
+    Identify a document in the audit results: its path (its title while unsaved) and, for
+    links, the id of its link type, so links sharing a title stay apart.
+    """
+    return (document_identity(revit_doc), link_type_id)
+
+
+def _collect_placements(host_doc):
+    # The first instance of each link type places it, as in the single-system grid collection
+    placements = []
+    seen = set()
+    for link, link_doc in get_link_documents(host_doc)['instances']:
+        key = document_key(link_doc, link.GetTypeId().IntegerValue)
+        if key in seen:
+            continue
+        seen.add(key)
+        placements.append((key, link_doc, transform_matrix(link.GetTotalTransform())))
+    return placements
+
+
+def get_link_placements(host_doc):
+    """
+    Get the loaded links of a document with their total transforms, cached for the session.
+
+    Returns:
+        list: (document_key, link document, 4x4 matrix from link internal to host internal
+              coordinates), one per link type.
+    """
+    return get_cached(host_doc, 'link_placements', lambda: _collect_placements(host_doc))
+
+
+def get_audit_documents(host_doc):
+    """
+    Get the host and its placed links with the key and name they have in the audit results.
+
+    Names are document titles. A title shared by several links gets a counter, so no link
+    overwrites another in results keyed or labelled by name.
+
+    Returns:
+        list: Dictionaries with 'key' (document_key), 'name', 'document', 'is_host' and
+              'placement' (4x4 matrix into host internal coordinates), the host first.
+    """
+    documents = [{'key': document_key(host_doc), 'name': host_doc.Title, 'document': host_doc,
+                  'is_host': True, 'placement': identity_matrix()}]
+    names = set([host_doc.Title])
+    for key, link_doc, placement in get_link_placements(host_doc):
+        name = link_doc.Title
+        counter = 2
+        while name in names:
+            name = f"{link_doc.Title} ({counter})"
+            counter += 1
+        names.add(name)
+        documents.append({'key': key, 'name': name, 'document': link_doc, 'is_host': False, 'placement': placement})
+    return documents
+
+
+def document_columns(record):
+    """
+    Get the identity columns of an audit document's rows: its unique name, its path (its
+    title while unsaved) and, for links, its link type id. Takes a get_audit_documents
+    record or a grid data entry.
+    """
+    path, link_type_id = record['key']
+    return {'Document Name': record['name'], 'Document Path': path,
+            'Link Type Id': link_type_id if link_type_id is not None else ''}
+
+
+def row_key(row):
+    """Get the document_key of a row with the document_columns."""
+    return (row['Document Path'], row['Link Type Id'] if row['Link Type Id'] != '' else None)
+
+
+def get_system_matrices(host_doc):
+    """
+    Get the matrices taking host internal coordinates into each coordinate system.
+
+    Returns:
+        dict: Coordinate system name to a 4x4 matrix.
+    """
+    def load():
+        base_x, base_y, base_z = get_base_points(host_doc)['project']
+        shared = host_doc.ActiveProjectLocation.GetTotalTransform().Inverse
+        return {
+            'Internal': identity_matrix(),
+            'Project': translation_matrix(-base_x, -base_y, -base_z),
+            'Shared': transform_matrix(shared)
+        }
+    return get_cached(host_doc, 'coordinate_system_matrices', load)
+
+
+def collect_raw_grids(revit_doc):
+    """
+    Get the grid endpoints of a document in its own internal coordinates (feet).
+
+    Returns:
+        list: (grid name, (x1, y1, z1), (x2, y2, z2)) tuples.
+    """
+    grids = []
+    for grid in get_grids(revit_doc):
+        try:
+            curve = grid.Curve
+            start, end = curve.GetEndPoint(0), curve.GetEndPoint(1)
+            grids.append((grid.Name, (start.X, start.Y, start.Z), (end.X, end.Y, end.Z)))
+        except Exception as e:
+            logger.error(f"Error reading grid {grid.Id} in {revit_doc.Title}: {str(e)}")
+    return grids
+
+
+def transform_points(points, document_indices, matrices):
+    """
+    Apply every coordinate system's matrices to the points of all documents at once.
+
+    Args:
+        points (list): (x, y, z) points in their document's internal coordinates.
+        document_indices (list): The document index of each point.
+        matrices (list): Per coordinate system, the 4x4 matrix of each document.
+
+    Returns:
+        list: Per coordinate system, the transformed (x, y, z) points in mm.
+    """
+    if not points:
+        return [[] for _ in matrices]
+    if np is not None:
+        homogeneous = np.hstack((np.asarray(points, dtype=float), np.ones((len(points), 1))))
+        stacked = np.asarray(matrices, dtype=float)[:, np.asarray(document_indices)]
+        transformed = np.einsum('spij,pj->spi', stacked, homogeneous)[:, :, :3] * FEET_TO_MM
+        return transformed.tolist()
+    results = []
+    for system_matrices in matrices:
+        system_points = []
+        for point, document_index in zip(points, document_indices):
+            matrix = system_matrices[document_index]
+            system_points.append([
+                (matrix[row][0] * point[0] + matrix[row][1] * point[1] + matrix[row][2] * point[2] + matrix[row][3])
+                * FEET_TO_MM for row in range(3)])
+        results.append(system_points)
+    return results
+
+
+def format_grid(name, start, end):
+    return f"{name}: {start[0]:.2f},{start[1]:.2f},{start[2]:.2f}---{end[0]:.2f},{end[1]:.2f},{end[2]:.2f}"
+
+
+def collect_grid_data_all_systems(host_doc, coordinate_systems=COORDINATE_SYSTEMS):
+    """
+    Collect the grids of the host and its links in several coordinate systems at once.
+
+    Raw grid endpoints are read once per document; each link's transform and the host's
+    base point data are cached, and every endpoint is transformed into every system in
+    one batched matrix operation.
+
+    Args:
+        host_doc (Autodesk.Revit.DB.Document): The host document.
+        coordinate_systems (tuple): Names from COORDINATE_SYSTEMS.
+
+    Returns:
+        dict: Coordinate system name to grid data: 'host_doc' and 'linked_docs' (keyed by
+              document_key) entries with the document's unique 'name', its 'key' and its
+              'grid_data' ("GridName: x1,y1,z1---x2,y2,z2" lines in mm).
+    """
+    system_matrices = get_system_matrices(host_doc)
+    documents = get_audit_documents(host_doc)
+
+    names = []
+    points = []
+    document_indices = []
+    for document_index, record in enumerate(documents):
+        for name, start, end in collect_raw_grids(record['document']):
+            names.append((document_index, name))
+            points.extend((start, end))
+            document_indices.extend((document_index, document_index))
+
+    matrices = [[multiply(system_matrices[system], record['placement']) for record in documents]
+                for system in coordinate_systems]
+    transformed = transform_points(points, document_indices, matrices)
+
+    results = {}
+    for system, system_points in zip(coordinate_systems, transformed):
+        lines = [[] for _ in documents]
+        for grid_index, (document_index, name) in enumerate(names):
+            lines[document_index].append(format_grid(name, system_points[2 * grid_index], system_points[2 * grid_index + 1]))
+        grid_data = {'linked_docs': {}}
+        for document_index, record in enumerate(documents):
+            entry = {'name': record['name'], 'key': record['key'], 'grid_data': '\n'.join(lines[document_index])}
+            if record['is_host']:
+                grid_data['host_doc'] = entry
+            else:
+                grid_data['linked_docs'][record['key']] = entry
+        results[system] = grid_data
+    logger.info(f"Collected {len(names)} grids from {len(documents)} documents in {len(coordinate_systems)} coordinate systems")
+    return results
+
+
+def grid_rows(grid_data):
+    """
+    Get one preview row per document of collect_grid_data_all_systems output.
+
+    Returns:
+        list: Rows with the document_columns, 'Document Type', 'Grid Count' and 'Grid Data'.
+    """
+    entries = [('Host', grid_data['host_doc'])] if 'host_doc' in grid_data else []
+    entries.extend(('Linked', entry) for entry in grid_data.get('linked_docs', {}).values())
+    rows = []
+    for document_type, entry in entries:
+        row = document_columns(entry)
+        row['Document Type'] = document_type
+        row['Grid Count'] = len(entry['grid_data'].splitlines()) if entry['grid_data'] else 0
+        row['Grid Data'] = entry['grid_data']
+        rows.append(row)
+    return rows
+
+
+def collect_level_rows(host_doc):
+    """
+    Read the levels of the host and each placed link, in each document's own internal
+    coordinates.
+
+    Returns:
+        list: Rows with the document_columns and 'Level Data' ("LevelName: Elevation" lines,
+              elevations in mm).
+    """
+    rows = []
+    for record in get_audit_documents(host_doc):
+        lines = []
+        for level in get_levels(record['document']):
+            try:
+                lines.append(f"{level.Name}: {level.Elevation * FEET_TO_MM:.2f}")
+            except Exception as e:
+                logger.error(f"Error reading level {level.Id} in {record['name']}: {str(e)}")
+        row = document_columns(record)
+        row['Level Data'] = '\n'.join(lines)
+        rows.append(row)
+    return rows
@@ -0,0 +1,236 @@
+"""Grid comparison between the host and linked documents"""
+
+import csv
+import logging
+import math
+import re
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_OFFSET_TOLERANCE = 5.0  # mm, perpendicular distance between grid lines
+DEFAULT_ANGLE_TOLERANCE = 0.05  # degrees
+
+MATCH = 'Match'
+NAME_MISMATCH = 'Name Mismatch'
+MISALIGNED = 'Misaligned'
+MISSING = 'Missing in Link'
+EXTRA = 'Not in Host'
+
+COMPARISON_FIELDS = [
+    'Link Document',
+    'Link Grid',
+    'Host Grid',
+    'Status',
+    'Offset (mm)',
+    'Angle Difference (deg)'
+]
+
+_NUMBER = r'\s*([-+]?[\d.]+(?:[eE][-+]?\d+)?)\s*'
+GRID_PATTERN = re.compile(
+    r'([^\n;|]+?):' + _NUMBER + ',' + _NUMBER + ',' + _NUMBER + '---' + _NUMBER + ',' + _NUMBER + ',' + _NUMBER
+)
+
+
+def parse_grid_data(grid_text):
+    """
+    Parse a "Grid Data" cell into grid lines.
+
+    Args:
+        grid_text (str): Grids formatted as "GridName: x1,y1,z1---x2,y2,z2" (mm).
+
+    Returns:
+        list: Grid dictionaries with name, start, end, angle (direction in degrees,
+              in [0, 180)) and offset (signed perpendicular distance from the origin, mm).
+              Grids with coincident endpoints in plan are skipped.
+    """
+    grids = []
+    for match in GRID_PATTERN.finditer(grid_text or ''):
+        values = [float(value) for value in match.groups()[1:]]
+        start, end = tuple(values[:3]), tuple(values[3:])
+        dx, dy = end[0] - start[0], end[1] - start[1]
+        if math.hypot(dx, dy) < 1e-6:
+            logger.warning(f"Skipping grid {match.group(1).strip()} without a direction in plan")
+            continue
+        angle = math.degrees(math.atan2(dy, dx)) % 180.0
+        # Normal of the canonical direction; the offset is measured along it
+        radians = math.radians(angle)
+        offset = -math.sin(radians) * start[0] + math.cos(radians) * start[1]
+        grids.append({
+            'name': match.group(1).strip(),
+            'start': start,
+            'end': end,
+            'angle': angle,
+            'offset': offset
+        })
+    return grids
+
+
+def _angle_difference(a, b):
+    difference = abs(a - b) % 180.0
+    return min(difference, 180.0 - difference)
+
+
+def _offset_difference(host_grid, grid):
+    # Directions near 0 and 180 degrees are the same line with the normal flipped
+    offset = grid['offset']
+    if abs(host_grid['angle'] - grid['angle']) > 90.0:
+        offset = -offset
+    return abs(host_grid['offset'] - offset)
+
+
+class GridIndex(object):
+    """
+    Spatial hash of grid lines by direction and offset.
+
+    Lines land in buckets of one tolerance in angle and offset, so the candidates of a
+    line are found in its own and the neighbouring buckets instead of by comparing every
+    pair of grids.
+
+    Args:
+        grids (list): Grid dictionaries from parse_grid_data.
+        offset_tolerance (float): Maximum offset between matching lines (mm).
+        angle_tolerance (float): Maximum angle between matching lines (degrees).
+    """
+
+    def __init__(self, grids, offset_tolerance=DEFAULT_OFFSET_TOLERANCE, angle_tolerance=DEFAULT_ANGLE_TOLERANCE):
+        self.offset_tolerance = float(offset_tolerance)
+        self.angle_tolerance = float(angle_tolerance)
+        self.angle_bins = max(1, int(math.ceil(180.0 / self.angle_tolerance)))
+        self.buckets = {}
+        self.by_name = {}
+        for grid in grids:
+            self.buckets.setdefault(self._key(grid['angle'], grid['offset']), []).append(grid)
+            self.by_name.setdefault(grid['name'], grid)
+
+    def _key(self, angle, offset):
+        return (int(angle / self.angle_tolerance) % self.angle_bins,
+                int(math.floor(offset / self.offset_tolerance)))
+
+    def candidates(self, grid):
+        """
+        Get the indexed grids within tolerance of a grid line.
+
+        Returns:
+            list: (grid, offset difference, angle difference) tuples, closest first.
+        """
+        angle_bin, offset_bin = self._key(grid['angle'], grid['offset'])
+        found = []
+        seen = set()
+        for angle_step in (-1, 0, 1):
+            bin_index = angle_bin + angle_step
+            # Wrapping past 0/180 degrees flips the direction and so the offset sign
+            wrapped = bin_index < 0 or bin_index >= self.angle_bins
+            offset_key = offset_bin
+            if wrapped:
+                offset_key = int(math.floor(-grid['offset'] / self.offset_tolerance))
+            for offset_step in (-1, 0, 1):
+                for candidate in self.buckets.get((bin_index % self.angle_bins, offset_key + offset_step), ()):
+                    if id(candidate) in seen:
+                        continue
+                    seen.add(id(candidate))
+                    angle_difference = _angle_difference(candidate['angle'], grid['angle'])
+                    offset_difference = _offset_difference(candidate, grid)
+                    if angle_difference <= self.angle_tolerance and offset_difference <= self.offset_tolerance:
+                        found.append((candidate, offset_difference, angle_difference))
+        found.sort(key=lambda item: (item[1], item[2]))
+        return found
+
+
+def match_grids(host_grids, link_grids, link_name, offset_tolerance=DEFAULT_OFFSET_TOLERANCE,
+                angle_tolerance=DEFAULT_ANGLE_TOLERANCE, host_index=None):
+    """
+    Match the grids of one link against the host grids.
+
+    A link grid matches the host grid lying on the same line within the tolerances,
+    preferring the host grid of the same name. Matches with a different name are name
+    mismatches; a link grid off every host line but named like a host grid is misaligned
+    by the reported offset and angle.
+
+    Args:
+        host_grids (list): Host grid dictionaries from parse_grid_data.
+        link_grids (list): Link grid dictionaries, in the same coordinate system.
+        link_name (str): The name of the linked document.
+        offset_tolerance (float): Maximum offset between matching lines (mm).
+        angle_tolerance (float): Maximum angle between matching lines (degrees).
+        host_index (GridIndex, optional): A prebuilt index of the host grids.
+
+    Returns:
+        list: Comparison rows with the COMPARISON_FIELDS keys.
+    """
+    index = host_index or GridIndex(host_grids, offset_tolerance, angle_tolerance)
+    rows = []
+    matched_hosts = set()
+
+    for grid in link_grids:
+        candidates = index.candidates(grid)
+        same_name = [item for item in candidates if item[0]['name'] == grid['name']]
+        if same_name or candidates:
+            host_grid, offset_difference, angle_difference = (same_name or candidates)[0]
+            status = MATCH if host_grid['name'] == grid['name'] else NAME_MISMATCH
+        elif grid['name'] in index.by_name:
+            host_grid = index.by_name[grid['name']]
+            offset_difference = _offset_difference(host_grid, grid)
+            angle_difference = _angle_difference(host_grid['angle'], grid['angle'])
+            status = MISALIGNED
+        else:
+            rows.append(_comparison_row(link_name, grid['name'], '', EXTRA, None, None))
+            continue
+        matched_hosts.add(id(host_grid))
+        rows.append(_comparison_row(link_name, grid['name'], host_grid['name'], status,
+                                    offset_difference, angle_difference))
+
+    for host_grid in host_grids:
+        if id(host_grid) not in matched_hosts:
+            rows.append(_comparison_row(link_name, '', host_grid['name'], MISSING, None, None))
+    return rows
+
+
+def _comparison_row(link_name, link_grid, host_grid, status, offset_difference, angle_difference):
+    return {
+        'Link Document': link_name,
+        'Link Grid': link_grid,
+        'Host Grid': host_grid,
+        'Status': status,
+        'Offset (mm)': f"{offset_difference:.2f}" if offset_difference is not None else '',
+        'Angle Difference (deg)': f"{angle_difference:.4f}" if angle_difference is not None else ''
+    }
+
+
+def compare_grids(grid_data, offset_tolerance=DEFAULT_OFFSET_TOLERANCE, angle_tolerance=DEFAULT_ANGLE_TOLERANCE):
+    """
+    Compare the grids of every linked document with the host grids.
+
+    Args:
+        grid_data (dict): One coordinate system of collect_grid_data_all_systems output,
+            with every document's grids already placed in that system.
+        offset_tolerance (float): Maximum offset between matching lines (mm).
+        angle_tolerance (float): Maximum angle between matching lines (degrees).
+
+    Returns:
+        list: Comparison rows for every link, see match_grids.
+    """
+    if not grid_data or 'host_doc' not in grid_data:
+        return []
+    host_grids = parse_grid_data(grid_data['host_doc'].get('grid_data'))
+    # The host index is built once and shared by every link
+    host_index = GridIndex(host_grids, offset_tolerance, angle_tolerance)
+    rows = []
+    for link_key, link_data in grid_data.get('linked_docs', {}).items():
+        link_name = link_data.get('name', link_key)
+        link_grids = parse_grid_data(link_data.get('grid_data'))
+        rows.extend(match_grids(host_grids, link_grids, link_name, offset_tolerance, angle_tolerance, host_index))
+    return rows
+
+
+def write_grid_comparison(rows, filepath):
+    """Write grid comparison rows to a CSV file"""
+    try:
+        with open(filepath, 'w', newline='', encoding='utf-8') as csvfile:
+            csvfile.write('\ufeff')  # UTF-8 BOM for Excel
+            writer = csv.DictWriter(csvfile, fieldnames=COMPARISON_FIELDS)
+            writer.writeheader()
+            writer.writerows(rows)
+        return True
+    except Exception as e:
+        logger.error(f"Error writing grid comparison {filepath}: {str(e)}")
+        return False
@@ -0,0 +1,230 @@
+"""Level elevation comparison between the host and linked documents"""
+
+import bisect
+import csv
+import logging
+import re
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ELEVATION_TOLERANCE = 1.0  # mm
+
+OFFSET = 'Offset'
+RENAMED = 'Renamed'
+MISSING = 'Missing in Link'
+EXTRA = 'Not in Host'
+
+EXCEPTION_FIELDS = [
+    'Link Document',
+    'Link Level',
+    'Host Level',
+    'Issue',
+    'Link Elevation (mm)',
+    'Host Elevation (mm)',
+    'Difference (mm)'
+]
+MATRIX_BASE_FIELDS = ['Host Level', 'Host Elevation (mm)']
+# Matrix cells: the elevation difference of the link level matched to each host level,
+# prefixed with the link level's name when it is named differently
+MATRIX_LEGEND = ("elevation difference of the link level (mm), beyond the tolerance for offset levels; "
+                 "link level name shown when renamed; '-' = missing in the link")
+NO_MATCH = '-'
+
+LEVEL_PATTERN = re.compile(r'([^\n;|]+?):\s*([-+]?[\d.]+(?:[eE][-+]?\d+)?)')
+
+
+def parse_level_data(level_text):
+    """
+    Parse a "Level Data" cell.
+
+    Args:
+        level_text (str): Levels formatted as "LevelName: Elevation" (mm).
+
+    Returns:
+        tuple: (names, elevations) sorted by elevation; elevations is a NumPy array when
+               NumPy is available, a list otherwise.
+    """
+    levels = sorted(((float(elevation), name.strip()) for name, elevation in LEVEL_PATTERN.findall(level_text or '')))
+    names = [name for _, name in levels]
+    elevations = [elevation for elevation, _ in levels]
+    if np is not None:
+        elevations = np.array(elevations, dtype=float)
+    return names, elevations
+
+
+def nearest_levels(sorted_elevations, queries):
+    """
+    Find the nearest elevation of a sorted set for each query elevation.
+
+    Args:
+        sorted_elevations: Ascending elevations (array or list), not empty.
+        queries: Elevations to look up (array or list).
+
+    Returns:
+        tuple: (indices into sorted_elevations, signed differences query - nearest), as
+               lists.
+    """
+    if np is not None:
+        sorted_elevations = np.asarray(sorted_elevations, dtype=float)
+        queries = np.asarray(queries, dtype=float)
+        positions = np.searchsorted(sorted_elevations, queries)
+        below = np.clip(positions - 1, 0, len(sorted_elevations) - 1)
+        above = np.clip(positions, 0, len(sorted_elevations) - 1)
+        use_above = np.abs(sorted_elevations[above] - queries) < np.abs(queries - sorted_elevations[below])
+        indices = np.where(use_above, above, below)
+        return indices.tolist(), (queries - sorted_elevations[indices]).tolist()
+    indices = []
+    differences = []
+    last = len(sorted_elevations) - 1
+    for query in queries:
+        position = bisect.bisect_left(sorted_elevations, query)
+        below = min(max(position - 1, 0), last)
+        above = min(position, last)
+        index = above if abs(sorted_elevations[above] - query) < abs(query - sorted_elevations[below]) else below
+        indices.append(index)
+        differences.append(query - sorted_elevations[index])
+    return indices, differences
+
+
+def _exception(link_name, link_level, host_level, issue, link_elevation, host_elevation):
+    difference = link_elevation - host_elevation if None not in (link_elevation, host_elevation) else None
+    return {
+        'Link Document': link_name,
+        'Link Level': link_level,
+        'Host Level': host_level,
+        'Issue': issue,
+        'Link Elevation (mm)': f"{link_elevation:.1f}" if link_elevation is not None else '',
+        'Host Elevation (mm)': f"{host_elevation:.1f}" if host_elevation is not None else '',
+        'Difference (mm)': f"{difference:+.1f}" if difference is not None else ''
+    }
+
+
+def compare_link_levels(host_levels, link_levels, link_name, tolerance=DEFAULT_ELEVATION_TOLERANCE):
+    """
+    Match one link's levels against the host levels by nearest elevation.
+
+    A link level within tolerance of a host level matches it (renamed when the names
+    differ). Outside tolerance, a link level named like a host level is offset from it,
+    and any other link level is not in the host. Host levels no link level matches are
+    missing in the link.
+
+    Args:
+        host_levels (tuple): (names, elevations) from parse_level_data.
+        link_levels (tuple): (names, elevations) in the host's elevation basis.
+        link_name (str): The name of the linked document.
+        tolerance (float): Maximum elevation difference of matching levels (mm).
+
+    Returns:
+        tuple: (matrix column {host level index: cell}, exception rows)
+    """
+    host_names, host_elevations = host_levels
+    link_names, link_elevations = link_levels
+    column = {}
+    exceptions = []
+    if not len(host_names):
+        for name, elevation in zip(link_names, link_elevations):
+            exceptions.append(_exception(link_name, name, '', EXTRA, float(elevation), None))
+        return column, exceptions
+
+    host_by_name = dict((name, index) for index, name in enumerate(host_names))
+    matched = {}
+    if len(link_names):
+        indices, differences = nearest_levels(host_elevations, link_elevations)
+        for link_index, (host_index, difference) in enumerate(zip(indices, differences)):
+            name = link_names[link_index]
+            elevation = float(link_elevations[link_index])
+            if abs(difference) <= tolerance:
+                host_name = host_names[host_index]
+                # Keep the closest link level of each host level for the matrix
+                if host_index not in matched or abs(difference) < abs(matched[host_index][1]):
+                    matched[host_index] = (name, difference)
+                if name != host_name:
+                    exceptions.append(_exception(link_name, name, host_name, RENAMED,
+                                                 elevation, float(host_elevations[host_index])))
+            elif name in host_by_name:
+                host_index = host_by_name[name]
+                exceptions.append(_exception(link_name, name, name, OFFSET,
+                                             elevation, float(host_elevations[host_index])))
+                matched.setdefault(host_index, (name, elevation - float(host_elevations[host_index])))
+            else:
+                exceptions.append(_exception(link_name, name, '', EXTRA, elevation, None))
+
+    for host_index, host_name in enumerate(host_names):
+        if host_index not in matched:
+            column[host_index] = NO_MATCH
+            exceptions.append(_exception(link_name, '', host_name, MISSING,
+                                         None, float(host_elevations[host_index])))
+            continue
+        name, difference = matched[host_index]
+        cell = f"{difference:+.1f}"
+        column[host_index] = cell if name == host_name else f"{name} {cell}"
+    return column, exceptions
+
+
+def compare_levels(level_rows, host_name, elevation_offsets=None, tolerance=DEFAULT_ELEVATION_TOLERANCE):
+    """
+    Compare the levels of every linked document with the host levels.
+
+    Args:
+        level_rows (list): collect_level_rows rows ('Document Name', 'Level Data').
+        host_name (str): The document name of the host row.
+        elevation_offsets (dict, optional): Document name to the elevation (mm) of its
+            origin in the host, added to its levels to bring them into the host basis.
+        tolerance (float): Maximum elevation difference of matching levels (mm).
+
+    Returns:
+        tuple: (matrix rows, matrix fieldnames, exception rows). The matrix has one row per
+               host level and one column per link.
+    """
+    elevation_offsets = elevation_offsets or {}
+    host_row = next((row for row in level_rows if row['Document Name'] == host_name), None)
+    if host_row is None:
+        logger.warning(f"No level data for host document {host_name}")
+        return [], list(MATRIX_BASE_FIELDS), []
+    host_levels = parse_level_data(host_row['Level Data'])
+
+    fieldnames = list(MATRIX_BASE_FIELDS)
+    columns = []
+    exceptions = []
+    for row in level_rows:
+        link_name = row['Document Name']
+        if row is host_row:
+            continue
+        names, elevations = parse_level_data(row['Level Data'])
+        offset = elevation_offsets.get(link_name, 0.0)
+        if offset:
+            elevations = elevations + offset if np is not None else [elevation + offset for elevation in elevations]
+        column, link_exceptions = compare_link_levels(host_levels, (names, elevations), link_name, tolerance)
+        if link_name in fieldnames:
+            link_name = f"{link_name} ({len(fieldnames) - 1})"
+        fieldnames.append(link_name)
+        columns.append((link_name, column))
+        exceptions.extend(link_exceptions)
+
+    matrix = []
+    for host_index, host_level in enumerate(host_levels[0]):
+        matrix_row = {'Host Level': host_level, 'Host Elevation (mm)': f"{float(host_levels[1][host_index]):.1f}"}
+        for link_name, column in columns:
+            matrix_row[link_name] = column.get(host_index, NO_MATCH)
+        matrix.append(matrix_row)
+    return matrix, fieldnames, exceptions
+
+
+def write_level_comparison(matrix, fieldnames, exceptions, matrix_path, exceptions_path):
+    """Write the level matrix and the level exceptions to CSV files"""
+    try:
+        for path, columns, rows in ((matrix_path, fieldnames, matrix), (exceptions_path, EXCEPTION_FIELDS, exceptions)):
+            with open(path, 'w', newline='', encoding='utf-8') as csvfile:
+                csvfile.write('\ufeff')  # UTF-8 BOM for Excel
+                writer = csv.DictWriter(csvfile, fieldnames=columns)
+                writer.writeheader()
+                writer.writerows(rows)
+        return True
+    except Exception as e:
+        logger.error(f"Error writing level comparison: {str(e)}")
+        return False
@@ -0,0 +1,244 @@
+"""Shared-coordinate placement consistency of link instances"""
+
+import csv
+import logging
+import math
+
+import clr
+clr.AddReference('RevitAPI')
+from Autodesk.Revit.DB import XYZ
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from coordination_toolkit.session_cache import get_cached, document_identity
+from coordination_toolkit.shared_collections import get_link_documents, get_base_points
+from .coordinate_batch import transform_matrix, multiply, get_audit_documents, document_columns, FEET_TO_MM
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PLACEMENT_TOLERANCE = 10.0  # mm
+DEFAULT_ROTATION_TOLERANCE = 0.01  # degrees
+
+CONSISTENT = 'Consistent'
+INCONSISTENT = 'Inconsistent'
+
+CONSISTENCY_FIELDS = [
+    'Link Instance',
+    'Link Document',
+    'Instance ID',
+    'Status',
+    'Placement Offset (mm)',
+    'Offset X (mm)',
+    'Offset Y (mm)',
+    'Offset Z (mm)',
+    'Rotation Difference (deg)',
+    'Placement Cluster',
+    'Cluster Size',
+    'Survey Point X (mm)',
+    'Survey Point Y (mm)',
+    'Survey Point Z (mm)',
+    'True North (deg)'
+]
+
+
+def rigid_inverse(matrix):
+    """Invert a 4x4 matrix with an orthonormal basis (nested lists)."""
+    rotation = [[matrix[column][row] for column in range(3)] for row in range(3)]
+    translation = [-sum(rotation[row][k] * matrix[k][3] for k in range(3)) for row in range(3)]
+    return [rotation[0] + [translation[0]], rotation[1] + [translation[1]],
+            rotation[2] + [translation[2]], [0.0, 0.0, 0.0, 1.0]]
+
+
+def read_survey_data(revit_doc):
+    """
+    Get a document's survey data as numbers, cached for the session.
+
+    Returns:
+        dict: 'shared' (4x4 matrix from internal to shared coordinates), 'base_point' and
+              'survey_point' ((x, y, z) in mm) and 'true_north' (degrees).
+    """
+    def load():
+        location = revit_doc.ActiveProjectLocation
+        base_points = get_base_points(revit_doc)
+        return {
+            'shared': transform_matrix(location.GetTotalTransform().Inverse),
+            'base_point': tuple(value * FEET_TO_MM for value in base_points['project']),
+            'survey_point': tuple(value * FEET_TO_MM for value in base_points['survey']),
+            'true_north': math.degrees(location.GetProjectPosition(XYZ.Zero).Angle)
+        }
+    return get_cached(revit_doc, 'survey_data', load)
+
+
+def _try_read_survey_data(revit_doc, doc_name):
+    try:
+        return read_survey_data(revit_doc)
+    except Exception as e:
+        logger.error(f"Error reading the survey data of {doc_name}: {str(e)}")
+        return None
+
+
+def format_point(point):
+    return f"({point[0]:.2f},{point[1]:.2f},{point[2]:.2f})"
+
+
+def collect_survey_rows(host_doc):
+    """
+    Read the survey data of the host and each placed link for the preview and the combined
+    audit data. Documents whose survey data cannot be read are logged and left out.
+
+    Returns:
+        list: Rows with the document_columns, 'Project Base Point' and 'Survey Point'
+              ("(x,y,z)" in mm) and 'True North' (degrees, a number).
+    """
+    rows = []
+    for record in get_audit_documents(host_doc):
+        survey = _try_read_survey_data(record['document'], record['name'])
+        if survey is None:
+            continue
+        row = document_columns(record)
+        row.update({
+            'Project Base Point': format_point(survey['base_point']),
+            'Survey Point': format_point(survey['survey_point']),
+            'True North': round(survey['true_north'], 3)
+        })
+        rows.append(row)
+    return rows
+
+
+def placement_discrepancies(host_shared, placements, link_shared):
+    """
+    Compose every link instance's placement with the shared coordinates in one batch.
+
+    A link is consistently placed when the host's shared coordinates of the placed link
+    equal the link's own shared coordinates: host_shared . placement . link_shared^-1 is
+    the identity.
+
+    Args:
+        host_shared (list): Host 4x4 internal-to-shared matrix.
+        placements (list): Per instance, the 4x4 link-to-host total transform.
+        link_shared (list): Per instance, the link document's 4x4 internal-to-shared matrix.
+
+    Returns:
+        list: Per instance, (offset x, y, z in mm, rotation about Z in degrees).
+    """
+    if not placements:
+        return []
+    inverses = [rigid_inverse(matrix) for matrix in link_shared]
+    if np is not None:
+        discrepancies = np.matmul(np.matmul(np.asarray(host_shared, dtype=float), np.asarray(placements, dtype=float)),
+                                  np.asarray(inverses, dtype=float))
+        offsets = discrepancies[:, :3, 3] * FEET_TO_MM
+        rotations = np.degrees(np.arctan2(discrepancies[:, 1, 0], discrepancies[:, 0, 0]))
+        return [tuple(offset) + (rotation,) for offset, rotation in zip(offsets.tolist(), rotations.tolist())]
+    results = []
+    for placement, inverse in zip(placements, inverses):
+        discrepancy = multiply(multiply(host_shared, placement), inverse)
+        results.append((discrepancy[0][3] * FEET_TO_MM, discrepancy[1][3] * FEET_TO_MM, discrepancy[2][3] * FEET_TO_MM,
+                        math.degrees(math.atan2(discrepancy[1][0], discrepancy[0][0]))))
+    return results
+
+
+def cluster_placements(discrepancies, placement_tolerance, rotation_tolerance):
+    """
+    Group instances whose discrepancies agree within the tolerances.
+
+    Discrepancies are hashed onto a grid of one tolerance, so instances sharing the same
+    placement error (for example a model moved by the same amount) fall in one cluster.
+
+    Returns:
+        list: Per instance, (cluster number, cluster size). Cluster 1 is the largest.
+    """
+    keys = [(int(round(x / placement_tolerance)), int(round(y / placement_tolerance)),
+             int(round(z / placement_tolerance)), int(round(rotation / rotation_tolerance)))
+            for x, y, z, rotation in discrepancies]
+    sizes = {}
+    for key in keys:
+        sizes[key] = sizes.get(key, 0) + 1
+    ranked = sorted(sizes, key=lambda key: (-sizes[key], key))
+    numbers = dict((key, number) for number, key in enumerate(ranked, 1))
+    return [(numbers[key], sizes[key]) for key in keys]
+
+
+def _collect_instances(host_doc):
+    instances = []
+    survey_by_document = {}
+    for link, link_doc in get_link_documents(host_doc)['instances']:
+        # Survey data is read once per link document, however often it is placed
+        identity = document_identity(link_doc)
+        if identity not in survey_by_document:
+            survey_by_document[identity] = _try_read_survey_data(link_doc, link_doc.Title)
+        if survey_by_document[identity] is None:
+            continue
+        instances.append((link, link_doc, transform_matrix(link.GetTotalTransform())))
+    return instances, survey_by_document
+
+
+def check_survey_consistency(host_doc, placement_tolerance=DEFAULT_PLACEMENT_TOLERANCE,
+                             rotation_tolerance=DEFAULT_ROTATION_TOLERANCE):
+    """
+    Check every link instance's placement against the shared coordinates.
+
+    Args:
+        host_doc (Autodesk.Revit.DB.Document): The host document.
+        placement_tolerance (float): Maximum placement offset (mm).
+        rotation_tolerance (float): Maximum rotation difference (degrees).
+
+    Returns:
+        list: Rows with the CONSISTENCY_FIELDS keys, one per loaded link instance whose
+              survey data could be read.
+    """
+    instances, survey_by_document = _collect_instances(host_doc)
+    if not instances:
+        return []
+    host_survey = _try_read_survey_data(host_doc, host_doc.Title)
+    if host_survey is None:
+        return []
+    discrepancies = placement_discrepancies(
+        host_survey['shared'],
+        [placement for _, _, placement in instances],
+        [survey_by_document[document_identity(link_doc)]['shared'] for _, link_doc, _ in instances])
+    clusters = cluster_placements(discrepancies, placement_tolerance, rotation_tolerance)
+
+    rows = []
+    for (link, link_doc, _), (x, y, z, rotation), (cluster, size) in zip(instances, discrepancies, clusters):
+        survey = survey_by_document[document_identity(link_doc)]
+        offset = math.sqrt(x * x + y * y + z * z)
+        consistent = offset <= placement_tolerance and abs(rotation) <= rotation_tolerance
+        rows.append({
+            'Link Instance': link.Name,
+            'Link Document': link_doc.Title,
+            'Instance ID': link.Id.IntegerValue,
+            'Status': CONSISTENT if consistent else INCONSISTENT,
+            'Placement Offset (mm)': f"{offset:.1f}",
+            'Offset X (mm)': f"{x:.1f}",
+            'Offset Y (mm)': f"{y:.1f}",
+            'Offset Z (mm)': f"{z:.1f}",
+            'Rotation Difference (deg)': f"{rotation:.4f}",
+            'Placement Cluster': cluster,
+            'Cluster Size': size,
+            'Survey Point X (mm)': f"{survey['survey_point'][0]:.1f}",
+            'Survey Point Y (mm)': f"{survey['survey_point'][1]:.1f}",
+            'Survey Point Z (mm)': f"{survey['survey_point'][2]:.1f}",
+            'True North (deg)': f"{survey['true_north']:.3f}"
+        })
+    inconsistent = sum(1 for row in rows if row['Status'] == INCONSISTENT)
+    logger.info(f"Survey consistency: {len(rows)} link instances, {inconsistent} inconsistent, "
+                f"{len(set(cluster for cluster, _ in clusters))} placement clusters")
+    return rows
+
+
+def write_survey_consistency(rows, filepath):
+    """Write survey consistency rows to a CSV file"""
+    try:
+        with open(filepath, 'w', newline='', encoding='utf-8') as csvfile:
+            csvfile.write('\ufeff')  # UTF-8 BOM for Excel
+            writer = csv.DictWriter(csvfile, fieldnames=CONSISTENCY_FIELDS)
+            writer.writeheader()
+            writer.writerows(rows)
+        return True
+    except Exception as e:
+        logger.error(f"Error writing survey consistency {filepath}: {str(e)}")
+        return False
@@ -0,0 +1,50 @@
+"""Export benchmark: wide CSV against the long CSV, JSON Lines and SQLite formats.
+
+Runs outside Revit with plain CPython:
+
+    python benchmarks/export_benchmark.py --rows 500000 --columns 40
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from memory_benchmark import generate_rows, build_store
+from lib.exporters import write_wide_csv, write_long_csv, write_jsonl, write_sqlite
+
+
+def timed(label, write, paths):
+    start = time.time()
+    write()
+    elapsed = time.time() - start
+    size = sum(os.path.getsize(path) for path in paths)
+    print(f"{label:<22} {size / 1e6:10.1f} MB {elapsed:8.1f} s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--columns', type=int, default=40)
+    args = parser.parse_args()
+
+    store = build_store(generate_rows(args.rows, args.columns), args.columns)
+    directory = tempfile.mkdtemp()
+    try:
+        print(f"{args.rows} rows x {args.columns} columns")
+        wide_path = os.path.join(directory, 'model.csv')
+        timed("wide CSV", lambda: write_wide_csv(store, wide_path), [wide_path])
+        long_paths = [os.path.join(directory, f"model_{suffix}.csv")
+                      for suffix in ('long', 'values', 'parameters', 'elements')]
+        timed("long CSV + dictionary", lambda: write_long_csv(store, directory, 'model'), long_paths)
+        jsonl_path = os.path.join(directory, 'model.jsonl')
+        timed("JSON Lines", lambda: write_jsonl(store, jsonl_path), [jsonl_path])
+        sqlite_path = os.path.join(directory, 'model.sqlite')
+        timed("SQLite", lambda: write_sqlite({'model': store}, sqlite_path), [sqlite_path])
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""Memory benchmark: ParameterStore against the list-of-dictionaries export layout.
+
+Runs outside Revit with plain CPython:
+
+    python benchmarks/memory_benchmark.py --rows 500000 --columns 40
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+import types
+import uuid
+
+# Load the button's lib folder as a package without running lib/__init__.py, which needs Revit
+LIB_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'lib')
+if 'lib' not in sys.modules:
+    lib = types.ModuleType('lib')
+    lib.__path__ = [LIB_DIR]
+    sys.modules['lib'] = lib
+from lib.column_store import ParameterStore, TEXT, DOUBLE  # noqa: E402
+
+
+def generate_rows(row_count, column_count, seed=0):
+    """
+    Generate synthetic elements resembling a model export.
+
+    Text columns draw from small vocabularies (levels, types, worksets), every eighth column
+    is numeric and about a third of the cells are missing, as happens when parameters are
+    selected across several categories. Every text value is a fresh string, as returned by
+    the Revit API.
+    """
+    rng = random.Random(seed)
+    episode = str(uuid.UUID(int=rng.getrandbits(128)))
+    names = ["Parameter %d" % i for i in range(column_count)]
+    prefixes = ["Basic Wall: Generic - 200mm", "Level", "Workset", "Fire Rating", "Phase Created"]
+    vocabulary_sizes = [rng.choice([5, 20, 200]) for i in range(column_count)]
+    for row in range(row_count):
+        element_id = 100000 + row
+        cells = []
+        for i in range(column_count):
+            if rng.random() < 0.35:
+                cells.append((None, None))
+            elif i % 8 == 7:
+                cells.append((DOUBLE, round(rng.random() * 10000.0, 1)))
+            else:
+                value = "%s %d" % (prefixes[i % len(prefixes)], rng.randrange(vocabulary_sizes[i]))
+                cells.append((TEXT, value))
+        yield "%s-%08x" % (episode, element_id), element_id, names, cells
+
+
+def build_dicts(rows):
+    data = []
+    for guid, element_id, names, cells in rows:
+        element_data = {"GUID": guid, "ElementId": element_id}
+        for name, (kind, value) in zip(names, cells):
+            element_data[name] = "N/A" if kind is None else value
+        data.append(element_data)
+    return data
+
+
+def build_store(rows, column_count):
+    store = ParameterStore(["Parameter %d" % i for i in range(column_count)])
+    for guid, element_id, names, cells in rows:
+        store.append_row(guid, element_id, cells)
+    return store
+
+
+def measure(build):
+    tracemalloc.start()
+    start = time.time()
+    result = build()
+    elapsed = time.time() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current, peak, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--columns', type=int, default=40)
+    args = parser.parse_args()
+
+    data, dict_bytes, dict_peak, dict_time = measure(
+        lambda: build_dicts(generate_rows(args.rows, args.columns)))
+    del data
+    store, store_bytes, store_peak, store_time = measure(
+        lambda: build_store(generate_rows(args.rows, args.columns), args.columns))
+
+    print(f"{args.rows} rows x {args.columns} columns")
+    print(f"list of dicts:  {dict_bytes / 1e6:10.1f} MB retained, {dict_peak / 1e6:10.1f} MB peak, {dict_time:6.1f} s")
+    print(f"ParameterStore: {store_bytes / 1e6:10.1f} MB retained, {store_peak / 1e6:10.1f} MB peak, {store_time:6.1f} s")
+    print(f"reduction:      {dict_bytes / max(store_bytes, 1):10.1f}x")
+    assert len(store) == args.rows
+
+
+if __name__ == '__main__':
+    main()
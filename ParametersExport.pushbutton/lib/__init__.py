@@ -19,9 +19,11 @@ logger = logging.getLogger('ParameterExport')
 from .core_processing import (
     get_documents,
     get_model_categories,
+    get_category_census,
     get_category_parameters,
     get_parameter_values,
-    export_data_to_csv
+    export_data_to_csv,
+    export_data
 )
 
 from .warning import (
@@ -32,9 +34,11 @@ from .warning import (
 __all__ = [
     'get_documents',
     'get_model_categories',
+    'get_category_census',
     'get_category_parameters',
     'get_parameter_values',
     'export_data_to_csv',
+    'export_data',
     'load_xaml',
     'initialize_ui',
     'populate_list',
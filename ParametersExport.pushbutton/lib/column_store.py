@@ -0,0 +1,239 @@
+import math
+from array import array
+
+MISSING = "N/A"
+
+# Column kinds, one per Revit StorageType. Formatted values are stored as TEXT.
+DOUBLE = 'Double'
+INTEGER = 'Integer'
+TEXT = 'String'
+ELEMENT_ID = 'ElementId'
+
+MISSING_CODE = -1
+
+
+class Column(object):
+    """
+    A single parameter column.
+
+    Text values are dictionary-encoded: each distinct value is stored once and rows hold an
+    integer code into the dictionary. Doubles are stored in an array with NaN for missing
+    values, integers and element ids in an array with a presence mask. The kind is fixed by
+    the first value seen; if same-named parameters disagree on their kind the column is
+    re-encoded as text.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.kind = None
+        self.length = 0
+        self.codes = None
+        self.values = None
+        self.present = None
+        self.lookup = None
+        self.unit_type_id = None
+        self.unit_label = ""
+
+    def _start(self, kind):
+        self.kind = kind
+        if kind == DOUBLE:
+            self.values = array('d', [math.nan] * self.length)
+        elif kind in (INTEGER, ELEMENT_ID):
+            self.values = array('q', [0] * self.length)
+            self.present = bytearray(self.length)
+        else:
+            self.codes = array('i', [MISSING_CODE] * self.length)
+            self.values = []
+            self.lookup = {}
+
+    def _encode(self, value):
+        code = self.lookup.get(value)
+        if code is None:
+            code = len(self.values)
+            self.lookup[value] = code
+            self.values.append(value)
+        return code
+
+    def _promote_to_text(self):
+        old_values = [self.get(row) for row in range(self.length)]
+        self.present = None
+        self.unit_type_id = None
+        self.unit_label = ""
+        self._start(TEXT)
+        for row, value in enumerate(old_values):
+            if value != MISSING:
+                self.codes[row] = self._encode(str(value))
+
+    def append(self, kind, value):
+        """
+        Append one cell to the column.
+
+        Args:
+            kind (str): The kind of the value, or None for a missing value.
+            value: The value.
+        """
+        if kind is not None and self.kind is None:
+            self._start(kind)
+        elif kind is not None and kind != self.kind and self.kind != TEXT:
+            self._promote_to_text()
+
+        if self.kind == DOUBLE:
+            self.values.append(value if kind == DOUBLE else math.nan)
+        elif self.kind in (INTEGER, ELEMENT_ID):
+            self.values.append(value if kind == self.kind else 0)
+            self.present.append(1 if kind == self.kind else 0)
+        elif self.kind == TEXT:
+            if kind is None:
+                self.codes.append(MISSING_CODE)
+            else:
+                self.codes.append(self._encode(value if kind == TEXT or value is None else str(value)))
+        self.length += 1
+
+    def get(self, row):
+        """
+        Get the value of a row, MISSING if the element had no such parameter.
+        """
+        if self.kind == DOUBLE:
+            value = self.values[row]
+            return MISSING if math.isnan(value) else value
+        if self.kind in (INTEGER, ELEMENT_ID):
+            return self.values[row] if self.present[row] else MISSING
+        if self.kind == TEXT:
+            code = self.codes[row]
+            return MISSING if code == MISSING_CODE else self.values[code]
+        return MISSING
+
+
+class GuidColumn(object):
+    """
+    Element UniqueIds, stored as a dictionary-encoded episode GUID plus an integer suffix.
+
+    A Revit UniqueId is a 36 character episode GUID shared by every element created in the
+    same session, followed by the element id in 8 hex digits. Ids that do not round-trip
+    through this layout are kept whole in the dictionary.
+    """
+
+    def __init__(self):
+        self.prefix_codes = array('i')
+        self.suffixes = array('q')
+        self.prefixes = []
+        self.lookup = {}
+
+    def _encode(self, prefix):
+        code = self.lookup.get(prefix)
+        if code is None:
+            code = len(self.prefixes)
+            self.lookup[prefix] = code
+            self.prefixes.append(prefix)
+        return code
+
+    def append(self, unique_id):
+        suffix = -1
+        prefix = unique_id
+        if len(unique_id) == 45 and unique_id[36] == '-':
+            try:
+                suffix = int(unique_id[37:], 16)
+                if "%08x" % suffix == unique_id[37:]:
+                    prefix = unique_id[:36]
+                else:
+                    suffix = -1
+            except ValueError:
+                suffix = -1
+        self.prefix_codes.append(self._encode(prefix))
+        self.suffixes.append(suffix)
+
+    def __len__(self):
+        return len(self.suffixes)
+
+    def __getitem__(self, row):
+        prefix = self.prefixes[self.prefix_codes[row]]
+        suffix = self.suffixes[row]
+        if suffix < 0:
+            return prefix
+        return "%s-%08x" % (prefix, suffix)
+
+
+class ParameterStore(object):
+    """
+    Columnar store for the parameter values extracted from one document.
+
+    Holds array-backed GUID and ElementId columns and one Column per selected parameter.
+    Rows are materialised as dictionaries only when read, so the store can be handed to the
+    preview and to csv.DictWriter.writerows in place of a list of dictionaries.
+
+    A store filled from a quick-scan sample holds the StratifiedSample in sample and the
+    stratum of every row in sample_strata.
+    """
+
+    def __init__(self, parameter_names, raw=False, sample=None):
+        self.parameter_names = list(parameter_names)
+        self.raw = raw
+        self.sample = sample
+        self.sample_strata = []
+        self.guids = GuidColumn()
+        self.element_ids = array('q')
+        self.categories = Column('Category')
+        self.columns = {name: Column(name) for name in self.parameter_names}
+
+    def append_row(self, guid, element_id, cells, category=None):
+        """
+        Append one element.
+
+        Args:
+            guid (str): The element UniqueId.
+            element_id (int): The element id.
+            cells (list): (kind, value) tuples in the order of parameter_names, with kind
+                None for parameters the element does not have.
+            category (str, optional): The element's category name.
+        """
+        self.guids.append(guid)
+        self.element_ids.append(element_id)
+        self.categories.append(TEXT, category)
+        for name, (kind, value) in zip(self.parameter_names, cells):
+            self.columns[name].append(kind, value)
+
+    def unit_header(self):
+        """
+        Get the unit row written under the CSV header in raw mode.
+
+        Returns:
+            dict: Column name to unit label.
+        """
+        header = {'GUID': "", 'ElementId': ""}
+        for name, column in self.columns.items():
+            if column.unit_label:
+                header[name] = column.unit_label
+            elif column.kind == DOUBLE and column.unit_type_id is not None:
+                header[name] = "Internal units"
+            else:
+                header[name] = ""
+        return header
+
+    def value(self, index, name):
+        """Read one cell without building the whole row."""
+        if name == 'GUID':
+            return self.guids[index]
+        if name == 'ElementId':
+            return self.element_ids[index]
+        return self.columns[name].get(index)
+
+    def row(self, index):
+        row = {
+            "GUID": self.guids[index],
+            "ElementId": self.element_ids[index]
+        }
+        for name, column in self.columns.items():
+            row[name] = column.get(index)
+        return row
+
+    def __len__(self):
+        return len(self.element_ids)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self.row(index)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.row(i) for i in range(*index.indices(len(self)))]
+        return self.row(index)
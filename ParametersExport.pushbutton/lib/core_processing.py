@@ -1,11 +1,20 @@
-import clr, os, csv, re
+import clr, os, re
 from pyrevit import forms
 
 clr.AddReference('RevitAPI')
 clr.AddReference('System.Windows.Forms')
-from Autodesk.Revit.DB import FilteredElementCollector, RevitLinkInstance, CategoryType, BuiltInCategory
+from Autodesk.Revit.DB import FilteredElementCollector, CategoryType, ElementId, ElementType
 from System.Windows.Forms import FolderBrowserDialog, DialogResult
 
+from .column_store import TEXT
+from .raw_values import append_raw_element, parameters_by_name
+from .exporters import write_wide_csv, write_long_csv, write_jsonl, write_sqlite
+from .profiling import write_profile_report
+from .rules import evaluate_rules, write_violations
+from .sample_estimates import write_sample_estimates
+from coordination_toolkit.session_cache import get_cached, document_identity
+from coordination_toolkit.shared_collections import get_link_documents
+
 def get_documents(doc):
     """
     Retrieve the current document and linked documents.
@@ -15,20 +24,112 @@ def get_documents(doc):
         
     Returns:
         list: A list containing the current document and linked RevitLinkInstances documents.
+            Unloaded links are left out and a link placed several times appears once.
+    """
+    # Shared through the session cache with the other tools
+    return list(get_link_documents(doc)['documents'])
+
+def get_document_keys(documents):
+    """
+    Give every document a unique, readable key.
+
+    Documents are keyed by title. Documents sharing a title (e.g. two links named
+    "Structure" from different folders) get their folder name, then a counter, appended.
+
+    Args:
+        documents (list): A list of Revit documents.
+
+    Returns:
+        dict: document_identity(doc) to the document's key.
+    """
+    title_counts = {}
+    for identity, doc in dict((document_identity(doc), doc) for doc in documents).items():
+        title_counts[doc.Title] = title_counts.get(doc.Title, 0) + 1
+
+    keys = {}
+    used = set()
+    for doc in documents:
+        identity = document_identity(doc)
+        if identity in keys:
+            continue
+        key = doc.Title
+        if title_counts[doc.Title] > 1 and doc.PathName:
+            key = f"{doc.Title} ({os.path.basename(os.path.dirname(doc.PathName))})"
+        unique_key = key
+        counter = 2
+        while unique_key in used:
+            unique_key = f"{key} ({counter})"
+            counter += 1
+        used.add(unique_key)
+        keys[identity] = unique_key
+    return keys
+
+def get_category_census(documents):
+    """
+    Count the element instances of every model category of each document.
+
+    Each category is counted by Revit on a category-filtered collector, so no element is
+    opened in Python. Types are left out; the counts size the instances to extract.
+
+    Args:
+        documents (list): A list of Revit documents.
+
+    Returns:
+        dict: document_identity(doc) to a dictionary mapping the BuiltInCategory value of each
+              category (category.Id.IntegerValue) to its instance count.
+    """
+    census = {}
+    for doc in documents:
+        census[document_identity(doc)] = get_cached(doc, 'category_census', lambda: _count_categories(doc))
+    return census
+
+def _count_categories(doc):
+    counts = {}
+    for category in doc.Settings.Categories:
+        if category.CategoryType != CategoryType.Model:
+            continue
+        count = FilteredElementCollector(doc).OfCategoryId(category.Id).WhereElementIsNotElementType().GetElementCount()
+        if count:
+            counts[category.Id.IntegerValue] = count
+    return counts
+
+def get_category_count(census, doc, category):
+    """
+    Look up the element count of a category in a census.
+
+    Returns:
+        int: The number of elements, 0 if the category has none.
     """
-    linked_docs = []
-    linked_instances = FilteredElementCollector(doc).OfClass(RevitLinkInstance).ToElements()
-    linked_docs.append(doc)
-    for link_instance in linked_instances:
-        linked_docs.append(link_instance.GetLinkDocument())
-    return linked_docs
+    return census.get(document_identity(doc), {}).get(category.Id.IntegerValue, 0)
 
-def get_model_categories(documents):
+def estimate_extraction_cost(selected_categories, parameter_count, census):
+    """
+    Size the extraction of the selected scope before it starts.
+
+    Args:
+        selected_categories (dict): Category name to (document, Category) tuples.
+        parameter_count (int): Number of selected parameters.
+        census (dict): The result of get_category_census.
+
+    Returns:
+        dict: 'Elements' (upper bound of elements read), 'Values' (elements x parameters)
+              and 'Categories' (category name to its element count).
+    """
+    by_category = {}
+    for category_name, doc_category_pairs in selected_categories.items():
+        by_category[category_name] = sum(get_category_count(census, doc, category)
+                                         for doc, category in doc_category_pairs)
+    elements = sum(by_category.values())
+    return {'Elements': elements, 'Values': elements * parameter_count, 'Categories': by_category}
+
+def get_model_categories(documents, census=None):
     """
     Retrieve all categories of type Model from the given documents.
     
     Args:
         documents (list): A list of Revit documents.
+        census (dict, optional): The result of get_category_census. When given, categories
+            without elements in a document are left out for that document.
         
     Returns:
         dict: A dictionary mapping category names to (document, Category) tuples.
@@ -133,6 +234,8 @@ def get_model_categories(documents):
     for doc in documents:
         for category in doc.Settings.Categories:
             if category.CategoryType == CategoryType.Model and category.Name in desired_categories:
+                if census is not None and not get_category_count(census, doc, category):
+                    continue
                 if category.Name not in categories:
                     categories[category.Name] = []
                 categories[category.Name].append((doc, category))
@@ -149,13 +252,15 @@ def get_category_parameters(doc, category):
     Returns:
         set: A set of parameter names found within the elements of the specified category.
     """
-    parameters = set()
-    collector = FilteredElementCollector(doc).OfCategoryId(category.Id)
-    elements = collector.ToElements()
-    for elem in elements:
-        for param in elem.Parameters:
-            parameters.add(param.Definition.Name)
-    return parameters
+    def collect():
+        parameters = set()
+        collector = FilteredElementCollector(doc).OfCategoryId(category.Id)
+        elements = collector.ToElements()
+        for elem in elements:
+            for param in elem.Parameters:
+                parameters.add(param.Definition.Name)
+        return parameters
+    return set(get_cached(doc, f"category_parameters:{category.Id.IntegerValue}", collect))
 
 #    try:
 #        category = doc.Settings.Categories.get_Item(category_name)
@@ -175,62 +280,254 @@ def get_category_parameters(doc, category):
 #                    parameters.add(param.Definition.Name)
 #            return parameters
 
-def get_parameter_values(doc, category, parameter_names, data_by_document):
+def get_parameter_values(doc, category, data_by_document, raw=False, doc_key=None):
     """
-    Retrieve the values of specified parameters for elements in the given category.
+    Retrieve the parameter values of the elements in the given category.
     
     Args:
         doc: The Revit document.
-        category_name: The name of the category to filter elements by.
-        parameter_names (list): A list of parameter names to retrieve values for.
-        
-    Returns:
-        list: A list of dictionaries containing element IDs and parameter values.
+        category (Category): The category of the document to read the elements of.
+        data_by_document (dict): Document key to the ParameterStore the values are appended to.
+        raw (bool): Read typed values by StorageType instead of formatting them with AsValueString.
+        doc_key (str, optional): The document's key from get_document_keys; defaults to its title.
     """
+    store = data_by_document[doc_key or doc.Title]
     collector = FilteredElementCollector(doc).OfCategoryId(category.Id)
     elements = collector.ToElements()
     for elem in elements:
         if elem.LookupParameter('Family and Type') is not None:
-            element_data = {
-                "GUID": elem.UniqueId,
-                "ElementId": elem.Id.IntegerValue
-            }
-            for param_name in parameter_names:
-                param_value = next((param.AsValueString() for param in elem.Parameters if param.Definition.Name == param_name), "N/A")
-                element_data[param_name] = param_value
-            data_by_document[doc.Title].append(element_data)
+            append_element_values(store, elem, raw)
+
+def get_sampled_parameter_values(doc, categories, store, raw=False):
+    """
+    Retrieve parameter values for a stratified sample of the elements of a document.
+
+    Elements are collected for every category, grouped by category and type, and
+    store.sample draws from each group in proportion to its size. Only the drawn elements
+    have their parameters read.
+
+    Args:
+        doc: The Revit document.
+        categories (list): The selected Category objects of the document.
+        store (ParameterStore): The store the values are appended to; its sample attribute
+            holds the StratifiedSample.
+        raw (bool): Read typed values by StorageType instead of formatting them with AsValueString.
+    """
+    population = []
+    for category in categories:
+        for elem in FilteredElementCollector(doc).OfCategoryId(category.Id).ToElements():
+            if elem.LookupParameter('Family and Type') is not None:
+                population.append((category.Name, elem))
+
+    drawn = store.sample.draw(population, lambda item: (item[0], item[1].GetTypeId().IntegerValue))
+    for stratum, (category_name, elem) in drawn:
+        append_element_values(store, elem, raw)
+        store.sample_strata.append(stratum)
+
+def get_changed_parameter_values(doc, categories, element_ids, store, raw=False):
+    """
+    Retrieve parameter values for the changed elements of a document only.
+    
+    Elements outside the given categories are skipped. Changed element types are expanded to
+    their instances, since type parameter values are exported on every instance.
+    
+    Args:
+        doc: The Revit document.
+        categories (list): The selected Category objects of the document.
+        element_ids (iterable): Integer ids of the created or modified elements.
+        store (ParameterStore): The store the values are appended to.
+        raw (bool): Read typed values by StorageType instead of formatting them with AsValueString.
+    """
+    category_ids = set(category.Id.IntegerValue for category in categories)
+    changed_type_ids = set()
+    read_ids = set()
+    for id_value in element_ids:
+        elem = doc.GetElement(ElementId(id_value))
+        if elem is None:
+            continue
+        if isinstance(elem, ElementType):
+            changed_type_ids.add(id_value)
+            continue
+        if elem.Category is None or elem.Category.Id.IntegerValue not in category_ids:
+            continue
+        if elem.LookupParameter('Family and Type') is not None:
+            append_element_values(store, elem, raw)
+            read_ids.add(id_value)
+
+    if not changed_type_ids:
+        return
+    for category in categories:
+        collector = FilteredElementCollector(doc).OfCategoryId(category.Id).WhereElementIsNotElementType()
+        for elem in collector:
+            if elem.Id.IntegerValue in read_ids or elem.GetTypeId().IntegerValue not in changed_type_ids:
+                continue
+            if elem.LookupParameter('Family and Type') is not None:
+                append_element_values(store, elem, raw)
+                read_ids.add(elem.Id.IntegerValue)
+
+def append_element_values(store, elem, raw=False):
+    """
+    Read the store's parameters of a single element into the store.
+    
+    Args:
+        store (ParameterStore): The store of the element's document.
+        elem: The Revit element.
+        raw (bool): Read typed values by StorageType instead of formatting them with AsValueString.
+    """
+    if raw:
+        append_raw_element(store, elem)
+        return
+    params = parameters_by_name(elem)
+    cells = []
+    for param_name in store.parameter_names:
+        param = params.get(param_name)
+        if param is None:
+            cells.append((None, None))
+        else:
+            cells.append((TEXT, param.AsValueString()))
+    category = elem.Category.Name if elem.Category else None
+    store.append_row(elem.UniqueId, elem.Id.IntegerValue, cells, category)
+
+def select_export_directory(description):
+    """
+    Ask the user for an export folder.
+    
+    Args:
+        description (str): The text shown in the folder dialog.
+        
+    Returns:
+        str: The selected folder, or None if the dialog was cancelled.
+    """
+    dialog = FolderBrowserDialog()
+    dialog.Description = description
+    if dialog.ShowDialog() == DialogResult.OK:
+        return dialog.SelectedPath
+    return None
 
 def export_data_to_csv(data_by_document, selected_parameters):
     """
     Exports the data for each document into a CSV file, using the document title as the filename.
     
     Args:
-        data_by_document (dict): The dictionary containing all documents' data.
+        data_by_document (dict): Document title to the ParameterStore holding its data.
         selected_parameters (list): The list of selected parameters.
     """
     # Open a directory selection dialog
-    dialog = FolderBrowserDialog()
-    dialog.Description = "Select the folder where CSV files will be saved."
+    selected_directory = select_export_directory("Select the folder where CSV files will be saved.")
     
-    if dialog.ShowDialog() == DialogResult.OK:
-        selected_directory = dialog.SelectedPath
+    if selected_directory:
+        write_csv_files(data_by_document, selected_directory)
+
+def write_csv_files(data_by_document, selected_directory):
+    """
+    Writes one wide CSV file per document into a folder.
+    
+    Args:
+        data_by_document (dict): Document title to the ParameterStore holding its data.
+        selected_directory (str): The output folder.
+    """
+    # Iterate over each document's data and export to CSV
+    for doc_title, data in data_by_document.items():
+        # Generate a sanitized filename
+        sanitized_title = sanitise_filename(doc_title)
+        csv_filename = os.path.join(selected_directory, f"{sanitized_title}.csv")
         
-        # Iterate over each document's data and export to CSV
+        # Write data to CSV
+        try:
+            write_wide_csv(data, csv_filename)
+            forms.alert(f"Data for {doc_title} exported successfully!", title='Export Complete')
+        except Exception as e:
+            forms.alert(f"Failed to export data for {doc_title}: {e}", title='Export Error')
+
+def export_data(data_by_document, selected_parameters, export_format='csv', profile=True, rules=None):
+    """
+    Exports the data in the selected format.
+    
+    Args:
+        data_by_document (dict): Document title to the ParameterStore holding its data.
+        selected_parameters (list): The list of selected parameters.
+        export_format (str): 'csv' for one wide CSV per document, 'long_csv' for long CSVs with
+            value dictionaries, 'jsonl' for JSON Lines or 'sqlite' for one database covering
+            all documents.
+        profile (bool): Also write a <document>_profile.csv data-quality report per document.
+        rules (list, optional): Rules from rules.load_rules; violations are written to
+            <document>_rule_violations.csv.
+
+    Stores filled from a sample also get <document>_estimates.csv, scaling the fill rates
+    and rule compliance of the sample to the whole model with 95 % confidence intervals.
+    """
+    selected_directory = select_export_directory("Select the folder where the export files will be saved.")
+    if not selected_directory:
+        return
+
+    if export_format == 'csv':
+        write_csv_files(data_by_document, selected_directory)
+    elif export_format == 'sqlite':
+        db_filename = os.path.join(selected_directory, "parameters_export.sqlite")
+        try:
+            write_sqlite(data_by_document, db_filename)
+            forms.alert(f"Data for {len(data_by_document)} documents exported to {db_filename}", title='Export Complete')
+        except Exception as e:
+            forms.alert(f"Failed to export data: {e}", title='Export Error')
+    else:
         for doc_title, data in data_by_document.items():
-            # Generate a sanitized filename
             sanitized_title = sanitise_filename(doc_title)
-            csv_filename = os.path.join(selected_directory, f"{sanitized_title}.csv")
-            
-            # Write data to CSV
             try:
-                with open(csv_filename, 'w', newline='', encoding='utf-8') as csvfile:
-                    writer = csv.DictWriter(csvfile, fieldnames=['GUID', 'ElementId'] + selected_parameters)
-                    writer.writeheader()
-                    writer.writerows(data)
+                if export_format == 'long_csv':
+                    write_long_csv(data, selected_directory, sanitized_title)
+                else:
+                    write_jsonl(data, os.path.join(selected_directory, f"{sanitized_title}.jsonl"))
                 forms.alert(f"Data for {doc_title} exported successfully!", title='Export Complete')
             except Exception as e:
                 forms.alert(f"Failed to export data for {doc_title}: {e}", title='Export Error')
 
+    if profile:
+        for doc_title, data in data_by_document.items():
+            profile_filename = os.path.join(selected_directory, f"{sanitise_filename(doc_title)}_profile.csv")
+            try:
+                write_profile_report(data, profile_filename)
+            except Exception as e:
+                forms.alert(f"Failed to write the profile report for {doc_title}: {e}", title='Export Error')
+
+    violations_by_document = {}
+    if rules:
+        summary = []
+        for doc_title, data in data_by_document.items():
+            violations_filename = os.path.join(selected_directory, f"{sanitise_filename(doc_title)}_rule_violations.csv")
+            try:
+                violations, warnings = evaluate_rules(data, rules)
+                write_violations(violations, violations_filename)
+                violations_by_document[doc_title] = violations
+                summary.append(f"{doc_title}: {len(violations)} violations")
+                summary.extend(warnings)
+            except Exception as e:
+                forms.alert(f"Failed to check the rules for {doc_title}: {e}", title='Export Error')
+        if summary:
+            forms.alert('\n'.join(summary), title='Rule Check Complete')
+
+    for doc_title, data in data_by_document.items():
+        if data.sample is None:
+            continue
+        estimates_filename = os.path.join(selected_directory, f"{sanitise_filename(doc_title)}_estimates.csv")
+        try:
+            write_sample_estimates(data, estimates_filename, rules, violations_by_document.get(doc_title))
+        except Exception as e:
+            forms.alert(f"Failed to write the sample estimates for {doc_title}: {e}", title='Export Error')
+
+def sanitise_filename(filename):
+    """
+    Sanitizes a string to make it safe to use as a filename.
+    
+    Args:
+        filename (str): The filename to sanitize.
+        
+    Returns:
+        str: The sanitized filename.
+    """
+    # Replace any character that is not alphanumeric, a space, or a period
+    sanitized = re.sub(r'[^a-zA-Z0-9\s\._-]', '_', filename)
+    return sanitized.strip()
+
 def sanitise_filename(filename):
     """
     Sanitizes a string to make it safe to use as a filename.
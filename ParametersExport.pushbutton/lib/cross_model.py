@@ -0,0 +1,115 @@
+import csv
+
+from .column_store import MISSING
+
+# Join keys that are not parameters
+ELEMENT_KEYS = ('GUID', 'ElementId')
+
+
+def _key_values(store, key):
+    """Get the join key of every row of a store, as strings."""
+    if key == 'GUID':
+        return store.guids
+    if key == 'ElementId':
+        return [str(elem_id) for elem_id in store.element_ids]
+    column = store.columns[key]
+    return [str(column.get(row)) for row in range(len(store))]
+
+
+def build_key_index(data_by_document, key):
+    """
+    Index the rows of every document by a join key in one pass over each store.
+
+    Rows with an empty key are skipped. When a key repeats within a document the first row
+    is kept and the repeat is counted.
+
+    Args:
+        data_by_document (dict): Document key to ParameterStore.
+        key (str): 'GUID', 'ElementId' or a parameter name.
+
+    Returns:
+        tuple: ({key value: {document key: row}}, {document key: repeated key count})
+    """
+    index = {}
+    repeated = {}
+    for doc_key, store in data_by_document.items():
+        if key not in ELEMENT_KEYS and key not in store.columns:
+            continue
+        repeated[doc_key] = 0
+        for row, value in enumerate(_key_values(store, key)):
+            if value in ('', MISSING, 'None'):
+                continue
+            rows = index.setdefault(value, {})
+            if doc_key in rows:
+                repeated[doc_key] += 1
+            else:
+                rows[doc_key] = row
+    return index, repeated
+
+
+def comparison_fieldnames(doc_keys, parameters):
+    fieldnames = ['Key', 'Found In', 'Mismatches']
+    fieldnames += [f"ElementId [{doc_key}]" for doc_key in doc_keys]
+    for name in parameters:
+        fieldnames += [f"{name} [{doc_key}]" for doc_key in doc_keys]
+        fieldnames.append(f"{name} Match")
+    return fieldnames
+
+
+def compare_documents(data_by_document, key, parameters):
+    """
+    Hash-join the documents on a key and compare parameters side by side.
+
+    Linear in the total number of elements: each store is indexed once, then each key is
+    visited once.
+
+    Args:
+        data_by_document (dict): Document key to ParameterStore.
+        key (str): 'GUID', 'ElementId' or a parameter name shared by the documents.
+        parameters (list): The parameters to compare.
+
+    Yields:
+        dict: One row per key value with the comparison_fieldnames keys. A parameter's
+              Match column is 'Yes' if its value is equal in every document holding the key,
+              'No' otherwise and empty if only one document holds the key.
+    """
+    index, _ = build_key_index(data_by_document, key)
+    for value, rows in index.items():
+        result = {'Key': value, 'Found In': len(rows)}
+        for doc_key, row in rows.items():
+            result[f"ElementId [{doc_key}]"] = data_by_document[doc_key].element_ids[row]
+        mismatches = 0
+        for name in parameters:
+            values = set()
+            for doc_key, row in rows.items():
+                column = data_by_document[doc_key].columns.get(name)
+                cell = column.get(row) if column is not None else MISSING
+                result[f"{name} [{doc_key}]"] = cell
+                values.add(str(cell))
+            if len(rows) > 1:
+                match = len(values) == 1
+                result[f"{name} Match"] = 'Yes' if match else 'No'
+                mismatches += not match
+        result['Mismatches'] = mismatches
+        yield result
+
+
+def write_comparison(data_by_document, key, parameters, path):
+    """
+    Write the side-by-side comparison of the documents to a CSV file.
+
+    Returns:
+        dict: 'Keys' (rows written), 'Matched' (keys found in every document) and
+              'Mismatched' (keys with at least one differing parameter).
+    """
+    counts = {'Keys': 0, 'Matched': 0, 'Mismatched': 0}
+    document_count = len(data_by_document)
+    with open(path, 'w', newline='', encoding='utf-8') as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=comparison_fieldnames(list(data_by_document), parameters))
+        writer.writeheader()
+        for row in compare_documents(data_by_document, key, parameters):
+            writer.writerow(row)
+            counts['Keys'] += 1
+            counts['Matched'] += row['Found In'] == document_count
+            counts['Mismatched'] += row['Mismatches'] > 0
+    return counts
@@ -0,0 +1,295 @@
+import csv
+import json
+import os
+from itertools import islice
+
+try:
+    import sqlite3
+except ImportError:
+    sqlite3 = None
+
+from .column_store import TEXT, MISSING_CODE, MISSING
+
+BATCH_SIZE = 10000
+
+
+class ValueDictionary(object):
+    """Assigns one integer id to each distinct value written by an export."""
+
+    def __init__(self):
+        self.lookup = {}
+        self.values = []
+
+    def get_id(self, value):
+        # Key on the type as well, so that 1, 1.0 and "1" stay distinct values
+        key = (type(value), value)
+        value_id = self.lookup.get(key)
+        if value_id is None:
+            value_id = len(self.values)
+            self.lookup[key] = value_id
+            self.values.append(value)
+        return value_id
+
+
+def iter_value_ids(store, dictionary):
+    """
+    Stream the non-missing cells of a store as value ids.
+
+    Text columns are translated through their own dictionary once, so a cell costs one list
+    lookup instead of hashing the value. Numeric cells are hashed into the dictionary.
+
+    Args:
+        store (ParameterStore): The store to read.
+        dictionary (ValueDictionary): The dictionary the value ids refer to.
+
+    Yields:
+        tuple: (row, parameter index, value id)
+    """
+    text_maps = {}
+    for index, name in enumerate(store.parameter_names):
+        column = store.columns[name]
+        if column.kind == TEXT:
+            text_maps[index] = [dictionary.get_id("" if value is None else value) for value in column.values]
+
+    columns = [store.columns[name] for name in store.parameter_names]
+    for row in range(len(store)):
+        for index, column in enumerate(columns):
+            if index in text_maps:
+                code = column.codes[row]
+                if code != MISSING_CODE:
+                    yield row, index, text_maps[index][code]
+            else:
+                value = column.get(row)
+                if value != MISSING:
+                    yield row, index, dictionary.get_id(value)
+
+
+def write_wide_csv(store, path):
+    """
+    Write a store as a wide CSV, one row per element and one column per parameter.
+
+    In raw mode a unit row follows the header.
+
+    Args:
+        store (ParameterStore): The store to export.
+        path (str): The output file path.
+    """
+    with open(path, 'w', newline='', encoding='utf-8') as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=['GUID', 'ElementId'] + store.parameter_names)
+        writer.writeheader()
+        if store.raw:
+            writer.writerow(store.unit_header())
+        writer.writerows(store)
+
+
+def write_long_csv(store, directory, basename):
+    """
+    Write a store as a long (element, parameter, value) CSV with separate dictionaries.
+
+    Missing values are not written. Produces four files:
+        <basename>_long.csv        ElementId, ParameterId, ValueId
+        <basename>_values.csv      ValueId, Value
+        <basename>_parameters.csv  ParameterId, Parameter, Unit
+        <basename>_elements.csv    ElementId, GUID
+
+    Args:
+        store (ParameterStore): The store to export.
+        directory (str): The output directory.
+        basename (str): The sanitised file name prefix.
+
+    Returns:
+        list: The paths written.
+    """
+    dictionary = ValueDictionary()
+    element_ids = store.element_ids
+    paths = [os.path.join(directory, f"{basename}_{suffix}.csv")
+             for suffix in ('long', 'values', 'parameters', 'elements')]
+    long_path, values_path, parameters_path, elements_path = paths
+
+    with open(long_path, 'w', newline='', encoding='utf-8') as csvfile:
+        writer = csv.writer(csvfile, lineterminator='\n')
+        writer.writerow(['ElementId', 'ParameterId', 'ValueId'])
+        writer.writerows((element_ids[row], index, value_id)
+                         for row, index, value_id in iter_value_ids(store, dictionary))
+
+    with open(values_path, 'w', newline='', encoding='utf-8') as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(['ValueId', 'Value'])
+        writer.writerows(enumerate(dictionary.values))
+
+    unit_header = store.unit_header()
+    with open(parameters_path, 'w', newline='', encoding='utf-8') as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(['ParameterId', 'Parameter', 'Unit'])
+        writer.writerows((index, name, unit_header[name]) for index, name in enumerate(store.parameter_names))
+
+    with open(elements_path, 'w', newline='', encoding='utf-8') as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(['ElementId', 'GUID'])
+        writer.writerows((element_ids[row], store.guids[row]) for row in range(len(store)))
+
+    return paths
+
+
+def iter_value_id_rows(store, dictionary, size=BATCH_SIZE):
+    """
+    Stream the rows of a store in batches, with every cell as a value id.
+
+    Each batch is read column by column: text columns through their own dictionary as in
+    iter_value_ids, other columns cell by cell.
+
+    Args:
+        store (ParameterStore): The store to read.
+        dictionary (ValueDictionary): The dictionary the value ids refer to.
+        size (int): The number of rows per batch.
+
+    Yields:
+        list: (ElementId, GUID, value id, ...) tuples in the order of parameter_names, with
+              None for missing values.
+    """
+    text_maps = {}
+    for name in store.parameter_names:
+        column = store.columns[name]
+        if column.kind == TEXT:
+            # The trailing None is read by MISSING_CODE (-1)
+            text_maps[name] = [dictionary.get_id("" if value is None else value) for value in column.values] + [None]
+
+    for start in range(0, len(store), size):
+        stop = min(start + size, len(store))
+        columns = []
+        for name in store.parameter_names:
+            column = store.columns[name]
+            if name in text_maps:
+                value_ids = text_maps[name]
+                columns.append([value_ids[code] for code in column.codes[start:stop]])
+            else:
+                columns.append([None if value == MISSING else dictionary.get_id(value)
+                                for value in map(column.get, range(start, stop))])
+        guids = [store.guids[row] for row in range(start, stop)]
+        yield list(zip(store.element_ids[start:stop], guids, *columns))
+
+
+def write_jsonl(store, path):
+    """
+    Write a store as JSON Lines with a header line and one array per element.
+
+    The header object holds the column names, the distinct values of each text column
+    ("values", null for other columns) and, in raw mode, the column units. Every following
+    line is an array of one element's cells in the column order: text cells as their index
+    into the column's values, other cells as they are, and null for missing values. Names
+    and repeated text values are written once instead of on every line.
+
+    Args:
+        store (ParameterStore): The store to export.
+        path (str): The output file path.
+    """
+    columns = [store.columns[name] for name in store.parameter_names]
+    header = {
+        "columns": ['GUID', 'ElementId'] + store.parameter_names,
+        "values": [None, None] + [column.values if column.kind == TEXT else None for column in columns]
+    }
+    if store.raw:
+        unit_header = store.unit_header()
+        header["units"] = [unit_header[name] for name in header["columns"]]
+    encoder = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+    with open(path, 'w', encoding='utf-8') as jsonfile:
+        jsonfile.write(encoder.encode(header))
+        jsonfile.write('\n')
+        for row in range(len(store)):
+            cells = [store.guids[row], store.element_ids[row]]
+            for column in columns:
+                if column.kind == TEXT:
+                    code = column.codes[row]
+                    cells.append(None if code == MISSING_CODE else code)
+                else:
+                    value = column.get(row)
+                    cells.append(None if value == MISSING else value)
+            jsonfile.write(encoder.encode(cells))
+            jsonfile.write('\n')
+
+
+def _batches(rows, size=BATCH_SIZE):
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+SQLITE_SCHEMA = """
+CREATE TABLE documents (
+    document_id INTEGER PRIMARY KEY, title TEXT NOT NULL, table_name TEXT NOT NULL, view_name TEXT NOT NULL
+);
+CREATE TABLE parameters (
+    document_id INTEGER NOT NULL, parameter_id INTEGER NOT NULL, name TEXT NOT NULL, unit TEXT,
+    column_name TEXT NOT NULL,
+    PRIMARY KEY (document_id, parameter_id)
+);
+CREATE TABLE value_dictionary (value_id INTEGER PRIMARY KEY, value);
+"""
+
+
+def write_sqlite(data_by_document, path):
+    """
+    Write all documents into a single SQLite database.
+
+    Each document gets an elements_<n> table with one row per element, keyed on its
+    ElementId, holding the GUID and one value id column per parameter (p0, p1, ... as listed
+    in parameters). Every distinct value is stored once in value_dictionary. Rows are
+    inserted with executemany in batches inside one transaction, and the GUID index is
+    built once after loading. A document_<n> view per document joins the value ids back
+    into one readable column per parameter.
+
+    Args:
+        data_by_document (dict): Document title to ParameterStore.
+        path (str): The database file path. An existing file is replaced.
+    """
+    if sqlite3 is None:
+        raise RuntimeError("SQLite export is not available in this Python engine.")
+    if os.path.exists(path):
+        os.remove(path)
+
+    dictionary = ValueDictionary()
+    connection = sqlite3.connect(path)
+    try:
+        connection.execute("PRAGMA journal_mode = OFF")
+        connection.execute("PRAGMA synchronous = OFF")
+        connection.executescript(SQLITE_SCHEMA)
+        views = []
+        with connection:
+            for document_id, (doc_title, store) in enumerate(data_by_document.items()):
+                table_name = f"elements_{document_id}"
+                view_name = f"document_{document_id}"
+                connection.execute("INSERT INTO documents VALUES (?, ?, ?, ?)",
+                                   (document_id, doc_title, table_name, view_name))
+                unit_header = store.unit_header()
+                column_names = [f"p{index}" for index in range(len(store.parameter_names))]
+                connection.executemany(
+                    "INSERT INTO parameters VALUES (?, ?, ?, ?, ?)",
+                    [(document_id, index, name, unit_header[name], column_names[index])
+                     for index, name in enumerate(store.parameter_names)])
+
+                connection.execute(f"CREATE TABLE {table_name} (element_id INTEGER PRIMARY KEY, guid TEXT NOT NULL"
+                                   + "".join(f", {column} INTEGER" for column in column_names) + ")")
+                insert = f"INSERT INTO {table_name} VALUES ({', '.join(['?'] * (len(column_names) + 2))})"
+                known_values = len(dictionary.values)
+                for batch in iter_value_id_rows(store, dictionary):
+                    connection.executemany(insert, batch)
+
+                new_values = dictionary.values[known_values:]
+                for batch in _batches(enumerate(new_values, known_values)):
+                    connection.executemany("INSERT INTO value_dictionary VALUES (?, ?)", batch)
+
+                lookups = "".join(f",\n    (SELECT value FROM value_dictionary WHERE value_id = e.{column}) AS {_quote(name)}"
+                                  for column, name in zip(column_names, store.parameter_names))
+                views.append(f"CREATE INDEX idx_{table_name}_guid ON {table_name} (guid);\n"
+                             f"CREATE VIEW {view_name} AS SELECT e.guid AS GUID, e.element_id AS ElementId{lookups}\n"
+                             f"    FROM {table_name} e;")
+        connection.executescript("\n".join(views))
+    finally:
+        connection.close()
@@ -0,0 +1,281 @@
+import csv
+import hashlib
+import json
+import logging
+import os
+
+from .column_store import ParameterStore
+
+logger = logging.getLogger('ParametersExport')
+
+INDEX_VERSION = 1
+
+
+def row_hash(values):
+    """
+    Hash the parameter values of one element.
+
+    Args:
+        values (iterable): The element's values in parameter order.
+
+    Returns:
+        str: A short, stable hex digest.
+    """
+    return hashlib.blake2b(repr(tuple(values)).encode('utf-8'), digest_size=8).hexdigest()
+
+
+def store_hashes(store):
+    """
+    Hash every element of a store.
+
+    Returns:
+        dict: ElementId (as a string) to value hash.
+    """
+    hashes = {}
+    names = store.parameter_names
+    for index in range(len(store)):
+        row = store.row(index)
+        hashes[str(row['ElementId'])] = row_hash(row[name] for name in names)
+    return hashes
+
+
+def document_version_token(doc):
+    """
+    Get the version GUID of a document (Revit 2023+).
+
+    Args:
+        doc: The Revit document, or any object exposing the same API.
+
+    Returns:
+        str: The version GUID, or None if the Revit version does not track document versions.
+    """
+    try:
+        from Autodesk.Revit.DB import Document
+        version = Document.GetDocumentVersion(doc)
+    except Exception:
+        return None
+    if version is None:
+        return None
+    return str(version.VersionGUID)
+
+
+def get_changed_element_ids(doc, version_token):
+    """
+    Ask Revit which elements changed since a document version (Revit 2023+).
+
+    Args:
+        doc: The Revit document, or any object exposing GetChangedElements.
+        version_token (str): The version GUID stored by the previous export.
+
+    Returns:
+        tuple: (set of created or modified ElementIds as ints, set of deleted ElementIds as
+               ints), or None if Revit cannot report changes since that version.
+    """
+    if not version_token:
+        return None
+    try:
+        from System import Guid
+        changes = doc.GetChangedElements(Guid(version_token))
+    except Exception as e:
+        logger.info(f"Change tracking unavailable for {doc.Title}: {e}")
+        return None
+    changed = set(elem_id.IntegerValue for elem_id in changes.GetCreatedElementIds())
+    changed.update(elem_id.IntegerValue for elem_id in changes.GetModifiedElementIds())
+    deleted = set(elem_id.IntegerValue for elem_id in changes.GetDeletedElementIds())
+    return changed, deleted
+
+
+class ExportIndex(object):
+    """
+    Sidecar index of a previous export: element id to value hash plus the document version.
+
+    Stored next to the export as <export>.index.json. The index only matches a new run if it
+    was written for the same parameters and value mode.
+    """
+
+    def __init__(self, parameter_names, value_mode, version_token=None, hashes=None):
+        self.parameter_names = list(parameter_names)
+        self.value_mode = value_mode
+        self.version_token = version_token
+        self.hashes = hashes or {}
+
+    @staticmethod
+    def path_for(export_path):
+        return export_path + '.index.json'
+
+    @classmethod
+    def load(cls, export_path):
+        """
+        Load the index of an export.
+
+        Returns:
+            ExportIndex: The index, or None if the export or its index is missing or unreadable.
+        """
+        index_path = cls.path_for(export_path)
+        if not (os.path.exists(export_path) and os.path.exists(index_path)):
+            return None
+        try:
+            with open(index_path, 'r', encoding='utf-8') as index_file:
+                data = json.load(index_file)
+        except (IOError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable export index {index_path}: {e}")
+            return None
+        if data.get('index_version') != INDEX_VERSION:
+            return None
+        return cls(data['parameters'], data['value_mode'], data.get('version_token'), data['elements'])
+
+    def save(self, export_path):
+        with open(self.path_for(export_path), 'w', encoding='utf-8') as index_file:
+            json.dump({
+                'index_version': INDEX_VERSION,
+                'parameters': self.parameter_names,
+                'value_mode': self.value_mode,
+                'version_token': self.version_token,
+                'elements': self.hashes
+            }, index_file, separators=(',', ':'))
+
+    def matches(self, parameter_names, value_mode):
+        return self.parameter_names == list(parameter_names) and self.value_mode == value_mode
+
+    def diff(self, current_hashes):
+        """
+        Compare freshly computed hashes against the index.
+
+        Args:
+            current_hashes (dict): ElementId string to value hash for every current element.
+
+        Returns:
+            tuple: (set of ElementId strings that are new or changed, set of ElementId strings
+                   that no longer exist)
+        """
+        changed = set(elem_id for elem_id, value_hash in current_hashes.items()
+                      if self.hashes.get(elem_id) != value_hash)
+        deleted = set(self.hashes) - set(current_hashes)
+        return changed, deleted
+
+    def update(self, changed_hashes, deleted_ids, version_token):
+        for elem_id in deleted_ids:
+            self.hashes.pop(elem_id, None)
+        self.hashes.update(changed_hashes)
+        self.version_token = version_token
+
+
+def patch_csv(export_path, store, changed_ids, deleted_ids):
+    """
+    Patch a wide CSV export in place.
+
+    Rows of deleted elements are dropped, rows of changed elements are replaced by the rows
+    in the store, and elements missing from the file are appended. The file is rewritten
+    through a temporary file so an interrupted run leaves the previous export intact.
+
+    Args:
+        export_path (str): The previous export.
+        store (ParameterStore): Holds at least the rows of the changed elements.
+        changed_ids (set): ElementId strings of new or modified elements.
+        deleted_ids (set): ElementId strings of deleted elements.
+
+    Returns:
+        int: The number of rows written from the store.
+    """
+    new_rows = {}
+    for row in store:
+        elem_id = str(row['ElementId'])
+        if elem_id in changed_ids:
+            new_rows[elem_id] = row
+
+    fieldnames = ['GUID', 'ElementId'] + store.parameter_names
+    temp_path = export_path + '.tmp'
+    with open(export_path, 'r', newline='', encoding='utf-8') as old_file, \
+            open(temp_path, 'w', newline='', encoding='utf-8') as new_file:
+        reader = csv.DictReader(old_file)
+        writer = csv.DictWriter(new_file, fieldnames=fieldnames)
+        writer.writeheader()
+        if store.raw:
+            # Keep the unit row of the full export; the store may only hold a few rows
+            unit_row = next(reader, None)
+            if unit_row is not None:
+                writer.writerow(unit_row)
+        for row in reader:
+            elem_id = row['ElementId']
+            if elem_id in deleted_ids:
+                continue
+            writer.writerow(new_rows.pop(elem_id, row))
+        writer.writerows(new_rows.values())
+    os.replace(temp_path, export_path)
+    return len(changed_ids)
+
+
+class IncrementalExporter(object):
+    """
+    Keeps one document's wide CSV export up to date between runs.
+
+    The document is only used through read_elements, read_all and the two change tracking
+    helpers above, so the logic can be driven by fake documents.
+
+    Args:
+        doc: The Revit document.
+        export_path (str): The wide CSV export of the document.
+        parameter_names (list): The selected parameters.
+        value_mode (str): The selected value mode, stored to invalidate mismatching indexes.
+        raw (bool): Whether values are read raw.
+        read_all (callable): read_all(store) appends every selected element of the document.
+        read_elements (callable): read_elements(store, element_ids) appends the selected
+            elements among the given ints, including the instances of changed types.
+    """
+
+    def __init__(self, doc, export_path, parameter_names, value_mode, raw, read_all, read_elements):
+        self.doc = doc
+        self.export_path = export_path
+        self.parameter_names = list(parameter_names)
+        self.value_mode = value_mode
+        self.raw = raw
+        self.read_all = read_all
+        self.read_elements = read_elements
+
+    def new_store(self):
+        return ParameterStore(self.parameter_names, raw=self.raw)
+
+    def run(self, write_full):
+        """
+        Update the export.
+
+        Args:
+            write_full (callable): write_full(store, path) writes a complete export.
+
+        Returns:
+            str: A one line summary of what was done.
+        """
+        token = document_version_token(self.doc)
+        index = ExportIndex.load(self.export_path)
+        if index is None or not index.matches(self.parameter_names, self.value_mode):
+            store = self.new_store()
+            self.read_all(store)
+            write_full(store, self.export_path)
+            ExportIndex(self.parameter_names, self.value_mode, token, store_hashes(store)).save(self.export_path)
+            return f"full export of {len(store)} elements"
+
+        changes = get_changed_element_ids(self.doc, index.version_token)
+        if changes is not None:
+            changed, deleted = changes
+            store = self.new_store()
+            self.read_elements(store, changed)
+            changed_hashes = store_hashes(store)
+            deleted_ids = set(str(elem_id) for elem_id in deleted)
+            # Changed elements that are no longer exported (e.g. moved to another category)
+            deleted_ids.update(str(elem_id) for elem_id in changed
+                               if str(elem_id) in index.hashes and str(elem_id) not in changed_hashes)
+            changed_ids, _ = index.diff(changed_hashes)
+            method = "change tracking"
+        else:
+            store = self.new_store()
+            self.read_all(store)
+            changed_hashes = store_hashes(store)
+            changed_ids, deleted_ids = index.diff(changed_hashes)
+            method = "hash comparison"
+
+        deleted_ids = deleted_ids & set(index.hashes)
+        if changed_ids or deleted_ids:
+            patch_csv(self.export_path, store, changed_ids, deleted_ids)
+        index.update({elem_id: changed_hashes[elem_id] for elem_id in changed_ids}, deleted_ids, token)
+        index.save(self.export_path)
+        return f"{len(changed_ids)} changed and {len(deleted_ids)} deleted elements patched ({method})"
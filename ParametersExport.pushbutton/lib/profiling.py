@@ -0,0 +1,182 @@
+import csv
+import heapq
+import math
+from collections import Counter
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from .column_store import DOUBLE, INTEGER, ELEMENT_ID, TEXT, MISSING_CODE
+
+TOP_VALUES = 5
+HISTOGRAM_BINS = 10
+# Parameters expected to be unique within a category; their repeated values are reported
+UNIQUE_PARAMETERS = ('Mark',)
+
+PROFILE_FIELDNAMES = [
+    'Category', 'Parameter', 'Kind', 'Elements', 'Filled', 'Fill Rate', 'Distinct',
+    'Top Values', 'Duplicate Values', 'Elements With Duplicates', 'Min', 'Max', 'Mean',
+    'Histogram'
+]
+
+
+def category_groups(store):
+    """
+    Split the rows of a store by category in one pass.
+
+    Returns:
+        list: (category name, rows) tuples, where rows is an index array (NumPy) or a list.
+    """
+    column = store.categories
+    if column.codes is None:
+        return []
+    names = ["No Category" if name is None else name for name in column.values]
+    if np is not None:
+        codes = np.frombuffer(column.codes, dtype=np.int32)
+        order = np.argsort(codes, kind='stable')
+        bounds = np.cumsum(np.bincount(codes, minlength=len(names)))
+        starts = np.concatenate(([0], bounds[:-1]))
+        return [(names[code], order[starts[code]:bounds[code]])
+                for code in range(len(names)) if bounds[code] > starts[code]]
+    groups = {}
+    for row, code in enumerate(column.codes):
+        groups.setdefault(code, []).append(row)
+    return [(names[code], rows) for code, rows in sorted(groups.items())]
+
+
+def _code_counts(column, rows):
+    """
+    Count the dictionary codes of a text column over some rows.
+
+    Returns:
+        tuple: (missing count, {code: count})
+    """
+    if np is not None:
+        codes = np.frombuffer(column.codes, dtype=np.int32)[rows]
+        counts = np.bincount(codes + 1, minlength=len(column.values) + 1)
+        present = np.nonzero(counts[1:])[0]
+        return int(counts[0]), dict(zip(present.tolist(), counts[1:][present].tolist()))
+    counts = Counter(column.codes[row] for row in rows)
+    missing = counts.pop(MISSING_CODE, 0)
+    return missing, counts
+
+
+def _numeric_values(column, rows):
+    """
+    Get the present values of a numeric column over some rows.
+
+    Returns:
+        The values as a NumPy array, or a list without NumPy.
+    """
+    if np is not None:
+        if column.kind == DOUBLE:
+            values = np.frombuffer(column.values, dtype=np.float64)[rows]
+            return values[~np.isnan(values)]
+        values = np.frombuffer(column.values, dtype=np.int64)[rows]
+        present = np.frombuffer(column.present, dtype=np.uint8)[rows].astype(bool)
+        return values[present]
+    if column.kind == DOUBLE:
+        return [column.values[row] for row in rows if not math.isnan(column.values[row])]
+    return [column.values[row] for row in rows if column.present[row]]
+
+
+def _value_counts(values):
+    """Count distinct numeric values, returning {value: count}."""
+    if np is not None:
+        unique, counts = np.unique(values, return_counts=True)
+        return dict(zip(unique.tolist(), counts.tolist()))
+    return Counter(values)
+
+
+def _histogram(values, bins=HISTOGRAM_BINS):
+    """Equal-width histogram between min and max, as counts joined by '|'."""
+    if np is not None:
+        counts, _ = np.histogram(values, bins=bins)
+        return '|'.join(str(count) for count in counts.tolist())
+    low, high = min(values), max(values)
+    counts = [0] * bins
+    width = (high - low) / bins
+    for value in values:
+        index = bins - 1 if width == 0 else min(int((value - low) / width), bins - 1)
+        counts[index] += 1
+    return '|'.join(str(count) for count in counts)
+
+
+def _format_top(value_counts):
+    top = heapq.nlargest(TOP_VALUES, value_counts.items(), key=lambda item: item[1])
+    return '; '.join(f"{value} ({count})" for value, count in top)
+
+
+def profile_column(column, rows, row_count):
+    """
+    Compute the statistics of one parameter within one category.
+
+    Args:
+        column (Column): The parameter column.
+        rows: Row indices of the category.
+        row_count (int): Number of rows of the category.
+
+    Returns:
+        dict: One profile row.
+    """
+    profile = {'Parameter': column.name, 'Kind': column.kind or '', 'Elements': row_count}
+    value_counts = {}
+    if column.kind == TEXT:
+        _, code_counts = _code_counts(column, rows)
+        value_counts = {column.values[code]: count for code, count in code_counts.items()
+                        if column.values[code] not in (None, '')}
+    elif column.kind in (DOUBLE, INTEGER, ELEMENT_ID):
+        values = _numeric_values(column, rows)
+        if len(values):
+            value_counts = _value_counts(values)
+            if column.kind != ELEMENT_ID:
+                profile['Min'] = min(values) if np is None else values.min().item()
+                profile['Max'] = max(values) if np is None else values.max().item()
+                profile['Mean'] = sum(values) / len(values) if np is None else values.mean().item()
+                profile['Histogram'] = _histogram(values)
+
+    filled = sum(value_counts.values())
+    profile['Filled'] = filled
+    profile['Fill Rate'] = f"{filled / row_count:.3f}" if row_count else ''
+    profile['Distinct'] = len(value_counts)
+    profile['Top Values'] = _format_top(value_counts)
+    if column.name in UNIQUE_PARAMETERS:
+        duplicated = [count for count in value_counts.values() if count > 1]
+        profile['Duplicate Values'] = len(duplicated)
+        profile['Elements With Duplicates'] = sum(duplicated)
+    return profile
+
+
+def profile_store(store):
+    """
+    Profile every parameter of a document, per category, in one pass over the columns.
+
+    Args:
+        store (ParameterStore): The extracted data of one document.
+
+    Returns:
+        list: Profile rows with the PROFILE_FIELDNAMES keys.
+    """
+    profiles = []
+    for category, rows in category_groups(store):
+        for name in store.parameter_names:
+            profile = profile_column(store.columns[name], rows, len(rows))
+            profile['Category'] = category
+            profiles.append(profile)
+    return profiles
+
+
+def write_profile_report(store, path):
+    """
+    Write the profile of a document next to its export.
+
+    Args:
+        store (ParameterStore): The extracted data of one document.
+        path (str): The report file path.
+    """
+    with open(path, 'w', newline='', encoding='utf-8') as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=PROFILE_FIELDNAMES)
+        writer.writeheader()
+        writer.writerows(profile_store(store))
@@ -0,0 +1,175 @@
+from array import array
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+import clr
+clr.AddReference('RevitAPI')
+from Autodesk.Revit.DB import StorageType, UnitUtils, LabelUtils
+
+from .column_store import DOUBLE, INTEGER, TEXT, ELEMENT_ID
+
+
+def read_raw_value(param):
+    """
+    Read a parameter value by its StorageType without going through AsValueString.
+
+    Args:
+        param: The Revit Parameter.
+
+    Returns:
+        tuple: (kind, value) where kind is one of the column_store kinds, or (None, None) if
+               the parameter has no value.
+    """
+    if not param.HasValue:
+        return None, None
+    storage = param.StorageType
+    if storage == StorageType.Double:
+        return DOUBLE, param.AsDouble()
+    if storage == StorageType.Integer:
+        return INTEGER, param.AsInteger()
+    if storage == StorageType.String:
+        return TEXT, param.AsString()
+    if storage == StorageType.ElementId:
+        return ELEMENT_ID, param.AsElementId().IntegerValue
+    return None, None
+
+
+def get_unit_type_id(param):
+    """
+    Get the project display unit of a Double parameter.
+
+    Args:
+        param: The Revit Parameter.
+
+    Returns:
+        The ForgeTypeId (Revit 2021+) or DisplayUnitType (older versions) of the parameter,
+        or None for unitless parameters.
+    """
+    try:
+        return param.GetUnitTypeId()
+    except Exception:
+        pass
+    try:
+        return param.DisplayUnitType
+    except Exception:
+        return None
+
+
+def get_unit_label(unit_type_id):
+    """
+    Get a human readable label for a unit, e.g. "Millimeters".
+
+    Args:
+        unit_type_id: A ForgeTypeId or DisplayUnitType.
+
+    Returns:
+        str: The unit label, or an empty string if it cannot be resolved.
+    """
+    if unit_type_id is None:
+        return ""
+    try:
+        return LabelUtils.GetLabelForUnit(unit_type_id)
+    except Exception:
+        return str(unit_type_id)
+
+
+def get_conversion_coefficients(unit_type_id):
+    """
+    Get the linear coefficients that convert internal units to the given unit.
+
+    Revit unit conversions are affine (temperatures carry an offset), so converting 0 and 1
+    once is enough to convert a whole column as value * scale + offset.
+
+    Args:
+        unit_type_id: A ForgeTypeId or DisplayUnitType.
+
+    Returns:
+        tuple: (scale, offset), or (1.0, 0.0) if the unit cannot be converted.
+    """
+    if unit_type_id is None:
+        return 1.0, 0.0
+    try:
+        offset = UnitUtils.ConvertFromInternalUnits(0.0, unit_type_id)
+        scale = UnitUtils.ConvertFromInternalUnits(1.0, unit_type_id) - offset
+        return scale, offset
+    except Exception:
+        return 1.0, 0.0
+
+
+def convert_column(values, scale, offset):
+    """
+    Convert a whole column of internal values in one batched pass.
+
+    Args:
+        values (array.array): Double values in internal units, NaN for missing values.
+        scale (float): Multiplier from get_conversion_coefficients.
+        offset (float): Offset from get_conversion_coefficients.
+
+    Returns:
+        array.array: The converted values.
+    """
+    if scale == 1.0 and offset == 0.0:
+        return values
+    if np is not None:
+        converted = np.frombuffer(values, dtype=np.float64) * scale + offset
+        return array('d', converted.tobytes())
+    return array('d', [value * scale + offset for value in values])
+
+
+def parameters_by_name(elem):
+    """
+    Index the parameters of an element by name, keeping the first of same-named parameters.
+
+    Args:
+        elem: The Revit element.
+
+    Returns:
+        dict: Parameter name to Parameter.
+    """
+    params = {}
+    for param in elem.Parameters:
+        params.setdefault(param.Definition.Name, param)
+    return params
+
+
+def append_raw_element(store, elem):
+    """
+    Read the selected parameters of an element by StorageType into a ParameterStore.
+
+    Args:
+        store (ParameterStore): The store of the element's document.
+        elem: The Revit element.
+    """
+    params = parameters_by_name(elem)
+    cells = []
+    for name in store.parameter_names:
+        param = params.get(name)
+        if param is None:
+            cells.append((None, None))
+            continue
+        kind, value = read_raw_value(param)
+        column = store.columns[name]
+        if kind == DOUBLE and column.kind is None:
+            column.unit_type_id = get_unit_type_id(param)
+        cells.append((kind, value))
+    category = elem.Category.Name if elem.Category else None
+    store.append_row(elem.UniqueId, elem.Id.IntegerValue, cells, category)
+
+
+def convert_store_units(store):
+    """
+    Convert every Double column of a store from internal to project units, one batched
+    pass per column.
+
+    Args:
+        store (ParameterStore): The store to convert in place.
+    """
+    for column in store.columns.values():
+        if column.kind != DOUBLE:
+            continue
+        scale, offset = get_conversion_coefficients(column.unit_type_id)
+        column.values = convert_column(column.values, scale, offset)
+        column.unit_label = get_unit_label(column.unit_type_id)
@@ -0,0 +1,253 @@
+"""Declarative parameter rules evaluated in batch over the extracted columns.
+
+A rule file is JSON (or YAML when PyYAML is installed) holding a list of rules:
+
+    {"rules": [
+        {"name": "Doors need a fire rating", "category": "Doors",
+         "parameter": "Fire Rating", "check": "not_empty"},
+        {"name": "Mark unique per level", "category": "Doors",
+         "parameter": "Mark", "check": "unique", "group_by": ["Level"]},
+        {"name": "Pipe sizes", "category": "Pipes",
+         "parameter": "Diameter", "check": "in", "values": ["100 mm", "150 mm"]}
+    ]}
+
+Checks: not_empty, in (values), not_in (values), regex (pattern), range (min and/or max,
+raw numeric values; skipped on text columns such as formatted exports), unique (optional
+group_by parameters). Rules without a category apply to every category. Empty values only
+fail not_empty; the other checks skip them.
+"""
+
+import csv
+import json
+import logging
+import math
+import os
+import re
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from .column_store import TEXT, DOUBLE, INTEGER, ELEMENT_ID, MISSING
+from .profiling import category_groups
+
+logger = logging.getLogger('ParametersExport')
+
+CHECKS = ('not_empty', 'in', 'not_in', 'regex', 'range', 'unique')
+VIOLATION_FIELDNAMES = ['Rule', 'Category', 'ElementId', 'GUID', 'Parameter', 'Value', 'Message']
+
+
+class RuleError(ValueError):
+    """Raised when a rule file cannot be read or a rule is malformed."""
+
+
+def load_rules(path):
+    """
+    Read and validate a rule file.
+
+    Args:
+        path (str): A .json, .yaml or .yml file.
+
+    Returns:
+        list: The rule dictionaries.
+    """
+    with open(path, 'r', encoding='utf-8') as rule_file:
+        if os.path.splitext(path)[1].lower() in ('.yaml', '.yml'):
+            try:
+                import yaml
+            except ImportError:
+                raise RuleError("YAML rule files need PyYAML; save the rules as JSON instead.")
+            try:
+                data = yaml.safe_load(rule_file)
+            except yaml.YAMLError as e:
+                raise RuleError(f"Invalid YAML in {path}: {e}")
+        else:
+            try:
+                data = json.load(rule_file)
+            except ValueError as e:
+                raise RuleError(f"Invalid JSON in {path}: {e}")
+
+    rules = data.get('rules') if isinstance(data, dict) else data
+    if not isinstance(rules, list):
+        raise RuleError(f"{path} must contain a list of rules")
+    for number, rule in enumerate(rules, 1):
+        if not isinstance(rule, dict) or 'parameter' not in rule or rule.get('check') not in CHECKS:
+            raise RuleError(f"Rule {number} needs a parameter and a check out of: {', '.join(CHECKS)}")
+        rule.setdefault('name', f"{rule['check']} {rule['parameter']}")
+        if rule['check'] in ('in', 'not_in'):
+            rule['values'] = set(str(value) for value in rule.get('values', []))
+        if rule['check'] == 'regex':
+            try:
+                rule['compiled'] = re.compile(rule.get('pattern', ''))
+            except re.error as e:
+                raise RuleError(f"Rule '{rule['name']}' has an invalid pattern: {e}")
+    return rules
+
+
+def _is_empty(value):
+    return value is None or value == '' or value == MISSING or (isinstance(value, float) and math.isnan(value))
+
+
+def _value_passes(rule, value):
+    """Evaluate a value-level check for one non-empty value."""
+    check = rule['check']
+    if check == 'in':
+        return str(value) in rule['values']
+    if check == 'not_in':
+        return str(value) not in rule['values']
+    if check == 'regex':
+        return rule['compiled'].search(str(value)) is not None
+    if check == 'range':
+        if not isinstance(value, (int, float)):
+            return False
+        return (rule.get('min') is None or value >= rule['min']) and \
+            (rule.get('max') is None or value <= rule['max'])
+    return True
+
+
+def _failing_rows(rule, column, rows):
+    """
+    Evaluate a value-level rule over the rows of one category.
+
+    Text columns are checked once per dictionary value and the result is looked up by code,
+    so regex and set checks cost one evaluation per distinct value rather than per element.
+
+    Returns:
+        list: The failing row indices.
+    """
+    check = rule['check']
+    if column.kind == TEXT:
+        # lookup[0] is the missing code, lookup[code + 1] the dictionary values
+        if check == 'not_empty':
+            lookup = [False] + [not _is_empty(value) for value in column.values]
+        else:
+            lookup = [True] + [_is_empty(value) or _value_passes(rule, value) for value in column.values]
+        if np is not None:
+            passes = np.array(lookup, dtype=bool)[np.frombuffer(column.codes, dtype=np.int32)[rows] + 1]
+            return np.asarray(rows)[~passes].tolist()
+        codes = column.codes
+        return [row for row in rows if not lookup[codes[row] + 1]]
+
+    if column.kind in (DOUBLE, INTEGER, ELEMENT_ID):
+        if np is not None and check in ('not_empty', 'range'):
+            rows = np.asarray(rows)
+            if column.kind == DOUBLE:
+                values = np.frombuffer(column.values, dtype=np.float64)[rows]
+                present = ~np.isnan(values)
+            else:
+                values = np.frombuffer(column.values, dtype=np.int64)[rows]
+                present = np.frombuffer(column.present, dtype=np.uint8)[rows].astype(bool)
+            if check == 'not_empty':
+                return rows[~present].tolist()
+            passes = np.ones(len(rows), dtype=bool)
+            if rule.get('min') is not None:
+                passes &= values >= rule['min']
+            if rule.get('max') is not None:
+                passes &= values <= rule['max']
+            return rows[present & ~passes].tolist()
+        failing = []
+        for row in rows:
+            value = column.get(row)
+            if check == 'not_empty':
+                if _is_empty(value):
+                    failing.append(row)
+            elif not _is_empty(value) and not _value_passes(rule, value):
+                failing.append(row)
+        return failing
+
+    # The parameter exists on no element of the document
+    return list(rows) if check == 'not_empty' else []
+
+
+def _duplicate_rows(rule, store, rows):
+    """
+    Find rows whose value repeats within its group, by hashing (group, value) keys once.
+
+    Returns:
+        list: Row indices of every element sharing its key with another element.
+    """
+    columns = [store.columns[name] for name in rule.get('group_by', [])] + [store.columns[rule['parameter']]]
+    seen = {}
+    duplicates = []
+    for row in rows:
+        value = columns[-1].get(row)
+        if _is_empty(value):
+            continue
+        key = tuple(column.get(row) for column in columns)
+        first = seen.get(key)
+        if first is None:
+            seen[key] = row
+        else:
+            if first >= 0:
+                duplicates.append(first)
+                seen[key] = -1
+            duplicates.append(row)
+    return duplicates
+
+
+def evaluate_rules(store, rules):
+    """
+    Evaluate rules over the category tables of one document.
+
+    Args:
+        store (ParameterStore): The extracted data of one document.
+        rules (list): Rules from load_rules.
+
+    Returns:
+        tuple: (list of violation rows with the VIOLATION_FIELDNAMES keys, list of warnings
+               about rules that could not be evaluated)
+    """
+    violations = []
+    warnings = []
+    usable = []
+    for rule in rules:
+        missing = [name for name in [rule['parameter']] + rule.get('group_by', [])
+                   if name not in store.columns]
+        if missing:
+            warnings.append(f"Rule '{rule['name']}' skipped: {', '.join(missing)} not exported")
+        elif rule['check'] == 'range' and store.columns[rule['parameter']].kind == TEXT:
+            # Formatted values such as "3000 mm" are text; comparing them would fail every element
+            warning = (f"Rule '{rule['name']}' skipped: {rule['parameter']} holds text values; "
+                       f"range checks need a raw value export")
+            logger.warning(warning)
+            warnings.append(warning)
+        else:
+            usable.append(rule)
+
+    for category, rows in category_groups(store):
+        for rule in usable:
+            if rule.get('category') not in (None, '*', category):
+                continue
+            column = store.columns[rule['parameter']]
+            if rule['check'] == 'unique':
+                failing = _duplicate_rows(rule, store, rows)
+                message = "Value is not unique" + (f" per {', '.join(rule['group_by'])}" if rule.get('group_by') else "")
+            else:
+                failing = _failing_rows(rule, column, rows)
+                message = "Value is empty" if rule['check'] == 'not_empty' else f"Value fails {rule['check']} check"
+            for row in failing:
+                violations.append({
+                    'Rule': rule['name'],
+                    'Category': category,
+                    'ElementId': store.element_ids[row],
+                    'GUID': store.guids[row],
+                    'Parameter': rule['parameter'],
+                    'Value': column.get(row),
+                    'Message': message
+                })
+    return violations, warnings
+
+
+def write_violations(violations, path):
+    """
+    Write rule violations to a CSV file.
+
+    Args:
+        violations (list): Rows from evaluate_rules.
+        path (str): The report file path.
+    """
+    with open(path, 'w', newline='', encoding='utf-8') as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=VIOLATION_FIELDNAMES)
+        writer.writeheader()
+        writer.writerows(violations)
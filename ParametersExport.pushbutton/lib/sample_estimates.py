@@ -0,0 +1,100 @@
+import csv
+
+from coordination_toolkit.sampling import format_estimate
+
+from .column_store import MISSING
+
+ESTIMATE_FIELDNAMES = [
+    'Category', 'Measure', 'Parameter', 'Rule', 'Population', 'Sampled',
+    'Estimate', 'Lower 95%', 'Upper 95%', 'Estimated Elements', 'Summary'
+]
+
+
+def _is_filled(value):
+    return value not in (MISSING, None, '')
+
+
+def _estimate_row(sample, strata, hits, **fields):
+    estimate, low, high = sample.estimate_proportion(hits, strata)
+    count, _, _ = sample.estimate_count(hits, strata)
+    row = dict(fields)
+    row.update({
+        'Population': sum(sample.strata[s][0] for s in strata),
+        'Sampled': sum(sample.strata[s][1] for s in strata),
+        'Estimate': f"{estimate:.4f}",
+        'Lower 95%': f"{low:.4f}",
+        'Upper 95%': f"{high:.4f}",
+        'Estimated Elements': f"{count:.0f}",
+        'Summary': format_estimate(estimate, low, high)
+    })
+    return row
+
+
+def estimate_store(store, rules=None, violations=None):
+    """
+    Scale the fill rates and rule compliance measured on a sampled store to the population.
+
+    Args:
+        store (ParameterStore): A store filled by get_sampled_parameter_values.
+        rules (list, optional): The rules checked at export.
+        violations (list, optional): The violations evaluate_rules found in the store.
+
+    Returns:
+        list: One row per category and measure, with the ESTIMATE_FIELDNAMES keys.
+    """
+    sample = store.sample
+    strata_by_category = {}
+    for stratum in sample.strata:
+        strata_by_category.setdefault(stratum[0], []).append(stratum)
+
+    rows = []
+    for category, strata in strata_by_category.items():
+        rows.append(_estimate_row(sample, strata, {s: sample.strata[s][1] for s in strata},
+                                  Category=category, Measure='Elements'))
+        for name in store.parameter_names:
+            column = store.columns[name]
+            hits = {}
+            for row, stratum in enumerate(store.sample_strata):
+                if stratum[0] == category and _is_filled(column.get(row)):
+                    hits[stratum] = hits.get(stratum, 0) + 1
+            rows.append(_estimate_row(sample, strata, hits, Category=category, Measure='Fill Rate', Parameter=name))
+
+    if rules:
+        row_by_element = {elem_id: row for row, elem_id in enumerate(store.element_ids)}
+        violating = {}
+        for violation in violations or []:
+            violating.setdefault(violation['Rule'], set()).add(row_by_element[violation['ElementId']])
+        for rule in rules:
+            if any(name not in store.columns for name in [rule['parameter']] + rule.get('group_by', [])):
+                continue
+            for category, strata in strata_by_category.items():
+                if rule.get('category') not in (None, '*', category):
+                    continue
+                hits = {s: sample.strata[s][1] for s in strata}
+                for row in violating.get(rule['name'], ()):
+                    stratum = store.sample_strata[row]
+                    if stratum in hits:
+                        hits[stratum] -= 1
+                rows.append(_estimate_row(sample, strata, hits, Category=category, Measure='Compliance',
+                                          Parameter=rule['parameter'], Rule=rule['name']))
+    return rows
+
+
+def write_sample_estimates(store, path, rules=None, violations=None):
+    """
+    Write the population estimates of a sampled store to a CSV file.
+
+    The first row states the sample size, so the file cannot be mistaken for a full count.
+
+    Args:
+        store (ParameterStore): A store filled by get_sampled_parameter_values.
+        path (str): The report file path.
+        rules (list, optional): The rules checked at export.
+        violations (list, optional): The violations evaluate_rules found in the store.
+    """
+    with open(path, 'w', newline='', encoding='utf-8') as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=ESTIMATE_FIELDNAMES)
+        writer.writeheader()
+        writer.writerow({'Category': 'All', 'Measure': 'Sample', 'Population': store.sample.population,
+                         'Sampled': store.sample.sampled, 'Summary': store.sample.label()})
+        writer.writerows(estimate_store(store, rules, violations))
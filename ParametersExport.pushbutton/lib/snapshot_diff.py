@@ -0,0 +1,229 @@
+"""Out-of-core diff of two ParametersExport CSV snapshots keyed by GUID.
+
+Both exports are sorted by GUID in bounded chunks written to temporary files, the chunks are
+stream-merged, and the two sorted streams are joined in a single pass. Memory use depends on
+the chunk size, not on the size of the exports.
+
+Runs outside Revit with plain CPython:
+
+    python snapshot_diff.py yesterday.csv today.csv -o changes.csv
+"""
+
+import argparse
+import csv
+import heapq
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+from itertools import groupby
+
+logger = logging.getLogger('ParametersExport')
+
+KEY_COLUMN = 'GUID'
+DEFAULT_CHUNK_ROWS = 200000
+DIFF_FIELDNAMES = ['Change', 'GUID', 'ElementId', 'Column', 'Old Value', 'New Value']
+
+
+def _raise_field_limit():
+    # Exported cells can exceed the csv module's default 128 KB field limit
+    limit = sys.maxsize
+    while True:
+        try:
+            csv.field_size_limit(limit)
+            return
+        except OverflowError:
+            limit = int(limit / 10)
+
+
+class SortedSnapshot(object):
+    """
+    A CSV export sorted by GUID through temporary chunk files.
+
+    Args:
+        path (str): The export to sort.
+        work_dir (str): Directory for the chunk files.
+        chunk_rows (int): Rows held in memory while sorting one chunk.
+    """
+
+    def __init__(self, path, work_dir, chunk_rows=DEFAULT_CHUNK_ROWS):
+        self.path = path
+        self.work_dir = work_dir
+        self.chunk_rows = chunk_rows
+        self.header = []
+        self.chunk_paths = []
+        self.row_count = 0
+
+    def sort(self):
+        with open(self.path, 'r', newline='', encoding='utf-8-sig') as csvfile:
+            reader = csv.reader(csvfile)
+            self.header = next(reader, [])
+            if KEY_COLUMN not in self.header:
+                raise ValueError(f"{self.path} has no {KEY_COLUMN} column")
+            key_index = self.header.index(KEY_COLUMN)
+            chunk = []
+            for row in reader:
+                # Raw exports carry a unit row with an empty GUID under the header
+                if not row or not row[key_index]:
+                    continue
+                chunk.append(row)
+                self.row_count += 1
+                if len(chunk) >= self.chunk_rows:
+                    self._write_chunk(chunk, key_index)
+                    chunk = []
+            if chunk:
+                self._write_chunk(chunk, key_index)
+        return self
+
+    def _write_chunk(self, chunk, key_index):
+        chunk.sort(key=lambda row: row[key_index])
+        chunk_path = os.path.join(self.work_dir, f"chunk_{id(self)}_{len(self.chunk_paths)}.csv")
+        with open(chunk_path, 'w', newline='', encoding='utf-8') as chunk_file:
+            csv.writer(chunk_file).writerows(chunk)
+        self.chunk_paths.append(chunk_path)
+
+    def rows(self):
+        """
+        Stream the rows in GUID order, merging the sorted chunks.
+
+        Yields:
+            dict: Column name to value.
+        """
+        key_index = self.header.index(KEY_COLUMN)
+        files = [open(path, 'r', newline='', encoding='utf-8') for path in self.chunk_paths]
+        try:
+            readers = [csv.reader(chunk_file) for chunk_file in files]
+            for row in heapq.merge(*readers, key=lambda row: row[key_index]):
+                yield dict(zip(self.header, row))
+        finally:
+            for chunk_file in files:
+                chunk_file.close()
+
+
+def _unique_by_guid(rows, duplicates):
+    """Keep the first row of each GUID, counting the rest."""
+    for guid, group in groupby(rows, key=lambda row: row[KEY_COLUMN]):
+        yield next(group)
+        duplicates[0] += sum(1 for _ in group)
+
+
+def diff_rows(old_rows, new_rows, columns):
+    """
+    Join two GUID-sorted row streams in a single pass.
+
+    Args:
+        old_rows (iterable): Rows of the old snapshot, sorted by GUID.
+        new_rows (iterable): Rows of the new snapshot, sorted by GUID.
+        columns (list): The columns compared for changed elements.
+
+    Yields:
+        dict: One diff row per added or removed element and per changed column.
+    """
+    old_iter = iter(old_rows)
+    new_iter = iter(new_rows)
+    old_row = next(old_iter, None)
+    new_row = next(new_iter, None)
+    while old_row is not None or new_row is not None:
+        if new_row is None or (old_row is not None and old_row[KEY_COLUMN] < new_row[KEY_COLUMN]):
+            yield {'Change': 'Removed', 'GUID': old_row[KEY_COLUMN], 'ElementId': old_row.get('ElementId', '')}
+            old_row = next(old_iter, None)
+        elif old_row is None or new_row[KEY_COLUMN] < old_row[KEY_COLUMN]:
+            yield {'Change': 'Added', 'GUID': new_row[KEY_COLUMN], 'ElementId': new_row.get('ElementId', '')}
+            new_row = next(new_iter, None)
+        else:
+            for column in columns:
+                old_value = old_row.get(column, '')
+                new_value = new_row.get(column, '')
+                if old_value != new_value:
+                    yield {
+                        'Change': 'Changed',
+                        'GUID': new_row[KEY_COLUMN],
+                        'ElementId': new_row.get('ElementId', ''),
+                        'Column': column,
+                        'Old Value': old_value,
+                        'New Value': new_value
+                    }
+            old_row = next(old_iter, None)
+            new_row = next(new_iter, None)
+
+
+def diff_snapshots(old_path, new_path, output_path, chunk_rows=DEFAULT_CHUNK_ROWS, work_dir=None):
+    """
+    Diff two exports of the same model and write the changes to a CSV file.
+
+    Args:
+        old_path (str): The earlier export.
+        new_path (str): The later export.
+        output_path (str): The diff CSV to write (Change, GUID, ElementId, Column, Old Value,
+            New Value).
+        chunk_rows (int): Rows held in memory per sort chunk.
+        work_dir (str, optional): Parent directory for the temporary chunk files.
+
+    Returns:
+        dict: Counts of added, removed and changed elements and changed cells, the rows
+              read, the elapsed seconds and the throughput in rows per second.
+    """
+    _raise_field_limit()
+    start = time.time()
+    temp_dir = tempfile.mkdtemp(prefix='snapshot_diff_', dir=work_dir)
+    counts = {'Added': 0, 'Removed': 0, 'Changed': 0, 'Changed Cells': 0}
+    duplicates = [0]
+    try:
+        old_snapshot = SortedSnapshot(old_path, temp_dir, chunk_rows).sort()
+        new_snapshot = SortedSnapshot(new_path, temp_dir, chunk_rows).sort()
+        columns = [column for column in new_snapshot.header if column != KEY_COLUMN]
+        columns += [column for column in old_snapshot.header
+                    if column != KEY_COLUMN and column not in columns]
+
+        last_changed = None
+        with open(output_path, 'w', newline='', encoding='utf-8') as csvfile:
+            writer = csv.DictWriter(csvfile, fieldnames=DIFF_FIELDNAMES)
+            writer.writeheader()
+            for change in diff_rows(_unique_by_guid(old_snapshot.rows(), duplicates),
+                                    _unique_by_guid(new_snapshot.rows(), duplicates), columns):
+                writer.writerow(change)
+                if change['Change'] == 'Changed':
+                    counts['Changed Cells'] += 1
+                    if change['GUID'] != last_changed:
+                        counts['Changed'] += 1
+                        last_changed = change['GUID']
+                else:
+                    counts[change['Change']] += 1
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+    elapsed = time.time() - start
+    rows_read = old_snapshot.row_count + new_snapshot.row_count
+    counts['Duplicate GUIDs'] = duplicates[0]
+    counts['Rows Read'] = rows_read
+    counts['Seconds'] = elapsed
+    counts['Rows Per Second'] = rows_read / elapsed if elapsed > 0 else float(rows_read)
+    if duplicates[0]:
+        logger.warning(f"Ignored {duplicates[0]} rows with repeated GUIDs while diffing {old_path} and {new_path}")
+    logger.info(f"Diffed {rows_read} rows in {elapsed:.1f} s ({counts['Rows Per Second']:.0f} rows/s)")
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('old', help='The earlier export')
+    parser.add_argument('new', help='The later export')
+    parser.add_argument('-o', '--output', default='changes.csv', help='The diff CSV to write')
+    parser.add_argument('--chunk-rows', type=int, default=DEFAULT_CHUNK_ROWS,
+                        help='Rows held in memory per sort chunk')
+    parser.add_argument('--work-dir', default=None, help='Directory for temporary chunk files')
+    args = parser.parse_args()
+
+    counts = diff_snapshots(args.old, args.new, args.output, args.chunk_rows, args.work_dir)
+    print(f"Added: {counts['Added']}  Removed: {counts['Removed']}  "
+          f"Changed: {counts['Changed']} ({counts['Changed Cells']} cells)")
+    if counts['Duplicate GUIDs']:
+        print(f"Ignored rows with repeated GUIDs: {counts['Duplicate GUIDs']}")
+    print(f"Read {counts['Rows Read']} rows in {counts['Seconds']:.1f} s "
+          f"({counts['Rows Per Second']:.0f} rows/s)")
+
+
+if __name__ == '__main__':
+    main()
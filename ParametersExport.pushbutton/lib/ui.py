@@ -2,28 +2,41 @@ import clr
 clr.AddReference('System.Windows')
 
 from pyrevit import forms
-from System.Windows.Controls import WebBrowser, Grid
+from coordination_toolkit.row_source import RowSource
+from coordination_toolkit.preview import show_paged_preview
 
-from .core_processing import get_documents, get_model_categories, get_category_parameters, get_parameter_values, generate_table_html, export_data_to_csv
+from .core_processing import get_documents, get_document_keys, document_identity, get_model_categories, get_category_count, estimate_extraction_cost, get_category_parameters, export_data
 from .warning import display_warning, display_error, handle_exception, log_warning
 
 
 def select_models(doc):
     docs = get_documents(doc)
-    options = [f"Current Model: {doc.Title}"] + [f"Linked Model: {d.Title}" for d in docs[1:]]
+    document_keys = get_document_keys(docs)
+    labels = {}
+    for index, d in enumerate(docs):
+        prefix = "Current Model" if index == 0 else "Linked Model"
+        labels[f"{prefix}: {document_keys[document_identity(d)]}"] = d
     selected = forms.SelectFromList.show(
-        options,
+        list(labels.keys()),
         title='Select Models',
         multiselect=True,
         button_name='Next'
     )
     if not selected:
         return None
-    return [d for d in docs if d.Title in [s.split(": ", 1)[1] for s in selected]]
+    return [d for label, d in labels.items() if label in selected]
 
-def select_categories(documents):
-    all_categories = get_model_categories(documents)
-    options = sorted(all_categories.keys())
+def select_categories(documents, census=None):
+    all_categories = get_model_categories(documents, census)
+    if census is None:
+        labels = {cat: cat for cat in all_categories}
+    else:
+        # Show the number of elements next to each category; empty categories are already left out
+        labels = {}
+        for cat, doc_category_pairs in all_categories.items():
+            count = sum(get_category_count(census, doc, category) for doc, category in doc_category_pairs)
+            labels[f"{cat} ({count:,})"] = cat
+    options = sorted(labels.keys())
     selected = forms.SelectFromList.show(
         options,
         title='Select Categories',
@@ -32,7 +45,7 @@ def select_categories(documents):
     )
     if not selected:
         return None
-    return {cat: all_categories[cat] for cat in selected}
+    return {labels[label]: all_categories[labels[label]] for label in selected}
 
 def select_parameters(selected_categories):
     all_parameters = set()
@@ -51,36 +64,113 @@ def select_parameters(selected_categories):
         return None
     return selected
 
-class HTMLTableWindow(forms.WPFWindow):
-    def __init__(self, title, width, height):
-#        forms.WPFWindow.__init__(self, title)
-        self.Width = width
-        self.Height = height
+def confirm_extraction_cost(selected_categories, selected_parameters, census):
+    estimate = estimate_extraction_cost(selected_categories, len(selected_parameters), census)
+    largest = sorted(estimate['Categories'].items(), key=lambda item: item[1], reverse=True)[:5]
+    message = (f"Up to {estimate['Elements']:,} elements x {len(selected_parameters)} parameters "
+               f"= {estimate['Values']:,} values will be read.\n\n"
+               + "\n".join(f"{cat}: {count:,} elements" for cat, count in largest)
+               + "\n\nContinue?")
+    return forms.alert(message, title='Extraction Estimate', yes=True, no=True)
 
-        # Create a WebBrowser control
-        self.web_browser = WebBrowser()
+VALUE_MODES = {
+    'Formatted values (as displayed in Revit)': None,
+    'Raw values (project units)': 'project',
+    'Raw values (internal units)': 'internal'
+}
 
-        # Create a Grid to hold the WebBrowser
-        grid = Grid()
-        grid.Children.Add(self.web_browser)
+def select_value_mode():
+    selected = forms.CommandSwitchWindow.show(
+        list(VALUE_MODES.keys()),
+        message='Select how parameter values are read:'
+    )
+    if not selected:
+        return None
+    return selected
 
-        # Set the window content
-        self.Content = grid
+RUN_MODES = {
+    'Extract, preview and export': 'export',
+    'Update previous CSV exports (only changed elements)': 'incremental',
+    'Compare models side by side (join on a key)': 'compare'
+}
 
-    def set_html_content(self, html_content):
-        self.web_browser.NavigateToString(html_content)
+def select_run_mode():
+    selected = forms.CommandSwitchWindow.show(
+        list(RUN_MODES.keys()),
+        message='Select the export mode:'
+    )
+    if not selected:
+        return None
+    return selected
 
-def display_data_table(data_by_document, selected_parameters):
-    html_content = ""
-    for doc_title, data in data_by_document.items():
-        html_content += f"<h2>{doc_title}</h2>"
-        html_content += generate_table_html(data, selected_parameters)
+def select_join_key(selected_parameters):
+    options = ['GUID', 'ElementId'] + [name for name in selected_parameters if name not in ('GUID', 'ElementId')]
+    selected = forms.SelectFromList.show(
+        options,
+        title='Select the Key Matching Elements Across Models',
+        multiselect=False,
+        button_name='Compare'
+    )
+    if not selected:
+        return None
+    return selected
 
-    window = HTMLTableWindow("Data Preview", 800, 600)
-    window.set_html_content(html_content)
-    window.ShowDialog()
+SAMPLE_MODES = {
+    'Read every element': None,
+    'Quick scan: 5% sample per category and type': '5%',
+    'Quick scan: 1,000 elements per model': '1000',
+    'Quick scan: custom sample size': 'custom'
+}
+
+def select_sample_mode():
+    selected = forms.CommandSwitchWindow.show(
+        list(SAMPLE_MODES.keys()),
+        message='Read every element or a representative sample?'
+    )
+    if not selected:
+        return None
+    return selected
+
+def ask_sample_size():
+    return forms.ask_for_string(
+        default='10%',
+        prompt='Sample size: a percentage (e.g. 10%) or a number of elements per model (e.g. 500)',
+        title='Quick Scan'
+    )
+
+EXPORT_FORMATS = {
+    'Wide CSV (one file per model)': 'csv',
+    'Long CSV with value dictionary': 'long_csv',
+    'SQLite database (all models)': 'sqlite',
+    'JSON Lines': 'jsonl'
+}
+
+def select_export_format():
+    selected = forms.CommandSwitchWindow.show(
+        list(EXPORT_FORMATS.keys()),
+        message='Select the export format:'
+    )
+    if not selected:
+        return None
+    return EXPORT_FORMATS[selected]
+
+def select_rule_file():
+    if not forms.alert("Check the data against a rule file?", yes=True, no=True):
+        return None
+    return forms.pick_file(files_filter='Rule files (*.json;*.yaml;*.yml)|*.json;*.yaml;*.yml')
+
+def display_data_table(data_by_document, selected_parameters, rules=None):
+    datasets = {}
+    notes = {}
+    columns = ['GUID', 'ElementId'] + list(selected_parameters)
+    for doc_title, data in data_by_document.items():
+        # Cells are read straight from the columns, so only the visible page builds rows
+        datasets[doc_title] = RowSource(data, columns, get_value=lambda store, row, column: store.value(row, column))
+        if data.sample is not None:
+            notes[doc_title] = f"Quick scan ({data.sample.label()} elements). Estimates are written to the _estimates.csv report."
 
-    # After displaying the data, ask if the user wants to export
-    if forms.alert("Do you want to export this data to CSV?", yes=True, no=True):
-        from lib.core_processing import export_data_to_csv
-        export_data_to_csv(data_by_document, selected_parameters)
\ No newline at end of file
+    # The preview's Export button replaces the former "export this data?" question
+    if show_paged_preview(datasets, title='Data Preview', accept_label='Export...', notes=notes):
+        export_format = select_export_format()
+        if export_format:
+            export_data(data_by_document, selected_parameters, export_format, rules=rules)
@@ -7,15 +7,39 @@ from lib.ui import (
     select_models, 
     select_categories, 
     select_parameters, 
-    display_data_table
+    confirm_extraction_cost,
+    select_value_mode,
+    select_run_mode,
+    select_join_key,
+    select_rule_file,
+    select_sample_mode,
+    ask_sample_size,
+    display_data_table,
+    VALUE_MODES,
+    RUN_MODES,
+    SAMPLE_MODES
 )
 from lib.core_processing import (
 #    get_documents,
 #    get_model_categories, 
 #    get_category_parameters, 
     get_parameter_values, 
+    get_changed_parameter_values,
+    get_sampled_parameter_values,
+    get_category_census,
+    get_document_keys,
+    document_identity,
+    select_export_directory,
+    sanitise_filename,
 #    export_data_to_csv
 )
+from lib.exporters import write_wide_csv
+from lib.incremental import IncrementalExporter
+from lib.column_store import ParameterStore
+from lib.raw_values import convert_store_units
+from lib.rules import load_rules, RuleError
+from lib.cross_model import write_comparison
+from coordination_toolkit.sampling import StratifiedSample, parse_sample_spec
 from lib.warning import (
     display_warning, 
 #    display_error,
@@ -24,6 +48,59 @@ from lib.warning import (
 
 from lib.logger import setup_logger
 
+def run_incremental_export(selected_categories, selected_parameters, value_mode, raw, unit_mode, directory, document_keys):
+    """
+    Bring the wide CSV export of each selected document up to date, re-reading only the
+    elements that changed since the previous run.
+    """
+    categories_by_doc = {}
+    for category_name, doc_category_pairs in selected_categories.items():
+        for doc, category in doc_category_pairs:
+            categories_by_doc.setdefault(document_keys[document_identity(doc)], (doc, []))[1].append(category)
+
+    summary = []
+    with forms.ProgressBar(title='Updating Exports', cancellable=True, step=1) as pb:
+        for current_item, (doc_title, (doc, categories)) in enumerate(categories_by_doc.items(), 1):
+            def read_all(store, doc=doc, categories=categories):
+                for category in categories:
+                    get_parameter_values(doc, category, {doc.Title: store}, raw=raw)
+                if unit_mode == 'project':
+                    convert_store_units(store)
+
+            def read_elements(store, element_ids, doc=doc, categories=categories):
+                get_changed_parameter_values(doc, categories, element_ids, store, raw=raw)
+                if unit_mode == 'project':
+                    convert_store_units(store)
+
+            export_path = os.path.join(directory, f"{sanitise_filename(doc_title)}.csv")
+            exporter = IncrementalExporter(doc, export_path, selected_parameters, value_mode, raw, read_all, read_elements)
+            summary.append(f"{doc_title}: {exporter.run(write_wide_csv)}")
+            pb.update_progress(current_item, len(categories_by_doc))
+            if pb.cancelled:
+                break
+
+    forms.alert('\n'.join(summary), title='Export Update Complete')
+
+def run_comparison(data_by_document, selected_parameters):
+    """
+    Join the extracted documents on a chosen key and write a side-by-side comparison CSV.
+    """
+    if len(data_by_document) < 2:
+        display_warning("Select at least two models to compare.")
+        return
+    key = select_join_key(selected_parameters)
+    if not key:
+        display_warning("No key selected. Operation cancelled.")
+        return
+    directory = select_export_directory("Select the folder where the comparison will be saved.")
+    if not directory:
+        return
+    path = os.path.join(directory, f"cross_model_comparison_{sanitise_filename(key)}.csv")
+    counts = write_comparison(data_by_document, key, [name for name in selected_parameters if name != key], path)
+    forms.alert(f"{counts['Keys']} keys compared, {counts['Matched']} found in every model, "
+                f"{counts['Mismatched']} with differing values.\n\nSaved to {path}",
+                title='Comparison Complete')
+
 def main():
     doc = __revit__.ActiveUIDocument.Document
     appdata_dir = os.getenv('APPDATA')
@@ -37,8 +114,9 @@ def main():
             display_warning("No models selected. Operation cancelled.")
             return
 
-        # Step 2: Select Categories
-        selected_categories = select_categories(selected_documents)
+        # Step 2: Select Categories, counting their elements in one pass per model
+        census = get_category_census(selected_documents)
+        selected_categories = select_categories(selected_documents, census)
         if not selected_categories:
             display_warning("No categories selected. Operation cancelled.")
             return
@@ -48,27 +126,110 @@ def main():
         if not selected_parameters:
             display_warning("No parameters selected. Operation cancelled.")
             return
+        if not confirm_extraction_cost(selected_categories, selected_parameters, census):
+            display_warning("Operation cancelled.")
+            return
 
-        # Process the data with progress bar
-        data_by_document = {doc.Title: [] for doc in selected_documents}
-        total_items = sum(len(doc_category_pairs) for doc_category_pairs in selected_categories.values())
-        
-        with forms.ProgressBar(title='Processing Data', cancellable=True, step=1) as pb:
-            current_item = 0
+        # Step 4: Select how values are read
+        value_mode = select_value_mode()
+        if not value_mode:
+            display_warning("No value mode selected. Operation cancelled.")
+            return
+        unit_mode = VALUE_MODES[value_mode]
+        raw = unit_mode is not None
+
+        # Step 5: Select between a full export and an update of previous exports
+        run_mode = select_run_mode()
+        if not run_mode:
+            display_warning("No export mode selected. Operation cancelled.")
+            return
+        run_mode = RUN_MODES[run_mode]
+        document_keys = get_document_keys(selected_documents)
+        if run_mode == 'incremental':
+            directory = select_export_directory("Select the folder holding the previous CSV exports.")
+            if not directory:
+                display_warning("No folder selected. Operation cancelled.")
+                return
+            run_incremental_export(selected_categories, selected_parameters, value_mode, raw, unit_mode, directory, document_keys)
+            return
+
+        # Step 6: Optionally load a rule file checked at export
+        rules = None
+        rule_file = select_rule_file() if run_mode == 'export' else None
+        if rule_file:
+            try:
+                rules = load_rules(rule_file)
+            except (IOError, RuleError) as e:
+                display_warning(f"Rule file not loaded, exporting without rule checks: {e}")
+
+        # Step 7: Read every element or a stratified sample for a quick scan
+        sample_spec = None
+        if run_mode == 'export':
+            sample_mode = select_sample_mode()
+            if not sample_mode:
+                display_warning("No sample mode selected. Operation cancelled.")
+                return
+            sample_spec = SAMPLE_MODES[sample_mode]
+            if sample_spec == 'custom':
+                sample_spec = ask_sample_size()
+                if not sample_spec:
+                    display_warning("No sample size entered. Operation cancelled.")
+                    return
+            if sample_spec:
+                try:
+                    sample_size, sample_fraction = parse_sample_spec(sample_spec)
+                except ValueError as e:
+                    display_warning(f"Invalid sample size: {e}")
+                    return
+
+        if sample_spec:
+            # Sampled stores are labelled in their key, so every output file and preview says so
+            categories_by_doc = {}
             for category_name, doc_category_pairs in selected_categories.items():
                 for doc, category in doc_category_pairs:
-                    get_parameter_values(doc, category, selected_parameters, data_by_document)
-                    current_item += 1
-                    percentage = (current_item / total_items) * 100
-                    pb.update_progress(current_item, total_items)
-                    pb.title = f'Processing Data: {percentage:.2f}%'
-
+                    doc_key = f"{document_keys[document_identity(doc)]} - sampled"
+                    categories_by_doc.setdefault(doc_key, (doc, []))[1].append(category)
+            data_by_document = {doc_key: ParameterStore(selected_parameters, raw=raw,
+                                                        sample=StratifiedSample(sample_size, sample_fraction))
+                                for doc_key in categories_by_doc}
+            with forms.ProgressBar(title='Sampling Data', cancellable=True, step=1) as pb:
+                for current_item, (doc_key, (doc, categories)) in enumerate(categories_by_doc.items(), 1):
+                    get_sampled_parameter_values(doc, categories, data_by_document[doc_key], raw=raw)
+                    pb.update_progress(current_item, len(categories_by_doc))
                     if pb.cancelled:
                         forms.alert('Operation cancelled by user.', title='Cancelled')
                         return
+        else:
+            data_by_document = {document_keys[document_identity(doc)]: ParameterStore(selected_parameters, raw=raw)
+                                for doc in selected_documents}
+            total_items = sum(len(doc_category_pairs) for doc_category_pairs in selected_categories.values())
+        
+            with forms.ProgressBar(title='Processing Data', cancellable=True, step=1) as pb:
+                current_item = 0
+                for category_name, doc_category_pairs in selected_categories.items():
+                    for doc, category in doc_category_pairs:
+                        get_parameter_values(doc, category, data_by_document, raw=raw,
+                                             doc_key=document_keys[document_identity(doc)])
+                        current_item += 1
+                        percentage = (current_item / total_items) * 100
+                        pb.update_progress(current_item, total_items)
+                        pb.title = f'Processing Data: {percentage:.2f}%'
+
+                        if pb.cancelled:
+                            forms.alert('Operation cancelled by user.', title='Cancelled')
+                            return
+
+        # Convert raw Double columns from internal units in one pass per column
+        if unit_mode == 'project':
+            for store in data_by_document.values():
+                convert_store_units(store)
+
+        if run_mode == 'compare':
+            run_comparison(data_by_document, selected_parameters)
+            return
 
         # Display data and export
-        display_data_table(data_by_document, selected_parameters)
+        display_data_table(data_by_document, selected_parameters, rules)
 
     except Exception as ex:
         handle_exception(ex)
@@ -0,0 +1,60 @@
+"""Import the extension's lib modules outside Revit.
+
+Each button's lib folder is registered as a package of its own, so its __init__.py (which
+needs Revit) does not run, and the Revit and .NET modules are stand-ins while a module is
+imported.
+"""
+
+import importlib
+import os
+import sys
+import types
+
+EXTENSION_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+SHARED_LIB_DIR = os.path.join(EXTENSION_DIR, 'lib')
+STUBBED_MODULES = ('clr', 'Autodesk', 'Autodesk.Revit', 'Autodesk.Revit.DB',
+                   'System', 'System.Collections', 'System.Collections.Generic')
+
+if SHARED_LIB_DIR not in sys.path:
+    sys.path.insert(0, SHARED_LIB_DIR)
+
+
+class StubModule(types.ModuleType):
+    """A module where every imported name is a placeholder class."""
+
+    def __getattr__(self, name):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        placeholder = type(name, (object,), {})
+        setattr(self, name, placeholder)
+        return placeholder
+
+
+def load_module(package, button, name):
+    """
+    Import a module of a button's lib folder.
+
+    Args:
+        package (str): The package name to register the lib folder under.
+        button (str): The button folder, e.g. 'DocumentAudit.pushbutton'.
+        name (str): The module name within lib.
+
+    Returns:
+        module: The imported module.
+    """
+    if package not in sys.modules:
+        lib = types.ModuleType(package)
+        lib.__path__ = [os.path.join(EXTENSION_DIR, button, 'lib')]
+        sys.modules[package] = lib
+    saved = dict((module_name, sys.modules.get(module_name)) for module_name in STUBBED_MODULES)
+    stubs = dict((module_name, StubModule(module_name)) for module_name in STUBBED_MODULES)
+    stubs['clr'].AddReference = lambda *names: None
+    sys.modules.update(stubs)
+    try:
+        return importlib.import_module(f"{package}.{name}")
+    finally:
+        for module_name, module in saved.items():
+            if module is None:
+                sys.modules.pop(module_name, None)
+            else:
+                sys.modules[module_name] = module
@@ -0,0 +1,65 @@
+"""DocumentAudit batched coordinate transforms, with and without NumPy.
+
+Runs outside Revit with plain CPython:
+
+    python -m unittest discover -s tests
+"""
+
+import math
+import random
+import unittest
+from unittest import mock
+
+from revit_stubs import load_module
+
+coordinate_batch = load_module('document_audit_lib', 'DocumentAudit.pushbutton', 'coordinate_batch')
+
+
+def rotation_about_z(degrees, x, y, z):
+    cos, sin = math.cos(math.radians(degrees)), math.sin(math.radians(degrees))
+    return [[cos, -sin, 0.0, x], [sin, cos, 0.0, y], [0.0, 0.0, 1.0, z], [0.0, 0.0, 0.0, 1.0]]
+
+
+class TransformPointsTest(unittest.TestCase):
+
+    def test_known_transforms(self):
+        points = [(1.0, 0.0, 0.0), (0.0, 2.0, 1.0)]
+        matrices = [[coordinate_batch.identity_matrix(), coordinate_batch.translation_matrix(10.0, 0.0, -1.0)],
+                    [rotation_about_z(90.0, 0.0, 0.0, 0.0), rotation_about_z(90.0, 0.0, 0.0, 0.0)]]
+        expected = [[(304.8, 0.0, 0.0), (3048.0, 609.6, 0.0)],
+                    [(0.0, 304.8, 0.0), (-609.6, 0.0, 304.8)]]
+        branches = [('python', None)]
+        if coordinate_batch.np is not None:
+            branches.append(('numpy', coordinate_batch.np))
+        for branch, np in branches:
+            with self.subTest(branch=branch), mock.patch.object(coordinate_batch, 'np', np):
+                transformed = coordinate_batch.transform_points(points, [0, 1], matrices)
+                for system_points, system_expected in zip(transformed, expected):
+                    for point, expected_point in zip(system_points, system_expected):
+                        for value, expected_value in zip(point, expected_point):
+                            self.assertAlmostEqual(value, expected_value, places=6)
+
+    def test_branches_agree(self):
+        if coordinate_batch.np is None:
+            self.skipTest("NumPy is not installed")
+        rng = random.Random(2)
+        documents = 4
+        points = [tuple(rng.uniform(-500.0, 500.0) for _ in range(3)) for _ in range(300)]
+        document_indices = [rng.randrange(documents) for _ in points]
+        matrices = [[rotation_about_z(rng.uniform(0.0, 360.0), *(rng.uniform(-100.0, 100.0) for _ in range(3)))
+                     for _ in range(documents)] for _ in coordinate_batch.COORDINATE_SYSTEMS]
+        numpy_points = coordinate_batch.transform_points(points, document_indices, matrices)
+        with mock.patch.object(coordinate_batch, 'np', None):
+            python_points = coordinate_batch.transform_points(points, document_indices, matrices)
+        self.assertEqual(len(numpy_points), len(python_points))
+        for numpy_system, python_system in zip(numpy_points, python_points):
+            for numpy_point, python_point in zip(numpy_system, python_system):
+                for numpy_value, python_value in zip(numpy_point, python_point):
+                    self.assertAlmostEqual(numpy_value, python_value, places=6)
+
+    def test_no_points(self):
+        self.assertEqual(coordinate_batch.transform_points([], [], [[], []]), [[], []])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+"""JSON Lines and SQLite exports read back into the exported rows.
+
+Runs outside Revit with plain CPython:
+
+    python -m unittest discover -s tests
+"""
+
+import json
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import types
+import unittest
+
+# Load the button's lib folder as a package without running lib/__init__.py, which needs Revit
+LIB_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'lib')
+if 'lib' not in sys.modules:
+    lib = types.ModuleType('lib')
+    lib.__path__ = [LIB_DIR]
+    sys.modules['lib'] = lib
+from lib.column_store import ParameterStore, TEXT, DOUBLE, INTEGER, MISSING  # noqa: E402
+from lib.exporters import write_jsonl, write_sqlite, BATCH_SIZE  # noqa: E402
+
+PARAMETERS = ['Mark', 'Level', 'Width', 'Count', 'Comments']
+
+
+def build_store(count, raw=False):
+    store = ParameterStore(PARAMETERS, raw=raw)
+    for row in range(count):
+        cells = [(TEXT, f"M{row}"),
+                 (TEXT, f"Level {row % 3}") if row % 4 else (None, None),
+                 (DOUBLE, row * 0.5) if row % 5 else (None, None),
+                 (INTEGER, row) if row % 2 else (None, None),
+                 (None, None)]
+        store.append_row(f"guid-{row}", 1000 + row, cells)
+    return store
+
+
+def expected_rows(store):
+    return [[None if value == MISSING else value for value in store.row(row).values()] for row in range(len(store))]
+
+
+class ExportersTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_jsonl_round_trip(self):
+        store = build_store(50, raw=True)
+        path = os.path.join(self.directory, 'model.jsonl')
+        write_jsonl(store, path)
+        with open(path, 'r', encoding='utf-8') as jsonfile:
+            header = json.loads(jsonfile.readline())
+            lines = [json.loads(line) for line in jsonfile]
+        self.assertEqual(header['columns'], ['GUID', 'ElementId'] + PARAMETERS)
+        self.assertEqual(len(header['units']), len(header['columns']))
+        rows = [[cell if values is None or cell is None else values[cell]
+                 for cell, values in zip(line, header['values'])] for line in lines]
+        self.assertEqual(rows, expected_rows(store))
+
+    def test_sqlite_round_trip(self):
+        # More rows than one insert batch, and two documents sharing the value dictionary
+        stores = {'Model A': build_store(BATCH_SIZE + 7), 'Model B': build_store(20)}
+        path = os.path.join(self.directory, 'model.sqlite')
+        write_sqlite(stores, path)
+        connection = sqlite3.connect(path)
+        try:
+            documents = connection.execute("SELECT title, view_name FROM documents ORDER BY document_id").fetchall()
+            self.assertEqual([title for title, _ in documents], list(stores))
+            columns = ', '.join(f'"{name}"' for name in ['GUID', 'ElementId'] + PARAMETERS)
+            for title, view_name in documents:
+                rows = connection.execute(f"SELECT {columns} FROM {view_name} ORDER BY ElementId").fetchall()
+                self.assertEqual([list(row) for row in rows], expected_rows(stores[title]))
+            # Each value is stored once; 1 and 1.0 are distinct values, as in the exports
+            values = connection.execute("SELECT COUNT(*), COUNT(DISTINCT typeof(value) || ':' || value) "
+                                        "FROM value_dictionary").fetchone()
+            self.assertEqual(values[0], values[1])
+        finally:
+            connection.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+"""DocumentAudit grid matching across the 0/180 degree wrap.
+
+Runs outside Revit with plain CPython:
+
+    python -m unittest discover -s tests
+"""
+
+import unittest
+
+from revit_stubs import load_module
+
+grid_matcher = load_module('document_audit_lib', 'DocumentAudit.pushbutton', 'grid_matcher')
+
+
+def grid_line(name, start, end):
+    return f"{name}: {start[0]:.2f},{start[1]:.2f},0.00---{end[0]:.2f},{end[1]:.2f},0.00"
+
+
+def compare(host_lines, link_lines):
+    grid_data = {'host_doc': {'name': 'Host', 'grid_data': '\n'.join(host_lines)},
+                 'linked_docs': {('link.rvt', 1): {'name': 'Link', 'grid_data': '\n'.join(link_lines)}}}
+    rows = grid_matcher.compare_grids(grid_data, offset_tolerance=5.0, angle_tolerance=0.05)
+    return sorted((row['Link Grid'], row['Host Grid'], row['Status']) for row in rows)
+
+
+class GridMatcherTest(unittest.TestCase):
+
+    def test_reversed_grid_matches_across_the_wrap(self):
+        # The host grid runs at 0 degrees; the link draws it the other way, just under 180
+        host = [grid_line('A', (0.0, 1000.0), (10000.0, 1000.0))]
+        link = [grid_line('A', (10000.0, 1000.0), (0.0, 1000.5))]
+        angle = grid_matcher.parse_grid_data(link[0])[0]['angle']
+        self.assertGreater(angle, 179.9)
+        self.assertEqual(compare(host, link), [('A', 'A', grid_matcher.MATCH)])
+
+    def test_host_grid_just_under_180_matches_link_at_0(self):
+        host = [grid_line('1', (10000.0, -2000.0), (0.0, -1999.5))]
+        link = [grid_line('1', (0.0, -2000.0), (10000.0, -2000.0))]
+        self.assertEqual(compare(host, link), [('1', '1', grid_matcher.MATCH)])
+
+    def test_wrap_keeps_the_offset_sign(self):
+        # Flipping the direction flips the offset; a line mirrored about the origin is
+        # another line, not a match
+        host = [grid_line('A', (0.0, 1000.0), (10000.0, 1000.0))]
+        link = [grid_line('B', (10000.0, -1000.0), (0.0, -999.5))]
+        self.assertEqual(compare(host, link), [('', 'A', grid_matcher.MISSING), ('B', '', grid_matcher.EXTRA)])
+
+    def test_name_mismatch_and_misaligned(self):
+        host = [grid_line('A', (0.0, 0.0), (10000.0, 0.0)), grid_line('1', (0.0, 0.0), (0.0, 10000.0))]
+        link = [grid_line('B', (10000.0, 0.0), (0.0, 0.0)), grid_line('1', (100.0, 0.0), (100.0, 10000.0))]
+        self.assertEqual(compare(host, link), [('1', '1', grid_matcher.MISALIGNED),
+                                               ('B', 'A', grid_matcher.NAME_MISMATCH)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,187 @@
+"""Incremental export against fake documents.
+
+Runs outside Revit with plain CPython:
+
+    python -m unittest discover -s tests
+"""
+
+import csv
+import os
+import shutil
+import sys
+import tempfile
+import types
+import unittest
+
+# Load the button's lib folder as a package without running lib/__init__.py, which needs Revit
+LIB_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'lib')
+if 'lib' not in sys.modules:
+    lib = types.ModuleType('lib')
+    lib.__path__ = [LIB_DIR]
+    sys.modules['lib'] = lib
+from lib.column_store import TEXT  # noqa: E402
+from lib.exporters import write_wide_csv  # noqa: E402
+from lib.incremental import ExportIndex, IncrementalExporter  # noqa: E402
+
+PARAMETERS = ['Mark', 'Comments']
+
+
+class FakeId(object):
+    def __init__(self, value):
+        self.IntegerValue = value
+
+
+class FakeChanges(object):
+    def __init__(self, created, modified, deleted):
+        self.created, self.modified, self.deleted = created, modified, deleted
+
+    def GetCreatedElementIds(self):
+        return [FakeId(value) for value in self.created]
+
+    def GetModifiedElementIds(self):
+        return [FakeId(value) for value in self.modified]
+
+    def GetDeletedElementIds(self):
+        return [FakeId(value) for value in self.deleted]
+
+
+class FakeDocument(object):
+    """
+    Elements as id to parameter values, with a version number bumped by every edit and a
+    log of the edits since each version, like Document.GetChangedElements.
+    """
+
+    def __init__(self, elements, tracks_changes=True):
+        self.Title = 'Fake Model'
+        self.elements = dict(elements)
+        self.tracks_changes = tracks_changes
+        self.version = 0
+        self.log = []
+
+    def _edit(self, kind, elem_id):
+        self.version += 1
+        self.log.append((self.version, kind, elem_id))
+
+    def modify(self, elem_id, **values):
+        self.elements[elem_id].update(values)
+        self._edit('modified', elem_id)
+
+    def create(self, elem_id, **values):
+        self.elements[elem_id] = dict(values)
+        self._edit('created', elem_id)
+
+    def delete(self, elem_id):
+        del self.elements[elem_id]
+        self._edit('deleted', elem_id)
+
+    def GetChangedElements(self, guid):
+        since = int(str(guid))
+        edits = {'created': set(), 'modified': set(), 'deleted': set()}
+        for version, kind, elem_id in self.log:
+            if version > since:
+                edits[kind].add(elem_id)
+        return FakeChanges(edits['created'], edits['modified'] - edits['created'], edits['deleted'])
+
+    def append(self, store, elem_id):
+        values = self.elements[elem_id]
+        cells = [(TEXT, values[name]) if name in values else (None, None) for name in PARAMETERS]
+        store.append_row(f"guid-{elem_id}", elem_id, cells)
+
+    def read_all(self, store):
+        for elem_id in sorted(self.elements):
+            self.append(store, elem_id)
+
+    def read_elements(self, store, element_ids):
+        for elem_id in sorted(element_ids):
+            if elem_id in self.elements:
+                self.append(store, elem_id)
+
+
+class FakeDocumentApi(object):
+    """Stands in for Document.GetDocumentVersion of the Revit API."""
+
+    @staticmethod
+    def GetDocumentVersion(doc):
+        if not doc.tracks_changes:
+            return None
+        return types.SimpleNamespace(VersionGUID=doc.version)
+
+
+class IncrementalExportTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.export_path = os.path.join(self.directory, 'model.csv')
+        # Fake Revit modules for the change tracking helpers; Guid keeps the version as text
+        self.saved_modules = dict((name, sys.modules.get(name)) for name in
+                                  ('Autodesk', 'Autodesk.Revit', 'Autodesk.Revit.DB', 'System'))
+        revit_db = types.ModuleType('Autodesk.Revit.DB')
+        revit_db.Document = FakeDocumentApi
+        system = types.ModuleType('System')
+        system.Guid = str
+        sys.modules.update({'Autodesk': types.ModuleType('Autodesk'),
+                            'Autodesk.Revit': types.ModuleType('Autodesk.Revit'),
+                            'Autodesk.Revit.DB': revit_db, 'System': system})
+
+    def tearDown(self):
+        for name, module in self.saved_modules.items():
+            if module is None:
+                sys.modules.pop(name, None)
+            else:
+                sys.modules[name] = module
+        shutil.rmtree(self.directory)
+
+    def run_export(self, doc, parameters=PARAMETERS):
+        exporter = IncrementalExporter(doc, self.export_path, parameters, 'formatted', False,
+                                       doc.read_all, doc.read_elements)
+        return exporter.run(write_wide_csv)
+
+    def exported_rows(self):
+        with open(self.export_path, 'r', newline='', encoding='utf-8') as csvfile:
+            return dict((row['ElementId'], (row['Mark'], row['Comments'])) for row in csv.DictReader(csvfile))
+
+    def expected_rows(self, doc):
+        return dict((str(elem_id), (values.get('Mark', 'N/A'), values.get('Comments', 'N/A')))
+                    for elem_id, values in doc.elements.items())
+
+    def test_full_then_tracked_changes(self):
+        doc = FakeDocument({1: {'Mark': 'A'}, 2: {'Mark': 'B', 'Comments': 'x'}, 3: {'Mark': 'C'}})
+        self.assertEqual(self.run_export(doc), "full export of 3 elements")
+        self.assertEqual(self.exported_rows(), self.expected_rows(doc))
+        self.assertEqual(ExportIndex.load(self.export_path).version_token, '0')
+
+        doc.modify(2, Comments='y')
+        doc.create(4, Mark='D')
+        doc.delete(3)
+        self.assertEqual(self.run_export(doc), "2 changed and 1 deleted elements patched (change tracking)")
+        self.assertEqual(self.exported_rows(), self.expected_rows(doc))
+
+        index = ExportIndex.load(self.export_path)
+        self.assertEqual(index.version_token, '3')
+        self.assertEqual(set(index.hashes), set(['1', '2', '4']))
+
+    def test_unchanged_run_patches_nothing(self):
+        doc = FakeDocument({1: {'Mark': 'A'}})
+        self.run_export(doc)
+        self.assertEqual(self.run_export(doc), "0 changed and 0 deleted elements patched (change tracking)")
+
+    def test_hash_fallback_without_change_tracking(self):
+        doc = FakeDocument({1: {'Mark': 'A'}, 2: {'Mark': 'B'}, 3: {'Mark': 'C'}}, tracks_changes=False)
+        self.assertEqual(self.run_export(doc), "full export of 3 elements")
+        self.assertIsNone(ExportIndex.load(self.export_path).version_token)
+
+        doc.modify(1, Mark='Z')
+        doc.create(5, Mark='E')
+        doc.delete(2)
+        self.assertEqual(self.run_export(doc), "2 changed and 1 deleted elements patched (hash comparison)")
+        self.assertEqual(self.exported_rows(), self.expected_rows(doc))
+
+    def test_changed_parameters_force_full_export(self):
+        doc = FakeDocument({1: {'Mark': 'A', 'Comments': 'x'}})
+        self.run_export(doc, ['Mark'])
+        self.assertEqual(self.run_export(doc), "full export of 1 elements")
+        self.assertEqual(self.exported_rows(), self.expected_rows(doc))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+"""DocumentAudit level matching, with and without NumPy.
+
+Runs outside Revit with plain CPython:
+
+    python -m unittest discover -s tests
+"""
+
+import random
+import unittest
+from unittest import mock
+
+from revit_stubs import load_module
+
+level_matcher = load_module('document_audit_lib', 'DocumentAudit.pushbutton', 'level_matcher')
+
+HOST_LEVELS = "Level 1: 0.00\nLevel 2: 3000.00\nLevel 3: 6000.00\nLevel 4: 9500.00"
+# Level 1 matches, Level 2 is renamed, Level 3 is 50 mm off, Roof is not in the host and
+# Level 4 is missing
+LINK_LEVELS = "Level 1: 0.00\nL02: 3000.40\nLevel 3: 6050.00\nRoof: 9000.00"
+
+
+class LevelMatcherTest(unittest.TestCase):
+
+    def both_branches(self, check):
+        """Run a check with NumPy (when installed) and with the pure-Python fallback."""
+        if level_matcher.np is not None:
+            with self.subTest(branch='numpy'):
+                check()
+        with self.subTest(branch='python'), mock.patch.object(level_matcher, 'np', None):
+            check()
+
+    def test_nearest_levels_branches_agree(self):
+        if level_matcher.np is None:
+            self.skipTest("NumPy is not installed")
+        rng = random.Random(1)
+        elevations = sorted(rng.uniform(-5000.0, 50000.0) for _ in range(40))
+        # Queries on, between, exactly halfway between and outside the elevations
+        queries = [rng.uniform(-10000.0, 60000.0) for _ in range(200)] + elevations
+        queries += [(low + high) / 2.0 for low, high in zip(elevations, elevations[1:])]
+        numpy_indices, numpy_differences = level_matcher.nearest_levels(elevations, queries)
+        with mock.patch.object(level_matcher, 'np', None):
+            indices, differences = level_matcher.nearest_levels(elevations, queries)
+        self.assertEqual(numpy_indices, indices)
+        for numpy_difference, difference in zip(numpy_differences, differences):
+            self.assertAlmostEqual(numpy_difference, difference)
+
+    def test_nearest_levels(self):
+        def check():
+            indices, differences = level_matcher.nearest_levels([0.0, 3000.0, 6000.0], [-10.0, 2990.0, 4600.0, 7000.0])
+            self.assertEqual(indices, [0, 1, 2, 2])
+            self.assertEqual([round(difference, 6) for difference in differences], [-10.0, -10.0, -1400.0, 1000.0])
+        self.both_branches(check)
+
+    def test_offset_renamed_and_missing_levels(self):
+        def check():
+            host = level_matcher.parse_level_data(HOST_LEVELS)
+            link = level_matcher.parse_level_data(LINK_LEVELS)
+            column, exceptions = level_matcher.compare_link_levels(host, link, 'Structure', 1.0)
+            self.assertEqual(column, {0: '+0.0', 1: 'L02 +0.4', 2: '+50.0', 3: level_matcher.NO_MATCH})
+            issues = sorted((row['Link Level'], row['Host Level'], row['Issue'], row['Difference (mm)'])
+                            for row in exceptions)
+            self.assertEqual(issues, [
+                ('', 'Level 4', level_matcher.MISSING, ''),
+                ('L02', 'Level 2', level_matcher.RENAMED, '+0.4'),
+                ('Level 3', 'Level 3', level_matcher.OFFSET, '+50.0'),
+                ('Roof', '', level_matcher.EXTRA, ''),
+            ])
+        self.both_branches(check)
+
+    def test_link_elevation_offset(self):
+        def check():
+            rows = [{'Document Name': 'Host', 'Level Data': HOST_LEVELS},
+                    {'Document Name': 'Raised', 'Level Data': "Level 1: -1000.00\nLevel 2: 2000.00\n"
+                                                              "Level 3: 5000.00\nLevel 4: 8500.00"}]
+            matrix, fieldnames, exceptions = level_matcher.compare_levels(rows, 'Host', {'Raised': 1000.0}, 1.0)
+            self.assertEqual(fieldnames, level_matcher.MATRIX_BASE_FIELDS + ['Raised'])
+            self.assertEqual([row['Raised'] for row in matrix], ['+0.0'] * 4)
+            self.assertEqual(exceptions, [])
+        self.both_branches(check)
+
+
+if __name__ == '__main__':
+    unittest.main()
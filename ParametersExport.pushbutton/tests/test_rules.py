@@ -0,0 +1,106 @@
+"""Parameter rules over a column store, with and without NumPy.
+
+Runs outside Revit with plain CPython:
+
+    python -m unittest discover -s tests
+"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import types
+import unittest
+from unittest import mock
+
+# Load the button's lib folder as a package without running lib/__init__.py, which needs Revit
+LIB_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'lib')
+if 'lib' not in sys.modules:
+    lib = types.ModuleType('lib')
+    lib.__path__ = [LIB_DIR]
+    sys.modules['lib'] = lib
+from lib import profiling, rules  # noqa: E402
+from lib.column_store import ParameterStore, TEXT, DOUBLE  # noqa: E402
+
+PARAMETERS = ['Mark', 'Fire Rating', 'Level', 'Width']
+ELEMENTS = [
+    # category, Mark, Fire Rating, Level, Width
+    ('Doors', 'D1', '60', 'Level 1', 900.0),
+    ('Doors', 'D1', None, 'Level 1', 1200.0),
+    ('Doors', 'D1', '90', 'Level 2', None),
+    ('Doors', 'X-3', '45', 'Level 2', 2400.0),
+    ('Walls', 'W1', None, 'Level 1', 200.0),
+]
+RULES = {"rules": [
+    {"name": "Fire rating", "category": "Doors", "parameter": "Fire Rating", "check": "not_empty"},
+    {"name": "Rating values", "parameter": "Fire Rating", "check": "in", "values": [60, 90]},
+    {"name": "Mark format", "category": "Doors", "parameter": "Mark", "check": "regex", "pattern": "^D\\d+$"},
+    {"name": "Door width", "category": "Doors", "parameter": "Width", "check": "range", "min": 800, "max": 2000},
+    {"name": "Mark per level", "parameter": "Mark", "check": "unique", "group_by": ["Level"]},
+    {"name": "Not exported", "parameter": "Comments", "check": "not_empty"},
+]}
+EXPECTED = [
+    ('Door width', 4),
+    ('Fire rating', 2),
+    ('Mark format', 4),
+    ('Mark per level', 1),
+    ('Mark per level', 2),
+    ('Rating values', 4),
+]
+
+
+def build_store():
+    store = ParameterStore(PARAMETERS, raw=True)
+    for element_id, (category, *values) in enumerate(ELEMENTS, 1):
+        cells = [(None, None) if value is None else (DOUBLE if isinstance(value, float) else TEXT, value)
+                 for value in values]
+        store.append_row(f"guid-{element_id}", element_id, cells, category)
+    return store
+
+
+class RulesTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        path = os.path.join(self.directory, 'rules.json')
+        with open(path, 'w', encoding='utf-8') as rule_file:
+            json.dump(RULES, rule_file)
+        self.rules = rules.load_rules(path)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def evaluate(self):
+        violations, warnings = rules.evaluate_rules(build_store(), self.rules)
+        return sorted((row['Rule'], row['ElementId']) for row in violations), warnings
+
+    def test_violations(self):
+        branches = [('python', None)]
+        if rules.np is not None:
+            branches.append(('numpy', rules.np))
+        for branch, np in branches:
+            with self.subTest(branch=branch), mock.patch.object(rules, 'np', np), \
+                    mock.patch.object(profiling, 'np', np):
+                violations, warnings = self.evaluate()
+                self.assertEqual(violations, EXPECTED)
+                self.assertEqual(warnings, ["Rule 'Not exported' skipped: Comments not exported"])
+
+    def test_range_on_text_column_is_skipped(self):
+        store = ParameterStore(['Width'])
+        store.append_row('guid-1', 1, [(TEXT, '900 mm')], 'Doors')
+        rule = {'name': 'Width', 'parameter': 'Width', 'check': 'range', 'min': 800}
+        violations, warnings = rules.evaluate_rules(store, [rule])
+        self.assertEqual(violations, [])
+        self.assertEqual(len(warnings), 1)
+
+    def test_invalid_rule_file(self):
+        path = os.path.join(self.directory, 'invalid.json')
+        with open(path, 'w', encoding='utf-8') as rule_file:
+            json.dump({"rules": [{"parameter": "Mark", "check": "sorted"}]}, rule_file)
+        with self.assertRaises(rules.RuleError):
+            rules.load_rules(path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+"""Stratified sample sizes and estimates.
+
+Runs outside Revit with plain CPython:
+
+    python -m unittest discover -s tests
+"""
+
+import unittest
+
+import revit_stubs  # noqa: F401  (puts the shared lib folder on sys.path)
+from coordination_toolkit.sampling import StratifiedSample, parse_sample_spec  # noqa: E402
+
+
+def population(sizes):
+    """Items as (stratum, number) pairs, sizes[i] items in stratum i."""
+    return [(stratum, number) for stratum, size in enumerate(sizes) for number in range(size)]
+
+
+def draw(sample, items):
+    return sample.draw(items, lambda item: item[0])
+
+
+class StratifiedSampleTest(unittest.TestCase):
+
+    def test_exact_size(self):
+        items = population([1000, 333, 97, 41, 7, 3, 1, 1])
+        for size in (1, 5, 16, 17, 100, 250, 999, len(items)):
+            with self.subTest(size=size):
+                sample = StratifiedSample(size=size, seed=size)
+                drawn = draw(sample, items)
+                self.assertEqual(len(drawn), size)
+                self.assertEqual(len(set(item for _, item in drawn)), size)
+                self.assertEqual(sample.sampled, size)
+                self.assertEqual(sample.population, len(items))
+
+    def test_size_larger_than_population_draws_everything(self):
+        items = population([5, 3])
+        drawn = draw(StratifiedSample(size=50, seed=0), items)
+        self.assertEqual(sorted(item for _, item in drawn), sorted(items))
+
+    def test_every_stratum_gets_its_minimum(self):
+        sample = StratifiedSample(size=20, seed=1)
+        draw(sample, population([1000, 10, 10, 1]))
+        self.assertEqual(sample.sampled, 20)
+        self.assertEqual([sample.strata[stratum][1] >= min(2, size)
+                          for stratum, size in enumerate([1000, 10, 10, 1])], [True] * 4)
+
+    def test_fraction_rounds_each_stratum_up(self):
+        sample = StratifiedSample(fraction=0.1, seed=2)
+        draw(sample, population([95, 11, 1]))
+        self.assertEqual([sample.strata[stratum][1] for stratum in range(3)], [10, 2, 1])
+
+    def test_whole_population_estimates_exactly(self):
+        items = population([40, 60])
+        sample = StratifiedSample(size=len(items), seed=3)
+        drawn = draw(sample, items)
+        hits = {}
+        for stratum, item in drawn:
+            if item[1] % 2 == 0:
+                hits[stratum] = hits.get(stratum, 0) + 1
+        estimate, low, high = sample.estimate_proportion(hits)
+        self.assertAlmostEqual(estimate, 0.5)
+        self.assertAlmostEqual(low, 0.5)
+        self.assertAlmostEqual(high, 0.5)
+
+    def test_parse_sample_spec(self):
+        self.assertEqual(parse_sample_spec('10%'), (None, 0.1))
+        self.assertEqual(parse_sample_spec('0.25'), (None, 0.25))
+        self.assertEqual(parse_sample_spec('1,000'), (1000, None))
+        for text in ('0', '-5', '150%', 'abc'):
+            with self.subTest(text=text), self.assertRaises(ValueError):
+                parse_sample_spec(text)
+
+
+if __name__ == '__main__':
+    unittest.main()
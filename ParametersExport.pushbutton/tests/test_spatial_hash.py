@@ -0,0 +1,68 @@
+"""AutoAudit spatial hash overlap search, with and without NumPy.
+
+Runs outside Revit with plain CPython:
+
+    python -m unittest discover -s tests
+"""
+
+import random
+import unittest
+from unittest import mock
+
+from revit_stubs import load_module
+
+spatial_hash = load_module('auto_audit_lib', 'AutoAudit.pushbutton', 'spatial_hash')
+
+
+def random_boxes(count, seed):
+    """Small boxes scattered over a floor plate, plus a few spanning most of it."""
+    rng = random.Random(seed)
+    mins, maxs = [], []
+    for index in range(count):
+        size = rng.uniform(50.0, 150.0) if index % 50 == 0 else rng.uniform(0.5, 4.0)
+        low = tuple(rng.uniform(0.0, 60.0) for _ in range(2)) + (rng.uniform(0.0, 10.0),)
+        mins.append(low)
+        maxs.append((low[0] + size, low[1] + rng.uniform(0.5, 4.0), low[2] + rng.uniform(0.5, 4.0)))
+    return mins, maxs
+
+
+def brute_force_pairs(mins, maxs):
+    return sorted((i, j) for i in range(len(mins)) for j in range(i + 1, len(mins))
+                  if spatial_hash._overlaps(mins[i], maxs[i], mins[j], maxs[j]))
+
+
+class OverlappingPairsTest(unittest.TestCase):
+
+    def test_pure_python_matches_brute_force(self):
+        mins, maxs = random_boxes(400, 3)
+        with mock.patch.object(spatial_hash, 'np', None):
+            pairs = spatial_hash.overlapping_pairs(mins, maxs)
+        self.assertEqual(len(pairs), len(set(pairs)))
+        self.assertEqual(sorted(pairs), brute_force_pairs(mins, maxs))
+
+    def test_branches_agree(self):
+        np = spatial_hash.np
+        if np is None:
+            self.skipTest("NumPy is not installed")
+        mins, maxs = random_boxes(400, 4)
+        numpy_pairs = spatial_hash.overlapping_pairs(np.asarray(mins), np.asarray(maxs))
+        with mock.patch.object(spatial_hash, 'np', None):
+            python_pairs = spatial_hash.overlapping_pairs(mins, maxs)
+        self.assertEqual(sorted(numpy_pairs), sorted(python_pairs))
+        with mock.patch.object(spatial_hash, 'np', None):
+            python_ratios = spatial_hash.overlap_ratios(mins, maxs, sorted(python_pairs))
+        numpy_ratios = spatial_hash.overlap_ratios(np.asarray(mins), np.asarray(maxs), sorted(numpy_pairs))
+        for numpy_ratio, python_ratio in zip(numpy_ratios, python_ratios):
+            self.assertAlmostEqual(numpy_ratio, python_ratio)
+
+    def test_touching_boxes_and_accept_filter(self):
+        mins = [(0.0, 0.0, 0.0), (1.0, 0.0, 0.0), (5.0, 5.0, 5.0)]
+        maxs = [(1.0, 1.0, 1.0), (2.0, 1.0, 1.0), (6.0, 6.0, 6.0)]
+        with mock.patch.object(spatial_hash, 'np', None):
+            self.assertEqual(spatial_hash.overlapping_pairs(mins, maxs, cell_size=1.0), [(0, 1)])
+            self.assertEqual(spatial_hash.overlapping_pairs(mins, maxs, cell_size=1.0,
+                                                            accept=lambda i, j: False), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,6 @@
+"""Invalidate the session cache of the tools when a document changes."""
+from pyrevit import EXEC_PARAMS
+
+from coordination_toolkit.session_cache import invalidate
+
+invalidate(EXEC_PARAMS.event_args.GetDocument())
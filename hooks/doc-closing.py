@@ -0,0 +1,6 @@
+"""Drop the session cache entries of a document and its links when it closes."""
+from pyrevit import EXEC_PARAMS
+
+from coordination_toolkit.session_cache import evict
+
+evict(EXEC_PARAMS.event_args.Document)
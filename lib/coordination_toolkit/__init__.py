@@ -0,0 +1,5 @@
+"""Helpers shared by the AutoAudit, DocumentAudit and ParametersExport tools.
+
+pyRevit puts the extension's lib folder on sys.path, so the tools import these modules as
+coordination_toolkit.<module>. The modules do not depend on any single tool's lib package.
+"""
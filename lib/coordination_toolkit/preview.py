@@ -0,0 +1,182 @@
+"""Shared paged preview window for collected audit and export data.
+
+Each dataset is shown one page at a time in a virtualised DataGrid. Sorting (click a
+column header) and filtering run on the underlying RowSource, not on rendered markup, so
+the window opens instantly regardless of how many rows were collected.
+"""
+
+import clr
+clr.AddReference('System.Data')
+clr.AddReference('PresentationFramework')
+
+from pyrevit import forms
+from System.Data import DataTable
+from System.Windows import Visibility
+from System.Windows.Controls import DataGridTextColumn
+from System.Windows.Data import Binding
+
+from coordination_toolkit.row_source import RowSource
+
+ALL_COLUMNS = '(all columns)'
+
+PREVIEW_XAML = """
+<Window xmlns="http://schemas.microsoft.com/winfx/2006/xaml/presentation"
+        xmlns:x="http://schemas.microsoft.com/winfx/2006/xaml"
+        Title="Data Preview" Width="1100" Height="680" WindowStartupLocation="CenterScreen">
+    <DockPanel Margin="8">
+        <StackPanel DockPanel.Dock="Top" Orientation="Horizontal" Margin="0,0,0,6">
+            <TextBlock Text="Dataset:" VerticalAlignment="Center" Margin="0,0,4,0"/>
+            <ComboBox x:Name="dataset_combo" Width="280"/>
+            <TextBlock Text="Filter:" VerticalAlignment="Center" Margin="16,0,4,0"/>
+            <ComboBox x:Name="filter_column_combo" Width="180"/>
+            <TextBox x:Name="filter_box" Width="220" Margin="4,0,0,0" VerticalContentAlignment="Center"/>
+            <Button x:Name="filter_button" Content="Apply" Width="60" Margin="4,0,0,0" IsDefault="True"/>
+            <Button x:Name="clear_button" Content="Clear" Width="60" Margin="4,0,0,0"/>
+        </StackPanel>
+        <TextBlock x:Name="note_label" DockPanel.Dock="Top" FontWeight="Bold" Margin="0,0,0,6" TextWrapping="Wrap"/>
+        <DockPanel DockPanel.Dock="Bottom" Margin="0,6,0,0">
+            <StackPanel DockPanel.Dock="Left" Orientation="Horizontal">
+                <Button x:Name="first_button" Content="|&lt;" Width="32"/>
+                <Button x:Name="previous_button" Content="&lt;" Width="32" Margin="4,0,0,0"/>
+                <TextBlock x:Name="page_label" VerticalAlignment="Center" Margin="8,0,8,0"/>
+                <Button x:Name="next_button" Content="&gt;" Width="32"/>
+                <Button x:Name="last_button" Content="&gt;|" Width="32" Margin="4,0,0,0"/>
+            </StackPanel>
+            <StackPanel Orientation="Horizontal" HorizontalAlignment="Right">
+                <Button x:Name="accept_button" Content="Export" Width="90"/>
+                <Button x:Name="close_button" Content="Close" Width="90" Margin="6,0,0,0" IsCancel="True"/>
+            </StackPanel>
+        </DockPanel>
+        <DataGrid x:Name="data_grid" AutoGenerateColumns="False" IsReadOnly="True"
+                  CanUserSortColumns="True" CanUserAddRows="False"
+                  EnableRowVirtualization="True" EnableColumnVirtualization="True"
+                  VirtualizingPanel.IsVirtualizing="True" VirtualizingPanel.VirtualizationMode="Recycling"/>
+    </DockPanel>
+</Window>
+"""
+
+
+class PagedPreviewWindow(forms.WPFWindow):
+    """
+    Preview of one or more datasets, one page at a time.
+
+    Args:
+        datasets (dict): Dataset name to a RowSource or to a list of dictionaries.
+        title (str): The window title.
+        accept_label (str, optional): Caption of the button that closes the window with a
+            positive answer (e.g. 'Export'); None hides the button.
+        notes (dict, optional): Dataset name to a note shown above its rows.
+    """
+
+    def __init__(self, datasets, title='Data Preview', accept_label='Export', notes=None):
+        forms.WPFWindow.__init__(self, PREVIEW_XAML, literal_string=True)
+        self.Title = title
+        self.sources = {}
+        for name, rows in datasets.items():
+            self.sources[name] = rows if isinstance(rows, RowSource) else RowSource(rows)
+        self.notes = notes or {}
+        self.accepted = False
+        self.current = None
+        self.page_number = 0
+
+        if accept_label:
+            self.accept_button.Content = accept_label
+        else:
+            self.accept_button.Visibility = Visibility.Collapsed
+
+        for name in self.sources:
+            self.dataset_combo.Items.Add(name)
+        self.dataset_combo.SelectionChanged += self.dataset_changed
+        self.filter_button.Click += self.filter_click
+        self.clear_button.Click += self.clear_click
+        self.first_button.Click += lambda sender, args: self.show_page(0)
+        self.previous_button.Click += lambda sender, args: self.show_page(self.page_number - 1)
+        self.next_button.Click += lambda sender, args: self.show_page(self.page_number + 1)
+        self.last_button.Click += lambda sender, args: self.show_page(self.current.page_count - 1)
+        self.accept_button.Click += self.accept_click
+        self.close_button.Click += lambda sender, args: self.Close()
+        self.data_grid.Sorting += self.grid_sorting
+
+        if self.sources:
+            self.dataset_combo.SelectedIndex = 0
+
+    def dataset_changed(self, sender, args):
+        self.current = self.sources[self.dataset_combo.SelectedItem]
+        self.filter_column_combo.Items.Clear()
+        self.filter_column_combo.Items.Add(ALL_COLUMNS)
+        for column in self.current.columns:
+            self.filter_column_combo.Items.Add(column)
+        self.filter_column_combo.SelectedIndex = 0
+        self.filter_box.Text = self.current.filter_text
+        self.note_label.Text = self.notes.get(self.dataset_combo.SelectedItem, '')
+        self.note_label.Visibility = Visibility.Visible if self.note_label.Text else Visibility.Collapsed
+        self.build_columns()
+        self.show_page(0)
+
+    def build_columns(self):
+        # Cells are bound by position, so column names may hold any characters
+        self.data_grid.Columns.Clear()
+        for index, column in enumerate(self.current.columns):
+            grid_column = DataGridTextColumn()
+            grid_column.Header = column
+            grid_column.Binding = Binding(f"c{index}")
+            grid_column.SortMemberPath = column
+            self.data_grid.Columns.Add(grid_column)
+
+    def show_page(self, number):
+        source = self.current
+        self.page_number = min(max(number, 0), source.page_count - 1)
+        table = DataTable()
+        for index in range(len(source.columns)):
+            table.Columns.Add(f"c{index}")
+        for _, values in source.page(self.page_number):
+            table.Rows.Add(*["" if value is None else str(value) for value in values])
+        self.data_grid.ItemsSource = table.DefaultView
+
+        first = self.page_number * source.page_size + 1 if len(source) else 0
+        last = min((self.page_number + 1) * source.page_size, len(source))
+        shown = f"{len(source):,} of {source.total:,} rows" if source.filter_text else f"{source.total:,} rows"
+        self.page_label.Text = f"Page {self.page_number + 1} of {source.page_count}  ({first:,}-{last:,}, {shown})"
+
+    def grid_sorting(self, sender, args):
+        # Sort the whole dataset instead of the rows of the visible page
+        args.Handled = True
+        self.current.set_sort(args.Column.SortMemberPath)
+        self.show_page(0)
+
+    def filter_click(self, sender, args):
+        column = self.filter_column_combo.SelectedItem
+        self.current.set_filter(self.filter_box.Text, None if column in (None, ALL_COLUMNS) else column)
+        self.show_page(0)
+
+    def clear_click(self, sender, args):
+        self.filter_box.Text = ''
+        self.current.set_filter('')
+        self.show_page(0)
+
+    def accept_click(self, sender, args):
+        self.accepted = True
+        self.Close()
+
+
+def show_paged_preview(datasets, title='Data Preview', accept_label='Export', notes=None):
+    """
+    Show datasets in the paged preview window.
+
+    Args:
+        datasets (dict): Dataset name to a RowSource or to a list of dictionaries. Empty
+            datasets are left out.
+        title (str): The window title.
+        accept_label (str, optional): Caption of the accept button; None hides it.
+        notes (dict, optional): Dataset name to a note shown above its rows.
+
+    Returns:
+        bool: True if the window was closed with the accept button.
+    """
+    datasets = {name: rows for name, rows in datasets.items() if len(rows)}
+    if not datasets:
+        forms.alert("There is no data to preview.", title=title)
+        return False
+    window = PagedPreviewWindow(datasets, title, accept_label, notes)
+    window.ShowDialog()
+    return window.accepted
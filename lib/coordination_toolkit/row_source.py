@@ -0,0 +1,119 @@
+"""Paged, sortable and filterable access to collected rows.
+
+A RowSource never renders anything. Sorting and filtering work on row indices over the
+collected data, and only the rows of the requested page are materialised, so a preview of
+any size opens in the time it takes to build one page.
+"""
+
+import math
+
+PAGE_SIZE = 200
+
+
+def sort_key(value):
+    """
+    Order numbers numerically, text case-insensitively and empty values last.
+    """
+    if value is None or value == '' or value == 'N/A':
+        return (2, 0.0, '')
+    if isinstance(value, bool):
+        return (1, 0.0, str(value).lower())
+    if isinstance(value, (int, float)):
+        return (0, float(value), '')
+    text = str(value)
+    try:
+        return (0, float(text.replace(',', '')), '')
+    except ValueError:
+        return (1, 0.0, text.lower())
+
+
+class RowSource(object):
+    """
+    Pages over a sequence of rows.
+
+    Args:
+        rows: A sequence supporting len() and indexing that returns dictionaries, e.g. a list
+            of dictionaries or a ParameterStore.
+        columns (list, optional): The columns to show; defaults to the keys of the first row.
+        get_value (callable, optional): get_value(rows, index, column) reads one cell
+            without building the whole row. Defaults to rows[index].get(column).
+        page_size (int): Rows per page.
+    """
+
+    def __init__(self, rows, columns=None, get_value=None, page_size=PAGE_SIZE):
+        self.rows = rows
+        if columns is None:
+            columns = list(rows[0].keys()) if len(rows) else []
+        self.columns = list(columns)
+        self.get_value = get_value or (lambda rows, index, column: rows[index].get(column))
+        self.page_size = page_size
+        self.sort_column = None
+        self.descending = False
+        self.filter_text = ''
+        self.filter_column = None
+        # Row indices after filtering and sorting; None while neither is applied
+        self.order = None
+
+    def __len__(self):
+        return len(self.rows) if self.order is None else len(self.order)
+
+    @property
+    def total(self):
+        return len(self.rows)
+
+    @property
+    def page_count(self):
+        return max(1, int(math.ceil(len(self) / float(self.page_size))))
+
+    def page(self, number):
+        """
+        Get the rows of one page.
+
+        Args:
+            number (int): Zero-based page number, clamped to the available pages.
+
+        Returns:
+            list: (row index, list of cell values in column order) tuples.
+        """
+        number = min(max(number, 0), self.page_count - 1)
+        start = number * self.page_size
+        stop = min(start + self.page_size, len(self))
+        indices = range(start, stop) if self.order is None else self.order[start:stop]
+        return [(index, [self.get_value(self.rows, index, column) for column in self.columns])
+                for index in indices]
+
+    def set_filter(self, text, column=None):
+        """
+        Keep rows containing text (case-insensitive), in one column or in any column.
+        """
+        self.filter_text = (text or '').strip()
+        self.filter_column = column
+        self._apply()
+
+    def set_sort(self, column, descending=None):
+        """
+        Sort by a column. Without an explicit direction, sorting the same column again
+        reverses it.
+        """
+        if descending is None:
+            descending = column == self.sort_column and not self.descending
+        self.sort_column = column
+        self.descending = descending
+        self._apply()
+
+    def _apply(self):
+        if not self.filter_text and self.sort_column is None:
+            self.order = None
+            return
+        indices = range(len(self.rows))
+        if self.filter_text:
+            needle = self.filter_text.lower()
+            columns = [self.filter_column] if self.filter_column else self.columns
+            indices = [index for index in indices
+                       if any(needle in str(self.get_value(self.rows, index, column)).lower() for column in columns)]
+        if self.sort_column is not None:
+            keys = [(sort_key(self.get_value(self.rows, index, self.sort_column)), index) for index in indices]
+            # Empty cells stay at the end in both directions
+            filled = sorted((item for item in keys if item[0][0] != 2), reverse=self.descending)
+            indices = [index for _, index in filled] + [index for key, index in keys if key[0] == 2]
+        self.order = list(indices)
@@ -0,0 +1,185 @@
+"""Stratified sampling for quick scans of large models.
+
+Items are grouped into strata (e.g. category and type, or view type), a random sample is
+drawn from every stratum in proportion to its size, and the results measured on the sample
+are scaled back to the whole population with normal-approximation confidence intervals.
+"""
+
+import math
+import random
+
+# Two-sided 95 % confidence
+Z_95 = 1.96
+# Strata with at least this many items get at least this many samples, so their variance
+# can be estimated, as long as a sample size leaves room for it
+MIN_PER_STRATUM = 2
+SAMPLED_LABEL = 'sampled'
+
+
+def parse_sample_spec(text):
+    """
+    Read a sample size typed by the user.
+
+    Args:
+        text (str): A percentage ("5%"), a fraction ("0.05") or an item count ("1000").
+
+    Returns:
+        tuple: (size, fraction), one of them None.
+
+    Raises:
+        ValueError: If the text is not a positive size or a fraction up to 100 %.
+    """
+    text = text.strip().replace(',', '')
+    if text.endswith('%'):
+        fraction = float(text[:-1]) / 100.0
+    elif '.' in text:
+        fraction = float(text)
+    else:
+        size = int(text)
+        if size <= 0:
+            raise ValueError(f"Sample size must be positive: {text}")
+        return size, None
+    if not 0 < fraction <= 1:
+        raise ValueError(f"Sample fraction must be between 0 and 100 %: {text}")
+    return None, fraction
+
+
+class StratifiedSample(object):
+    """
+    A proportional stratified sample and the estimators that scale its results.
+
+    Args:
+        size (int, optional): Total number of items to draw.
+        fraction (float, optional): Share of every stratum to draw; used when size is None.
+        seed (int, optional): Seed for a reproducible draw.
+    """
+
+    def __init__(self, size=None, fraction=None, seed=None):
+        if size is None and fraction is None:
+            raise ValueError("A sample needs a size or a fraction")
+        self.size = size
+        self.fraction = fraction
+        self.random = random.Random(seed)
+        # stratum: [population, sampled]
+        self.strata = {}
+
+    @property
+    def population(self):
+        return sum(population for population, _ in self.strata.values())
+
+    @property
+    def sampled(self):
+        return sum(sampled for _, sampled in self.strata.values())
+
+    def label(self):
+        """Describe the sample for report titles, e.g. 'sampled: 412 of 8,240'."""
+        return f"{SAMPLED_LABEL}: {self.sampled:,} of {self.population:,}"
+
+    def _allocation(self, populations):
+        if self.size is None:
+            return [min(population, max(int(math.ceil(population * self.fraction)),
+                                        min(MIN_PER_STRATUM, population)))
+                    for population in populations]
+        budget = min(self.size, sum(populations))
+        minimums = [min(MIN_PER_STRATUM, population) for population in populations]
+        if sum(minimums) > budget:
+            # More strata than the budget covers: drop the minimum, stay proportional
+            minimums = [0] * len(populations)
+        # Share what is left after the minimums by largest remainder, so the total is the size
+        spare = [population - minimum for population, minimum in zip(populations, minimums)]
+        remaining = budget - sum(minimums)
+        quotas = [remaining * float(capacity) / sum(spare) if remaining else 0.0 for capacity in spare]
+        counts = [minimum + int(quota) for minimum, quota in zip(minimums, quotas)]
+        by_remainder = sorted(range(len(quotas)), key=lambda index: int(quotas[index]) - quotas[index])
+        for index in by_remainder[:budget - sum(counts)]:
+            counts[index] += 1
+        return counts
+
+    def draw(self, items, stratum_of):
+        """
+        Draw the sample.
+
+        With a size, exactly that many items are drawn (or the whole population if it is
+        smaller); with a fraction, every stratum gets its share rounded up.
+
+        Args:
+            items (iterable): The population.
+            stratum_of (callable): Returns the stratum key of an item.
+
+        Returns:
+            list: (stratum, item) tuples of the sampled items, grouped by stratum.
+        """
+        groups = {}
+        for item in items:
+            groups.setdefault(stratum_of(item), []).append(item)
+        allocation = self._allocation([len(group) for group in groups.values()])
+
+        drawn = []
+        for (stratum, group), count in zip(groups.items(), allocation):
+            counts = self.strata.setdefault(stratum, [0, 0])
+            counts[0] += len(group)
+            counts[1] += count
+            drawn.extend((stratum, item) for item in self.random.sample(group, count))
+        return drawn
+
+    def weight(self, stratum):
+        """Number of population items a sampled item of the stratum stands for."""
+        population, sampled = self.strata[stratum]
+        return float(population) / sampled if sampled else 0.0
+
+    def estimate_proportion(self, hits, strata=None):
+        """
+        Estimate the share of the population meeting a condition.
+
+        Uses the stratified estimator with finite population correction.
+
+        Args:
+            hits (dict): Stratum to the number of sampled items meeting the condition.
+            strata (iterable, optional): The strata making up the population of interest;
+                defaults to every stratum.
+
+        Returns:
+            tuple: (estimate, lower bound, upper bound), each between 0 and 1, or
+                   (None, None, None) if the strata hold no items.
+        """
+        strata = list(self.strata) if strata is None else [s for s in strata if s in self.strata]
+        population = sum(self.strata[s][0] for s in strata)
+        if not population:
+            return None, None, None
+        estimate = 0.0
+        variance = 0.0
+        for stratum in strata:
+            stratum_population, sampled = self.strata[stratum]
+            if not sampled:
+                continue
+            share = float(stratum_population) / population
+            proportion = float(hits.get(stratum, 0)) / sampled
+            estimate += share * proportion
+            if sampled > 1:
+                correction = 1.0 - float(sampled) / stratum_population
+                variance += share ** 2 * correction * proportion * (1 - proportion) / (sampled - 1)
+        margin = Z_95 * math.sqrt(variance)
+        return estimate, max(0.0, estimate - margin), min(1.0, estimate + margin)
+
+    def estimate_count(self, hits, strata=None):
+        """
+        Estimate how many population items meet a condition.
+
+        Returns:
+            tuple: (estimate, lower bound, upper bound) as item counts.
+        """
+        strata = list(self.strata) if strata is None else [s for s in strata if s in self.strata]
+        population = sum(self.strata[s][0] for s in strata)
+        estimate, low, high = self.estimate_proportion(hits, strata)
+        if estimate is None:
+            return 0, 0, 0
+        return estimate * population, low * population, high * population
+
+
+def format_estimate(estimate, low, high, percent=True):
+    """Format an estimate and its 95 % interval, e.g. '82.4% (78.1-86.7%)'."""
+    if estimate is None:
+        return ''
+    if percent:
+        return f"{estimate * 100:.1f}% ({low * 100:.1f}-{high * 100:.1f}%)"
+    return f"{estimate:,.0f} ({low:,.0f}-{high:,.0f})"
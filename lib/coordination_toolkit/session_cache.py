@@ -0,0 +1,160 @@
+"""Revit-session cache for collections shared by the tools.
+
+Entries live in the AppDomain, so they outlive a single tool run. They are keyed by
+document identity (path, or title for unsaved documents) and a collection name, so
+DocumentAudit, AutoAudit and ParametersExport can reuse the links, views, levels, grids and
+worksets another tool already collected.
+
+Invalidation goes through a per-document generation counter that is also stored in the
+AppDomain as a plain integer. The extension's doc-changed hook bumps it, whatever Python
+engine it runs in, and cached entries of an older generation are reloaded. The doc-closing
+hook also drops the entries of the closing document and its links. Entries of linked
+documents also depend on the generation of their host, since reloading a link changes the
+host.
+
+This module is imported by the hooks, so it keeps to syntax every pyRevit engine accepts.
+"""
+
+CACHE_SLOT = 'coordination_toolkit.session_cache'
+GENERATION_PREFIX = 'coordination_toolkit.generation:'
+HOSTS_NAME = '__hosts__'
+
+# Used when there is no AppDomain (outside Revit)
+_LOCAL = {'store': {}, 'generations': {}}
+_STATS = {'hits': 0, 'misses': 0}
+
+
+def _domain():
+    try:
+        from System import AppDomain
+        return AppDomain.CurrentDomain
+    except Exception:
+        return None
+
+
+def document_identity(doc):
+    """
+    Identify a document by its file path, falling back to its title for unsaved documents.
+    """
+    return doc.PathName or doc.Title
+
+
+def _store():
+    domain = _domain()
+    if domain is None:
+        return _LOCAL['store']
+    store = domain.GetData(CACHE_SLOT)
+    if store is None:
+        store = {}
+        try:
+            domain.SetData(CACHE_SLOT, store)
+        except Exception:
+            return _LOCAL['store']
+    return store
+
+
+def get_generation(identity):
+    """Get how many times a document has been invalidated this session."""
+    domain = _domain()
+    if domain is None:
+        return _LOCAL['generations'].get(identity, 0)
+    value = domain.GetData(GENERATION_PREFIX + identity)
+    return int(value) if value is not None else 0
+
+
+def _bump_generation(identity):
+    domain = _domain()
+    if domain is None:
+        _LOCAL['generations'][identity] = _LOCAL['generations'].get(identity, 0) + 1
+    else:
+        domain.SetData(GENERATION_PREFIX + identity, get_generation(identity) + 1)
+
+
+def _entry_generation(store, identity):
+    # Generations only grow, so the sum changes whenever the document or a host changes
+    generation = get_generation(identity)
+    for host in store.get((identity, HOSTS_NAME), ()):
+        generation += get_generation(host)
+    return generation
+
+
+def get_cached(doc, name, loader):
+    """
+    Get a collection of a document from the session cache, loading it on a miss.
+
+    Args:
+        doc: The Revit document.
+        name (str): The collection name, shared by every tool using the collection.
+        loader (callable): loader() collects the value when it is missing or stale.
+
+    Returns:
+        The cached or freshly loaded value.
+    """
+    store = _store()
+    identity = document_identity(doc)
+    key = (identity, name)
+    generation = _entry_generation(store, identity)
+    entry = store.get(key)
+    if entry is not None and entry[0] == generation:
+        _STATS['hits'] += 1
+        return entry[1]
+    _STATS['misses'] += 1
+    value = loader()
+    store[key] = (generation, value)
+    return value
+
+
+def register_links(host_doc, link_docs):
+    """
+    Record that documents are linked into a host, so invalidating the host also
+    invalidates them.
+    """
+    store = _store()
+    host = document_identity(host_doc)
+    for link_doc in link_docs:
+        identity = document_identity(link_doc)
+        if identity == host:
+            continue
+        hosts = store.setdefault((identity, HOSTS_NAME), set())
+        if host not in hosts:
+            hosts.add(host)
+
+
+def invalidate(doc):
+    """
+    Mark every cached collection of a document (and of the documents linked into it) as
+    stale. Cheap enough to call on every DocumentChanged event.
+    """
+    _bump_generation(document_identity(doc))
+
+
+def evict(doc):
+    """
+    Drop every cached collection of a closing document and of the documents registered
+    as its links, so a long session does not keep the collections of closed documents.
+    """
+    identity = document_identity(doc)
+    _bump_generation(identity)
+    store = _store()
+    identities = set([identity])
+    for key, value in list(store.items()):
+        if key[1] == HOSTS_NAME and identity in value:
+            identities.add(key[0])
+    for key in list(store):
+        if key[0] in identities:
+            del store[key]
+
+
+def clear():
+    """Drop every cached collection."""
+    _store().clear()
+
+
+def cache_stats():
+    """
+    Returns:
+        dict: 'hits', 'misses' and 'entries' of the cache in this Python engine.
+    """
+    stats = dict(_STATS)
+    stats['entries'] = len([key for key in _store() if key[1] != HOSTS_NAME])
+    return stats
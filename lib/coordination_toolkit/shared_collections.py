@@ -0,0 +1,143 @@
+"""Collections several tools read from the same documents, through the session cache."""
+
+import clr
+clr.AddReference('RevitAPI')
+from Autodesk.Revit.DB import (FilteredElementCollector, FilteredWorksetCollector, RevitLinkInstance,
+                               View, Level, Grid, WorksetKind, BasePoint)
+
+from coordination_toolkit.session_cache import get_cached, register_links, document_identity
+
+
+def _collect_link_documents(doc):
+    documents = [doc]
+    instances = []
+    unloaded = []
+    seen = set([document_identity(doc)])
+    for link in FilteredElementCollector(doc).OfClass(RevitLinkInstance):
+        link_doc = link.GetLinkDocument()
+        if link_doc is None:
+            unloaded.append(link.Name)
+            continue
+        instances.append((link, link_doc))
+        # Several instances of one link share its document
+        if document_identity(link_doc) in seen:
+            continue
+        seen.add(document_identity(link_doc))
+        documents.append(link_doc)
+    register_links(doc, documents[1:])
+    return {'documents': documents, 'instances': instances, 'unloaded': unloaded}
+
+
+def get_link_documents(doc):
+    """
+    Get a document and the documents of its loaded links.
+
+    Returns:
+        dict: 'documents' (the host first, then each loaded link document once),
+              'instances' ((RevitLinkInstance, link document) for every loaded instance, in
+              collector order) and 'unloaded' (names of link instances whose document is
+              not loaded).
+    """
+    return get_cached(doc, 'link_documents', lambda: _collect_link_documents(doc))
+
+
+def get_elements_of_class(doc, element_class):
+    """
+    Get every element of a Revit API class (e.g. Group, FamilyInstance).
+
+    Returns:
+        list: The elements.
+    """
+    return get_cached(doc, 'class:' + element_class.__name__,
+                      lambda: list(FilteredElementCollector(doc).OfClass(element_class).ToElements()))
+
+
+def get_views(doc):
+    """Get every view of a document, templates included."""
+    return get_elements_of_class(doc, View)
+
+
+def get_levels(doc):
+    """Get every level of a document."""
+    return get_elements_of_class(doc, Level)
+
+
+def get_grids(doc):
+    """Get every grid of a document."""
+    return get_elements_of_class(doc, Grid)
+
+
+def get_worksets(doc):
+    """
+    Get the user worksets of a document.
+
+    Returns:
+        list: The Workset objects, empty for documents that are not workshared.
+    """
+    def load():
+        if not doc.IsWorkshared:
+            return []
+        return list(FilteredWorksetCollector(doc).OfKind(WorksetKind.UserWorkset).ToWorksets())
+    return get_cached(doc, 'user_worksets', load)
+
+
+def _base_point_position(doc, shared):
+    # BasePoint.GetProjectBasePoint and GetSurveyPoint only exist from Revit 2021.1
+    getter = getattr(BasePoint, 'GetSurveyPoint' if shared else 'GetProjectBasePoint', None)
+    if getter is not None:
+        position = getter(doc).Position
+        return (position.X, position.Y, position.Z)
+    for point in FilteredElementCollector(doc).OfClass(BasePoint):
+        if point.IsShared != shared:
+            continue
+        # BasePoint.Position is Revit 2020; before that the point's bounding box sits on it
+        position = getattr(point, 'Position', None)
+        if position is None:
+            position = point.get_BoundingBox(None).Min
+        return (position.X, position.Y, position.Z)
+    raise ValueError(f"No {'survey' if shared else 'project base'} point in {doc.Title}")
+
+
+def get_base_points(doc):
+    """
+    Get the project base point and survey point positions of a document, on every Revit
+    version the tools support.
+
+    Returns:
+        dict: 'project' and 'survey', each an (x, y, z) position in internal feet.
+
+    Raises:
+        ValueError: If the document has no base point of either kind.
+    """
+    return get_cached(doc, 'base_points', lambda: {'project': _base_point_position(doc, False),
+                                                  'survey': _base_point_position(doc, True)})
+
+
+def _count_elements(doc):
+    by_workset = {}
+    by_owner_view = {}
+    category_names = {}
+    for elem in FilteredElementCollector(doc).WhereElementIsNotElementType():
+        category = elem.Category
+        category_id = category.Id.IntegerValue if category is not None else None
+        if category_id is not None and category_id not in category_names:
+            category_names[category_id] = category.Name
+        by_category = by_workset.setdefault(elem.WorksetId.IntegerValue, {})
+        by_category[category_id] = by_category.get(category_id, 0) + 1
+        owner_id = elem.OwnerViewId.IntegerValue
+        if owner_id > 0:
+            by_owner_view[owner_id] = by_owner_view.get(owner_id, 0) + 1
+    return {'by_workset': by_workset, 'by_owner_view': by_owner_view, 'category_names': category_names}
+
+
+def get_element_counts(doc):
+    """
+    Count the elements (not types) of a document in one pass, shared by every audit that
+    needs element counts.
+
+    Returns:
+        dict: 'by_workset' ({workset id: {category id: count}}, with None as the category id
+              of elements without a category), 'by_owner_view' ({view id: number of
+              view-specific elements}) and 'category_names' ({category id: name}).
+    """
+    return get_cached(doc, 'element_counts', lambda: _count_elements(doc))